@@ -7,6 +7,7 @@ from tempfile import TemporaryDirectory
 from approved_npo_data.csv.csv_row import AllNpoDataRow
 from approved_npo_data.util.file_downloader import download_file
 from approved_npo_data.util.file_operations import extract_zip_file
+from approved_npo_data.util.metrics import metrics
 
 # 全NPO法人情報
 # refs. https://www.npo-homepage.go.jp/npoportal/download/all
@@ -15,8 +16,10 @@ ALL_NPO_DATA_URL = "https://www.npo-homepage.go.jp/npoportal/download/zip/gyouse
 
 def get_all_npo_data_file(temp_dir: Path) -> Path:
     """全NPO法人情報のCSVファイルをダウンロードし、解凍したファイルのパスを返す"""
-    download_path = download_file(ALL_NPO_DATA_URL, temp_dir)
-    dir_path = extract_zip_file(download_path)
+    with metrics.stage("zip_download"):
+        download_path = download_file(ALL_NPO_DATA_URL, temp_dir)
+    with metrics.stage("zip_extract"):
+        dir_path = extract_zip_file(download_path)
 
     csv_files = list(dir_path.glob("*.csv"))
 
@@ -30,7 +33,7 @@ def read_csv(csv_path: Path) -> dict[str, AllNpoDataRow]:
     """csvファイルを読み込み、法人番号をキーとした辞書を返す"""
     data_dict: dict[str, AllNpoDataRow] = {}
 
-    with open(csv_path, encoding="cp932", newline="") as file:
+    with metrics.stage("zip_parse"), open(csv_path, encoding="cp932", newline="") as file:
         reader = csv.reader(file)
 
         # ヘッダを捨てる
@@ -4,6 +4,7 @@
 CSV出力する際の関数も含まれている
 """
 
+from logging import getLogger
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
@@ -13,7 +14,10 @@ from approved_npo_data.csv.csv_row import ApprovedNpoRow
 from approved_npo_data.scraping.npoportal_approved_npo_list.all_approved_npo_list_url import (
     get_approved_npo_data_url,
 )
-from approved_npo_data.util.file_downloader import download_file
+from approved_npo_data.util.file_downloader import download_file, is_not_found_error
+from approved_npo_data.util.metrics import metrics
+
+logger = getLogger(__name__)
 
 
 def is_header_row(row):
@@ -37,7 +41,7 @@ def clean_row(row):
 def extract_tables_from_pdf(pdf_path) -> list[ApprovedNpoRow]:
     """PDFファイルからテーブルを抽出する"""
     tables = []
-    with pdfplumber.open(pdf_path) as pdf:
+    with metrics.stage("pdf_extract"), pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
             for table in page.extract_tables():
                 # テーブルの行ごとにクリーンアップし、ヘッダー行はスキップ
@@ -49,8 +53,18 @@ def extract_tables_from_pdf(pdf_path) -> list[ApprovedNpoRow]:
 
 def download_approved_npo_data(temp_dir: Path) -> Path:
     """認定NPO法人のデータをダウンロードする"""
-    url = get_approved_npo_data_url()
-    return download_file(url, temp_dir)
+    with metrics.stage("url_discovery"):
+        url = get_approved_npo_data_url()
+    try:
+        with metrics.stage("pdf_download"):
+            return download_file(url, temp_dir)
+    except Exception as e:
+        if not is_not_found_error(e):
+            raise
+        # キャッシュしたURLが古くなっている可能性があるため、URLを取得し直す
+        logger.warning("認定NPO法人のデータが見つかりませんでした。URLを再取得します。 url=%r", url)
+        url = get_approved_npo_data_url(use_cache=False)
+        return download_file(url, temp_dir)
 
 
 def get_approved_npo_data() -> list[ApprovedNpoRow]:
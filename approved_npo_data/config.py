@@ -1,8 +1,135 @@
 """各種設定"""
 
+from pathlib import Path
+
 # スクレイピングの間隔（秒）
 SCRAPING_DELAY_SECONDS = 0.1
 
+# 詳細ページのスクレイピングの同時実行数
+# NOTE: 増やす場合はSCRAPING_DELAY_SECONDSも合わせて見直し、サイトへの負荷に注意する
+DETAIL_SCRAPING_MAX_WORKERS = 1
+
+# 詳細ページの取得に失敗した場合の最大の試行回数（最初の失敗を含む）
+# NOTE: 失敗した法人はその場でリトライせず、すべての法人を処理した後にまとめて再試行する
+DETAIL_RETRY_MAX_ATTEMPTS = 4
+
+# 再試行までの待ち時間（秒）。同じホストで失敗が続く毎に2倍にする
+DETAIL_RETRY_BACKOFF_SECONDS = 5
+
+# 再試行までの待ち時間の上限（秒）
+DETAIL_RETRY_BACKOFF_MAX_SECONDS = 120
+
+# タスクのキュー（`--work`）のリースの期間（秒）
+# NOTE: 期間内に完了しなかったタスク（ワーカーが停止した場合等）は別のワーカーが処理する
+QUEUE_LEASE_SECONDS = 300
+
+# タスクのキューに未処理のタスクがない場合に、他のワーカーの完了を待つ間隔（秒）
+QUEUE_POLL_SECONDS = 5
+
+# ホスト毎のサーキットブレーカーを使用するか
+# NOTE: 失敗率が高いホストには一定時間リクエストを送信せず、その間の法人は後で再試行する
+CIRCUIT_BREAKER_ENABLED = True
+
+# サーキットを開く失敗率（0～1。接続エラー、タイムアウト、429、5xxを失敗とみなす）
+CIRCUIT_BREAKER_FAILURE_RATE = 0.5
+
+# 失敗率を計算する直近のリクエスト数
+CIRCUIT_BREAKER_WINDOW_SIZE = 20
+
+# 失敗率を計算する最小のリクエスト数
+CIRCUIT_BREAKER_MIN_REQUESTS = 5
+
+# サーキットを開いてから試行のリクエストを送信するまでの秒数
+CIRCUIT_BREAKER_OPEN_SECONDS = 60
+
+# 出力データをSQLiteファイルにも保存するか
+SAVE_SQLITE = False
+
+# SQLiteファイルにまとめて書き込む件数
+SQLITE_BATCH_SIZE = 500
+
+# 定款に記載された目的、特定非営利活動に係る事業、活動分野の全文検索インデックスを作成するか
+BUILD_SEARCH_INDEX = False
+
+# 詳細ページのスクレイピングを優先度の高い順に行うか（出力の順序は名簿の順序のまま）
+# NOTE: 認定有効期間の満了が近い法人、更新申請中の法人、詳細情報が古い法人を優先する
+PRIORITY_SCHEDULING = True
+
+# 認定有効期間の満了が近いとみなす日数
+PRIORITY_EXPIRY_HORIZON_DAYS = 180
+
+# 詳細情報が古いとみなす日数（過去の出力CSVで詳細情報を取得できた日時からの経過日数）
+PRIORITY_STALENESS_DAYS = 30
+
+# 詳細情報の古さを判断するために参照する過去の出力CSVの件数
+PRIORITY_HISTORY_FILES = 10
+
+# 期限（`--deadline`、`--time-budget`）の何秒前に未着手のスクレイピングを取り消すか
+# NOTE: 実行中のスクレイピングの完了、出力CSVの保存に必要な時間を見込む
+DEADLINE_DRAIN_SECONDS = 120
+
+# 名簿の法人番号が全NPO法人情報に存在しない場合に、法人名と所轄庁で検索するか
+# NOTE: 法人名で一致した行は出力CSVで区別できないため、既定では検索しない
+MATCH_MISSING_BY_NAME = False
+
+# 法人名で検索する場合に一致とみなす類似度の下限（0～1、N-gramのDice係数）
+NAME_MATCH_MIN_SIMILARITY = 0.8
+
+# HTTPのレスポンスの記録・再生の保存先（`--record-http`、`--replay-http`を指定した場合に使用する）
+HTTP_CASSETTE_PATH = Path("cassettes")
+
 # 処理件数（Noneの場合は全件）
 # NOTE: テストのときは30件くらいが良いかもしれない
 MAX_ITEMS_TO_PROCESS = None
+
+# ダウンロードURLのキャッシュファイル
+URL_CACHE_PATH = Path("cache/url_cache.json")
+
+# ダウンロードURLのキャッシュの有効期間（秒）
+# NOTE: 有効期間を過ぎた場合もキャッシュを使用し、バックグラウンドで再取得する
+URL_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# 閲覧書類（事業報告書、財務諸表等）をダウンロードするか
+DOWNLOAD_DOCUMENTS = False
+
+# 閲覧書類の保存先
+DOCUMENT_STORE_PATH = Path("documents")
+
+# 閲覧書類のダウンロードの同時実行数
+DOCUMENT_DOWNLOAD_MAX_WORKERS = 8
+
+# 閲覧書類のダウンロードのホスト毎の同時実行数
+DOCUMENT_DOWNLOAD_MAX_PER_HOST = 2
+
+# 閲覧書類（財務系の報告書）から主要な数値を抽出するか
+# NOTE: DOWNLOAD_DOCUMENTS=Trueの場合のみ有効
+EXTRACT_FINANCIAL_FIGURES = False
+
+# 抽出した数値のキャッシュの保存先
+FINANCIAL_FIGURES_CACHE_PATH = Path("cache/financial_figures")
+
+# 数値抽出のプロセス数（Noneの場合はCPU数）
+FINANCIAL_FIGURES_MAX_WORKERS = None
+
+# 1文書あたりの数値抽出の制限時間（秒）
+FINANCIAL_FIGURES_TIMEOUT_SECONDS = 60
+
+# 計測値をPrometheusのテキスト形式で出力するファイル（Noneの場合は出力しない）
+# NOTE: node_exporterのtextfile collectorのディレクトリ配下の`*.prom`ファイルを指定する
+METRICS_TEXTFILE_PATH: Path | None = None
+
+# 計測値をファイルに出力する間隔（秒）
+METRICS_TEXTFILE_INTERVAL_SECONDS = 15
+
+# 同じ内容のログを間引く期間（秒）
+LOG_SAMPLING_INTERVAL_SECONDS = 60
+
+# 期間内に出力する同じ内容のログの件数（超えた分は間引かれる）
+LOG_SAMPLING_BURST = 10
+
+# 検索サービス（lookup_server.py）の待ち受けるホストとポート
+LOOKUP_SERVICE_HOST = "127.0.0.1"
+LOOKUP_SERVICE_PORT = 8080
+
+# 検索サービスが新しい出力データを確認する間隔（秒）
+LOOKUP_SERVICE_RELOAD_INTERVAL_SECONDS = 30
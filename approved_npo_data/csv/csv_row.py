@@ -750,3 +750,81 @@ class OutputApprovedNpoRow(ModelBase):
 
     tokyo_documents: str = field(default="", metadata={"key": "閲覧書類"})
     """閲覧書類"""
+
+
+@dataclass(frozen=True)
+class DocumentManifestRow(ModelBase):
+    """ダウンロードした閲覧書類の一覧"""
+
+    corporate_number: str = field(default="", metadata={"key": "法人番号"})
+    """法人番号"""
+
+    source: str = field(default="", metadata={"key": "取得元"})
+    """取得元"""
+
+    title: str = field(default="", metadata={"key": "タイトル"})
+    """タイトル"""
+
+    url: str = field(default="", metadata={"key": "URL"})
+    """URL"""
+
+    sha256: str = field(default="", metadata={"key": "SHA256"})
+    """SHA256"""
+
+    path: str = field(default="", metadata={"key": "ローカルパス"})
+    """ローカルパス"""
+
+
+@dataclass(frozen=True)
+class FinancialFiguresRow(ModelBase):
+    """決算書類から抽出した主要な数値"""
+
+    corporate_number: str = field(default="", metadata={"key": "法人番号"})
+    """法人番号"""
+
+    revenue: str = field(default="", metadata={"key": "経常収益計"})
+    """経常収益計"""
+
+    expenses: str = field(default="", metadata={"key": "経常費用計"})
+    """経常費用計"""
+
+    net_assets: str = field(default="", metadata={"key": "正味財産合計"})
+    """正味財産合計"""
+
+    total_assets: str = field(default="", metadata={"key": "資産合計"})
+    """資産合計"""
+
+    total_liabilities: str = field(default="", metadata={"key": "負債合計"})
+    """負債合計"""
+
+    documents: str = field(default="", metadata={"key": "抽出元文書"})
+    """抽出元文書（SHA256）"""
+
+    errors: str = field(default="", metadata={"key": "エラー"})
+    """抽出に失敗した文書とエラー内容"""
+
+
+@dataclass(frozen=True)
+class FetchErrorRow(ModelBase):
+    """詳細ページの取得に最終的に失敗した法人の一覧（エラーレポート）"""
+
+    corporate_number: str = field(default="", metadata={"key": "法人番号"})
+    """法人番号"""
+
+    corporation_name: str = field(default="", metadata={"key": "法人名"})
+    """法人名"""
+
+    source: str = field(default="", metadata={"key": "取得元"})
+    """取得元（npoportal、tokyo）"""
+
+    url: str = field(default="", metadata={"key": "URL"})
+    """失敗したURL"""
+
+    status_code: str = field(default="", metadata={"key": "ステータスコード"})
+    """ステータスコード（レスポンスがない場合は空）"""
+
+    attempts: str = field(default="", metadata={"key": "試行回数"})
+    """試行回数"""
+
+    error: str = field(default="", metadata={"key": "エラー"})
+    """最後の失敗のエラー内容"""
@@ -0,0 +1,110 @@
+"""閲覧書類（事業報告書、財務諸表等）をダウンロードする"""
+
+import threading
+from collections.abc import Iterable
+from logging import getLogger
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlparse
+
+from approved_npo_data.config import (
+    DOCUMENT_DOWNLOAD_MAX_PER_HOST,
+    DOCUMENT_DOWNLOAD_MAX_WORKERS,
+    DOCUMENT_STORE_PATH,
+)
+from approved_npo_data.csv.csv_row import DocumentManifestRow
+from approved_npo_data.scraping.document import LinkDocument
+from approved_npo_data.util.content_store import ContentStore, StoredContent
+from approved_npo_data.util.file_downloader import download_content
+from approved_npo_data.util.profiling import create_executor
+
+logger = getLogger(__name__)
+
+# (法人番号, 取得元, 文書)
+SourcedDocument = tuple[str, str, LinkDocument]
+
+
+class DocumentDownloader:
+    """閲覧書類をホスト毎の同時実行数を制限しながら並行してダウンロードする"""
+
+    def __init__(
+        self,
+        store: ContentStore,
+        max_workers: int = DOCUMENT_DOWNLOAD_MAX_WORKERS,
+        max_per_host: int = DOCUMENT_DOWNLOAD_MAX_PER_HOST,
+    ):
+        """
+        コンストラクタ
+
+        Args:
+            store (ContentStore): ダウンロードした文書の保存先
+            max_workers (int): 全体の同時実行数
+            max_per_host (int): ホスト毎の同時実行数
+        """
+        self.store = store
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self._host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_semaphores[host]
+
+    def download(self, document: LinkDocument) -> StoredContent | None:
+        """
+        文書をダウンロードして保存する。保存済みの場合はダウンロードしない
+
+        ※ダウンロード・保存に失敗した場合はログを出力してNoneを返す（他の文書の処理は続ける）
+        """
+        stored = self.store.lookup(document.url)
+        if stored is not None:
+            return stored
+        try:
+            with self._host_semaphore(document.url):
+                content = download_content(document.url, timeout=30)
+            suffix = PurePosixPath(urlparse(document.url).path).suffix
+            stored = self.store.put(content, suffix)
+        except Exception as e:
+            logger.error("閲覧書類のダウンロードに失敗しました。 document=%r, e=%r", document, e)
+            return None
+        self.store.record(document.url, stored)
+        return stored
+
+    def download_all(self, documents: Iterable[LinkDocument]) -> dict[str, StoredContent]:
+        """文書をまとめてダウンロードし、URLをキーとした辞書を返す"""
+        # 同じURLの文書は1度だけダウンロードする
+        unique_documents = list({document.url: document for document in documents}.values())
+        with create_executor(self.max_workers) as executor:
+            results = executor.map(self.download, unique_documents)
+            stored_documents = {
+                document.url: stored
+                for document, stored in zip(unique_documents, results, strict=True)
+                if stored is not None
+            }
+        self.store.save_index()
+        return stored_documents
+
+
+def download_documents(
+    documents: Iterable[SourcedDocument], store_path: Path = DOCUMENT_STORE_PATH
+) -> list[DocumentManifestRow]:
+    """閲覧書類をダウンロードし、ダウンロード結果の一覧を返す"""
+    documents = list(documents)
+    downloader = DocumentDownloader(ContentStore(store_path))
+    stored_documents = downloader.download_all(document for _, _, document in documents)
+
+    def to_row(corporate_number: str, source: str, document: LinkDocument):
+        stored = stored_documents.get(document.url)
+        return DocumentManifestRow(
+            corporate_number=corporate_number,
+            source=source,
+            title=document.title,
+            url=document.url,
+            sha256=stored.sha256 if stored else "",
+            path=str(stored.path) if stored else "",
+        )
+
+    return [to_row(*document) for document in documents]
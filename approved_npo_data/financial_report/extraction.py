@@ -0,0 +1,183 @@
+"""ダウンロードした財務系の報告書から主要な数値を並列で抽出する"""
+
+import json
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+import pdfplumber
+
+from approved_npo_data.config import (
+    FINANCIAL_FIGURES_CACHE_PATH,
+    FINANCIAL_FIGURES_MAX_WORKERS,
+    FINANCIAL_FIGURES_TIMEOUT_SECONDS,
+)
+from approved_npo_data.csv.csv_row import DocumentManifestRow, FinancialFiguresRow
+from approved_npo_data.financial_report.figures import FinancialFigures, extract_figures_from_text
+from approved_npo_data.util.timeout import time_limit
+
+logger = getLogger(__name__)
+
+# 数値を抽出する文書の取得元
+# NOTE: NPOポータルの最新年度の財務系の報告書のみを対象とする
+TARGET_DOCUMENT_SOURCE = "npoportal"
+
+
+@dataclass(frozen=True)
+class ExtractionResult:
+    """1文書分の抽出結果"""
+
+    sha256: str
+    figures: FinancialFigures
+    error: str = ""
+
+    def to_json(self) -> str:
+        """キャッシュ用のJSON文字列に変換する"""
+        return json.dumps(
+            {"sha256": self.sha256, "figures": self.figures.to_dict(), "error": self.error},
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "ExtractionResult":
+        """キャッシュ用のJSON文字列から復元する"""
+        data = json.loads(text)
+        return cls(
+            sha256=data["sha256"], figures=FinancialFigures(**data["figures"]), error=data["error"]
+        )
+
+
+def extract_pdf_text(pdf_path: Path) -> str:
+    """PDFファイルのテキストを抽出する"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+
+def extract_document(sha256: str, pdf_path: Path, timeout: float | None) -> ExtractionResult:
+    """
+    1文書分の数値を抽出する
+
+    ※ワーカープロセスで実行されるため、例外は送出せずに結果として返す
+    """
+    try:
+        with time_limit(timeout):
+            text = extract_pdf_text(pdf_path)
+            return ExtractionResult(sha256=sha256, figures=extract_figures_from_text(text))
+    except Exception as e:
+        return ExtractionResult(sha256=sha256, figures=FinancialFigures(), error=repr(e))
+
+
+class ExtractionCache:
+    """文書のハッシュ値をキーとした抽出結果のキャッシュ"""
+
+    def __init__(self, root: Path):
+        """
+        コンストラクタ
+
+        Args:
+            root (Path): キャッシュの保存先のディレクトリ
+        """
+        self.root = root
+
+    def path_for(self, sha256: str) -> Path:
+        """ハッシュ値に対応するキャッシュファイルのパスを返す"""
+        return self.root / sha256[:2] / f"{sha256}.json"
+
+    def get(self, sha256: str) -> ExtractionResult | None:
+        """キャッシュした抽出結果を取得する"""
+        path = self.path_for(sha256)
+        if not path.exists():
+            return None
+        try:
+            return ExtractionResult.from_json(path.read_text(encoding="utf-8"))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("抽出結果のキャッシュを読み込めませんでした。 path=%r, e=%r", path, e)
+            return None
+
+    def set(self, result: ExtractionResult) -> None:
+        """抽出結果をキャッシュする"""
+        path = self.path_for(result.sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(result.to_json(), encoding="utf-8")
+
+
+def extract_documents(
+    documents: dict[str, Path],
+    cache: ExtractionCache,
+    max_workers: int | None = FINANCIAL_FIGURES_MAX_WORKERS,
+    timeout: float | None = FINANCIAL_FIGURES_TIMEOUT_SECONDS,
+) -> dict[str, ExtractionResult]:
+    """文書（ハッシュ値をキーとしたPDFファイルのパス）から数値を並列で抽出する"""
+    results: dict[str, ExtractionResult] = {}
+    targets: dict[str, Path] = {}
+    for sha256, path in documents.items():
+        if cached := cache.get(sha256):
+            results[sha256] = cached
+        else:
+            targets[sha256] = path
+    logger.info("数値抽出の対象 len(documents)=%r, len(targets)=%r", len(documents), len(targets))
+    if not targets:
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(extract_document, sha256, path, timeout)
+            for sha256, path in targets.items()
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result.error:
+                logger.warning(
+                    "数値の抽出に失敗しました。 result.sha256=%r, result.error=%r",
+                    result.sha256,
+                    result.error,
+                )
+            # 失敗した結果もキャッシュし、問題のある文書を毎回処理しないようにする
+            cache.set(result)
+            results[result.sha256] = result
+    return results
+
+
+def to_financial_figures_row(
+    corporate_number: str, results: Sequence[ExtractionResult]
+) -> FinancialFiguresRow:
+    """法人毎の抽出結果をCSVの行データに変換する"""
+    figures = FinancialFigures()
+    for result in results:
+        figures = figures.merge(result.figures)
+
+    def to_str(value: int | None) -> str:
+        return "" if value is None else str(value)
+
+    return FinancialFiguresRow(
+        corporate_number=corporate_number,
+        **{key: to_str(value) for key, value in figures.to_dict().items()},
+        documents="\n".join(result.sha256 for result in results),
+        errors="\n".join(f"{result.sha256}: {result.error}" for result in results if result.error),
+    )
+
+
+def extract_financial_figures(
+    document_manifest: Sequence[DocumentManifestRow],
+    cache_path: Path = FINANCIAL_FIGURES_CACHE_PATH,
+) -> list[FinancialFiguresRow]:
+    """ダウンロードした閲覧書類から法人毎の主要な数値を抽出する"""
+    targets = [
+        row
+        for row in document_manifest
+        if row.source == TARGET_DOCUMENT_SOURCE and row.sha256 and row.path.lower().endswith(".pdf")
+    ]
+    results = extract_documents(
+        {row.sha256: Path(row.path) for row in targets}, ExtractionCache(cache_path)
+    )
+
+    # 法人番号毎に結果をまとめる（出現順を維持する）
+    results_by_corporate_number: dict[str, list[ExtractionResult]] = {}
+    for row in targets:
+        results_by_corporate_number.setdefault(row.corporate_number, []).append(results[row.sha256])
+    return [
+        to_financial_figures_row(corporate_number, corporate_results)
+        for corporate_number, corporate_results in results_by_corporate_number.items()
+    ]
@@ -0,0 +1,103 @@
+"""決算書類のテキストから主要な数値を抽出する"""
+
+import re
+from dataclasses import asdict, dataclass
+
+from approved_npo_data.util.number_format import parse_amount
+
+# 各項目を表す見出し（先に一致したものを優先する）
+FIGURE_LABELS: dict[str, tuple[str, ...]] = {
+    "revenue": ("経常収益計", "経常収益合計"),
+    "expenses": ("経常費用計", "経常費用合計"),
+    "net_assets": ("正味財産合計", "次期繰越正味財産額", "正味財産期末残高"),
+    "total_assets": ("資産合計",),
+    "total_liabilities": ("負債合計",),
+}
+
+
+# 日本語の文字（ひらがな、カタカナ、漢字）
+japanese_char_pattern = re.compile(r"[\u3040-\u30ff\u3400-\u9fff々]")
+
+
+def compile_label_pattern(label: str) -> re.Pattern[str]:
+    """見出しの文字間に空白が入っていても一致するパターンを作成する"""
+    return re.compile(r"\s*".join(re.escape(char) for char in label))
+
+
+# 見出しのパターンを事前にコンパイル
+figure_label_patterns: dict[str, tuple[re.Pattern[str], ...]] = {
+    key: tuple(compile_label_pattern(label) for label in labels)
+    for key, labels in FIGURE_LABELS.items()
+}
+
+
+@dataclass(frozen=True)
+class FinancialFigures:
+    """決算書類の主要な数値"""
+
+    revenue: int | None = None
+    """経常収益計"""
+
+    expenses: int | None = None
+    """経常費用計"""
+
+    net_assets: int | None = None
+    """正味財産合計"""
+
+    total_assets: int | None = None
+    """資産合計"""
+
+    total_liabilities: int | None = None
+    """負債合計"""
+
+    def to_dict(self) -> dict[str, int | None]:
+        """辞書に変換する"""
+        return asdict(self)
+
+    def merge(self, other: "FinancialFigures") -> "FinancialFigures":
+        """値が無い項目をotherの値で補完する"""
+        return FinancialFigures(
+            **{
+                key: value if value is not None else getattr(other, key)
+                for key, value in self.to_dict().items()
+            }
+        )
+
+
+def is_label_start(line: str, start: int) -> bool:
+    """
+    見出しの直前（空白を除く）が日本語の文字でないか
+
+    ※「流動資産合計」の「資産合計」のように、別の見出しの一部に一致したものを除く
+    """
+    preceding = line[:start].rstrip()
+    return not preceding or not japanese_char_pattern.match(preceding[-1])
+
+
+def find_amount_after(line: str, end: int) -> int | None:
+    """見出しの後ろ、次の見出し（日本語の文字）までにある金額を取得する"""
+    text = line[end:]
+    # 資産と負債を横に並べた表等で、同じ行の別の項目の金額を取得しないようにする
+    if next_label := japanese_char_pattern.search(text):
+        text = text[: next_label.start()]
+    return parse_amount(text)
+
+
+def find_figure(lines: list[str], patterns: tuple[re.Pattern[str], ...]) -> int | None:
+    """見出しを含む行から金額を取得する"""
+    for pattern in patterns:
+        for line in lines:
+            for match in pattern.finditer(line):
+                if not is_label_start(line, match.start()):
+                    continue
+                if (amount := find_amount_after(line, match.end())) is not None:
+                    return amount
+    return None
+
+
+def extract_figures_from_text(text: str) -> FinancialFigures:
+    """決算書類のテキストから主要な数値を抽出する"""
+    lines = text.splitlines()
+    return FinancialFigures(
+        **{key: find_figure(lines, patterns) for key, patterns in figure_label_patterns.items()}
+    )
@@ -0,0 +1,279 @@
+"""
+最新の出力データを検索する読み取り専用のHTTPサービス
+
+`output`フォルダ内の最新の出力CSV（期限までにすべての法人を処理できなかったものを除く）を読み込み、法人番号、法人名の前方一致、所轄庁のインデックスを
+メモリ上に作成する。新しい出力CSVが作成された場合はバックグラウンドで読み込み、インデックスを置き換える。
+
+※SQLiteファイル（SAVE_SQLITE）と全文検索インデックス（BUILD_SEARCH_INDEX）は既定では作成されず、
+  `--resume`で再利用した法人の詳細情報も含まないため、常にすべての法人を含む出力CSVを読み込む
+
+- GET /npo/{法人番号}: 法人番号で検索する
+- GET /npo?name={法人名の前方一致}&limit={最大件数}: 法人名で検索する
+- GET /npo?jurisdiction={所轄庁}&limit={最大件数}: 所轄庁で検索する
+- GET /health: 読み込んでいるファイルと件数を返す
+"""
+
+import csv
+import json
+import threading
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+from approved_npo_data.csv.csv_row import OutputApprovedNpoRow
+from approved_npo_data.name_matching import strip_corporate_type
+from approved_npo_data.run_progress import read_status
+from approved_npo_data.util.file_operations import list_output_paths
+from approved_npo_data.util.text_format import standardize_text_for_key
+
+logger = getLogger(__name__)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 1000
+
+
+def is_complete_output(path: Path) -> bool:
+    """すべての法人を処理した出力CSVか（完全性のファイルがない場合は処理したものとみなす）"""
+    status = read_status(path)
+    return status is None or status.get("complete") is not False
+
+
+def find_latest_output(base_path: Path) -> Path | None:
+    """
+    最新の出力CSVのパスを返す（ファイル名の日時で判断する）
+
+    ※期限までにすべての法人を処理できなかった出力CSVは、詳細ページの情報が空の法人を含むため除く
+    """
+    for path in list_output_paths(base_path):
+        if is_complete_output(path):
+            return path
+        logger.info("すべての法人を処理していない出力CSVを除きました。 path=%r", path)
+    return None
+
+
+def name_keys(name: str) -> set[str]:
+    """法人名の前方一致の検索に使用するキー（法人格を除いたものも含める）"""
+    key = standardize_text_for_key(name)
+    return {k for k in (key, strip_corporate_type(key)) if k}
+
+
+def parse_limit(value: str) -> int:
+    """検索結果の最大件数を解析する（1未満の場合はValueErrorを送出し、MAX_LIMITを上限とする）"""
+    limit = int(value)
+    if limit < 1:
+        raise ValueError(f"limitは1以上を指定してください: {limit}")
+    return min(limit, MAX_LIMIT)
+
+
+def to_json_dict(row: OutputApprovedNpoRow) -> dict[str, str]:
+    """レスポンスに含める辞書に変換する（CSVのヘッダは重複するためフィールド名をキーとする）"""
+    return {field.name: getattr(row, field.name) for field in fields(row)}
+
+
+@dataclass(frozen=True)
+class LookupIndex:
+    """出力データのインデックス"""
+
+    source: Path
+    """読み込んだファイル"""
+
+    loaded_at: str
+    """読み込んだ日時"""
+
+    rows: list[dict[str, str]]
+    """レスポンスに含める行データ"""
+
+    by_corporate_number: dict[str, int]
+    """法人番号 → 行番号"""
+
+    names: list[tuple[str, int]]
+    """(法人名のキー, 行番号)を法人名のキーの順に並べたもの"""
+
+    by_jurisdiction: dict[str, list[int]]
+    """所轄庁 → 行番号"""
+
+    @classmethod
+    def load(cls, path: Path) -> "LookupIndex":
+        """出力CSVを読み込んでインデックスを作成する"""
+        with open(path, encoding="utf-8", newline="") as file:
+            reader = csv.reader(file)
+            next(reader)
+            data = [OutputApprovedNpoRow(*row) for row in reader if row]
+
+        by_corporate_number: dict[str, int] = {}
+        names: list[tuple[str, int]] = []
+        by_jurisdiction: dict[str, list[int]] = {}
+        for i, row in enumerate(data):
+            by_corporate_number[row.approved_npo_corporate_number] = i
+            names.extend((key, i) for key in name_keys(row.approved_npo_corporation_name))
+            by_jurisdiction.setdefault(row.approved_npo_control_office, []).append(i)
+        names.sort()
+        return cls(
+            source=path,
+            loaded_at=datetime.now().isoformat(timespec="seconds"),
+            rows=[to_json_dict(row) for row in data],
+            by_corporate_number=by_corporate_number,
+            names=names,
+            by_jurisdiction=by_jurisdiction,
+        )
+
+    def get(self, corporate_number: str) -> dict[str, str] | None:
+        """法人番号で検索する"""
+        i = self.by_corporate_number.get(corporate_number.strip())
+        return None if i is None else self.rows[i]
+
+    def search_name(self, prefix: str, limit: int = DEFAULT_LIMIT) -> list[dict[str, str]]:
+        """法人名の前方一致で検索する"""
+        key = standardize_text_for_key(prefix)
+        if not key:
+            return []
+        result: list[int] = []
+        for name, i in self.names[bisect_left(self.names, (key, -1)) :]:
+            if not name.startswith(key) or len(result) >= limit:
+                break
+            # 法人格を除いたキーと両方で一致する場合があるため重複を除く
+            if i not in result:
+                result.append(i)
+        return [self.rows[i] for i in result]
+
+    def search_jurisdiction(
+        self, jurisdiction: str, limit: int = DEFAULT_LIMIT
+    ) -> list[dict[str, str]]:
+        """所轄庁で検索する"""
+        return [self.rows[i] for i in self.by_jurisdiction.get(jurisdiction.strip(), [])[:limit]]
+
+
+class LookupService:
+    """最新の出力データのインデックスを保持し、新しい出力データが作成された場合に読み込み直す"""
+
+    def __init__(self, base_path: Path):
+        """
+        コンストラクタ
+
+        Args:
+            base_path (Path): 出力先のベースパス（`{base_path}/output`フォルダの出力CSVを読み込む）
+        """
+        self.base_path = base_path
+        self.index: LookupIndex | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def reload_if_updated(self) -> bool:
+        """新しい出力CSVがあれば読み込む。読み込んだ場合はTrueを返す"""
+        latest = find_latest_output(self.base_path)
+        if latest is None or (self.index is not None and self.index.source == latest):
+            return False
+        index = LookupIndex.load(latest)
+        # 参照の置き換えのみのため、検索中のリクエストは古いインデックスのまま処理される
+        self.index = index
+        logger.info("出力データを読み込みました。 source=%r, len(rows)=%r", latest, len(index.rows))
+        return True
+
+    def _watch(self, interval_seconds: float) -> None:
+        while not self._stop_event.wait(interval_seconds):
+            try:
+                self.reload_if_updated()
+            except Exception as e:
+                logger.error("出力データの読み込みに失敗しました。 e=%r", e)
+
+    def start_watching(self, interval_seconds: float) -> "LookupService":
+        """バックグラウンドで新しい出力CSVの監視を開始する"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._watch, args=(interval_seconds,), name="lookup-watcher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop_watching(self) -> None:
+        """監視を停止する"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class LookupRequestHandler(BaseHTTPRequestHandler):
+    """検索サービスのリクエストハンドラ"""
+
+    # Keep-Aliveで接続を再利用できるようにする
+    protocol_version = "HTTP/1.1"
+    # ヘッダと本文を別々に送信するため、Nagleアルゴリズムによる遅延を避ける
+    disable_nagle_algorithm = True
+    server: "LookupServer"
+
+    def do_GET(self):  # noqa: N802
+        """GETリクエストを処理する"""
+        url = urlparse(self.path)
+        index = self.server.service.index
+        if url.path == "/health":
+            return self.send_json(
+                HTTPStatus.OK,
+                {
+                    "source": str(index.source) if index else None,
+                    "loaded_at": index.loaded_at if index else None,
+                    "records": len(index.rows) if index else 0,
+                },
+            )
+        if index is None:
+            return self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": "データがありません"})
+
+        if url.path.startswith("/npo/"):
+            row = index.get(unquote(url.path.removeprefix("/npo/")))
+            if row is None:
+                return self.send_json(HTTPStatus.NOT_FOUND, {"error": "見つかりませんでした"})
+            return self.send_json(HTTPStatus.OK, row)
+
+        if url.path == "/npo":
+            query = parse_qs(url.query)
+            try:
+                limit = parse_limit(query.get("limit", [str(DEFAULT_LIMIT)])[0])
+            except ValueError:
+                return self.send_json(HTTPStatus.BAD_REQUEST, {"error": "limitが不正です"})
+            if "name" in query:
+                return self.send_json(HTTPStatus.OK, index.search_name(query["name"][0], limit))
+            if "jurisdiction" in query:
+                rows = index.search_jurisdiction(query["jurisdiction"][0], limit)
+                return self.send_json(HTTPStatus.OK, rows)
+            return self.send_json(
+                HTTPStatus.BAD_REQUEST, {"error": "nameまたはjurisdictionを指定してください"}
+            )
+        return self.send_json(HTTPStatus.NOT_FOUND, {"error": "見つかりませんでした"})
+
+    def send_json(self, status: HTTPStatus, data: dict | Sequence) -> None:
+        """JSONのレスポンスを返す"""
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        """アクセスログはデバッグレベルで出力する"""
+        logger.debug(format, *args)
+
+
+class LookupServer(ThreadingHTTPServer):
+    """検索サービスのHTTPサーバー"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, service: LookupService, host: str, port: int):
+        """
+        コンストラクタ
+
+        Args:
+            service (LookupService): 検索サービス
+            host (str): 待ち受けるホスト
+            port (int): 待ち受けるポート
+        """
+        super().__init__((host, port), LookupRequestHandler)
+        self.service = service
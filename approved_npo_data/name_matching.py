@@ -0,0 +1,207 @@
+"""
+法人名と所轄庁で全NPO法人情報を検索するインデックス
+
+名簿の法人番号が全NPO法人情報に存在しない場合（法人番号の誤記、変更等）に、法人名から対応する法人を探す。
+法人名は`standardize_text_for_key`で標準化し、法人格を除いたものをキーとする。
+
+1. (所轄庁, 法人名のキー)の完全一致で検索する
+2. 一致しない場合は、同じ所轄庁の法人のうち法人名のキーのN-gramを共有するものを候補とし、
+   類似度（Dice係数）が最も高い法人を返す
+"""
+
+import heapq
+import math
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from logging import getLogger
+
+from approved_npo_data.csv.csv_row import AllNpoDataRow, ApprovedNpoRow
+from approved_npo_data.util.metrics import metrics
+from approved_npo_data.util.text_format import (
+    standardize_text_for_key,
+    standardize_texts,
+    to_ngrams,
+)
+
+logger = getLogger(__name__)
+
+# 法人名のキーから除く法人格
+CORPORATE_TYPE_PREFIXES = ("特定非営利活動法人", "NPO法人")
+
+# N-gramの文字数
+NGRAM_SIZE = 2
+
+# 一致とみなす類似度の下限
+DEFAULT_MIN_SIMILARITY = 0.8
+
+
+def strip_corporate_type(key: str) -> str:
+    """標準化した法人名から法人格を除く"""
+    for prefix in CORPORATE_TYPE_PREFIXES:
+        if key.startswith(prefix):
+            return key.removeprefix(prefix)
+    return key
+
+
+def to_name_key(name: str) -> str:
+    """法人名を検索のキーに変換する"""
+    return strip_corporate_type(standardize_text_for_key(name))
+
+
+def to_jurisdiction_key(control_office: str) -> str:
+    """所轄庁を検索のキーに変換する"""
+    return standardize_text_for_key(control_office)
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    """法人名の検索結果"""
+
+    row: AllNpoDataRow
+    """全NPO法人情報"""
+
+    similarity: float
+    """類似度（完全一致の場合は1.0）"""
+
+    exact: bool
+    """完全一致か"""
+
+
+class NameIndex:
+    """法人名と所轄庁で全NPO法人情報を検索するインデックス"""
+
+    def __init__(self, rows: Iterable[AllNpoDataRow]):
+        """
+        コンストラクタ
+
+        Args:
+            rows (Iterable[AllNpoDataRow]): 全NPO法人情報
+        """
+        self.rows: list[AllNpoDataRow] = list(rows)
+        self.keys: list[str] = []
+        self.by_key: dict[tuple[str, str], list[int]] = {}
+        # 所轄庁毎に分けることで、候補を同じ所轄庁の法人に絞り込む
+        self.by_ngram: dict[tuple[str, str], list[int]] = {}
+        # 所轄庁は同じ値が繰り返し出現するため、列をまとめて標準化する（to_jurisdiction_keyと同じ）
+        jurisdictions = standardize_texts(row.control_office for row in self.rows)
+        for i, (row, jurisdiction) in enumerate(zip(self.rows, jurisdictions, strict=True)):
+            key = to_name_key(row.corporation_name)
+            grams = set(to_ngrams(key, NGRAM_SIZE))
+            self.keys.append(key)
+            self.by_key.setdefault((jurisdiction, key), []).append(i)
+            for gram in grams:
+                self.by_ngram.setdefault((jurisdiction, gram), []).append(i)
+
+    def __len__(self) -> int:
+        """登録されている法人の件数"""
+        return len(self.rows)
+
+    def _similarity(self, grams: set[str], i: int) -> float:
+        """N-gramの集合の類似度（Dice係数）"""
+        other = set(to_ngrams(self.keys[i], NGRAM_SIZE))
+        return 2 * len(grams & other) / (len(grams) + len(other))
+
+    def find(
+        self,
+        name: str,
+        control_office: str,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    ) -> NameMatch | None:
+        """
+        法人名と所轄庁で検索する
+
+        Args:
+            name (str): 法人名
+            control_office (str): 所轄庁
+            min_similarity (float): 一致とみなす類似度の下限
+
+        Returns:
+            NameMatch | None: 一致した法人
+                ※見つからない場合、または候補を1つに絞り込めない場合はNone
+        """
+        jurisdiction = to_jurisdiction_key(control_office)
+        key = to_name_key(name)
+        if not key:
+            return None
+
+        exact = self.by_key.get((jurisdiction, key), [])
+        if len(exact) == 1:
+            return NameMatch(self.rows[exact[0]], 1.0, True)
+        if exact:
+            # 同じ所轄庁に同じ名称の法人が複数ある場合は判断できない
+            return None
+
+        grams = set(to_ngrams(key, NGRAM_SIZE))
+        postings = sorted((self.by_ngram.get((jurisdiction, gram), []) for gram in grams), key=len)
+        # 類似度が下限以上の法人は、少なくともmin_overlap個のN-gramを共有する。
+        # そのため、出現数の少ないN-gramから(len(grams) - min_overlap + 1)個のいずれかを必ず共有し、
+        # 「の会」のように多くの法人に出現するN-gramを候補の列挙に使わずに済む
+        min_overlap = math.ceil(min_similarity * len(grams) / (2 - min_similarity) - 1e-9)
+        candidates = {
+            i for posting in postings[: len(grams) - max(min_overlap, 1) + 1] for i in posting
+        }
+        if not candidates:
+            return None
+
+        # 上位2件で一意に決まるか判断する
+        scores = heapq.nlargest(2, ((self._similarity(grams, i), i) for i in candidates))
+        best_score, best = scores[0]
+        if best_score < min_similarity:
+            return None
+        if len(scores) > 1 and scores[1][0] == best_score:
+            return None
+        return NameMatch(self.rows[best], best_score, False)
+
+
+class AllNpoDataResolver:
+    """名簿の法人に対応する全NPO法人情報を取得する"""
+
+    def __init__(
+        self,
+        all_npo_data: Mapping[str, AllNpoDataRow],
+        match_by_name: bool = True,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    ):
+        """
+        コンストラクタ
+
+        Args:
+            all_npo_data (Mapping[str, AllNpoDataRow]): 法人番号をキーとした全NPO法人情報
+            match_by_name (bool): 法人番号で見つからない場合に法人名と所轄庁で検索するか
+            min_similarity (float): 法人名で検索する場合に一致とみなす類似度の下限
+        """
+        self.all_npo_data = all_npo_data
+        self.match_by_name = match_by_name
+        self.min_similarity = min_similarity
+        self._name_index: NameIndex | None = None
+
+    @property
+    def name_index(self) -> NameIndex:
+        """法人名のインデックス（法人番号で見つからない法人がある場合のみ作成する）"""
+        if self._name_index is None:
+            with metrics.stage("name_index"):
+                self._name_index = NameIndex(self.all_npo_data.values())
+        return self._name_index
+
+    def resolve(self, approved_npo_row: ApprovedNpoRow) -> AllNpoDataRow | None:
+        """名簿の法人に対応する全NPO法人情報を返す。見つからない場合はNone"""
+        npo_data = self.all_npo_data.get(approved_npo_row.corporate_number)
+        if npo_data is not None or not self.match_by_name:
+            return npo_data
+
+        match = self.name_index.find(
+            approved_npo_row.corporation_name, approved_npo_row.control_office, self.min_similarity
+        )
+        if match is None:
+            return None
+        logger.info(
+            "法人名で全NPO法人情報を検索しました。 associate_name=%r, corporate_number=%r, "
+            "matched_name=%r, matched_corporate_number=%r, similarity=%.2f",
+            approved_npo_row.corporation_name,
+            approved_npo_row.corporate_number,
+            match.row.corporation_name,
+            match.row.corporate_number,
+            match.similarity,
+        )
+        metrics.inc("name_matches_total", method="exact" if match.exact else "ngram")
+        return match.row
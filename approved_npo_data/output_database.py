@@ -0,0 +1,173 @@
+"""
+出力データをSQLiteファイルに保存する
+
+CSVでは1行にまとめている名簿、全NPO法人情報、NPOポータルの詳細ページ、東京都の法人・団体情報、
+閲覧書類をそれぞれ別のテーブルに保存し、法人番号、所轄庁、認定有効期間にインデックスを作成する。
+
+例: 東京都の認定NPO法人のうち、認定有効期間が2025年4月から6月に満了する法人
+    SELECT * FROM approved_npo
+    WHERE control_office = '東京都'
+      AND approved_validity_period_to_date BETWEEN '2025-04-01' AND '2025-06-30'
+"""
+
+from collections.abc import Iterable
+from pathlib import Path
+
+from approved_npo_data.csv.csv_row import AllNpoDataRow, ApprovedNpoRow
+from approved_npo_data.document_download import SourcedDocument
+from approved_npo_data.scraping.npoportal_detail.Information_model import Information
+from approved_npo_data.scraping.tokyo_detail.information_model import BasicInformation
+from approved_npo_data.util.date_format import to_iso_date
+from approved_npo_data.util.file_operations import SqliteWriter, get_model_columns
+from approved_npo_data.util.metrics import metrics
+from approved_npo_data.util.model_base import ModelBase
+
+APPROVED_NPO_TABLE = "approved_npo"
+ALL_NPO_TABLE = "all_npo"
+NPOPORTAL_INFORMATION_TABLE = "npoportal_information"
+TOKYO_INFORMATION_TABLE = "tokyo_information"
+DOCUMENTS_TABLE = "documents"
+
+# ISO 8601形式（YYYY-MM-DD）に変換した列を追加する名簿の日付の列
+APPROVED_NPO_DATE_COLUMNS = (
+    "approved_validity_period_from",
+    "approved_validity_period_to",
+    "special_approved_validity_period_from",
+    "special_approved_validity_period_to",
+)
+
+# 詳細情報のテーブルは名簿の法人番号で名簿と結合する
+DETAIL_KEY_COLUMN = "approved_corporate_number"
+
+DOCUMENT_COLUMNS = ("corporate_number", "source", "title", "url")
+
+INDEXES: dict[str, list[tuple[str, ...]]] = {
+    APPROVED_NPO_TABLE: [
+        ("corporate_number",),
+        ("control_office",),
+        ("control_office", "approved_validity_period_to_date"),
+        ("approved_validity_period_to_date",),
+        ("special_approved_validity_period_to_date",),
+    ],
+    ALL_NPO_TABLE: [("corporate_number",), ("control_office",)],
+    NPOPORTAL_INFORMATION_TABLE: [(DETAIL_KEY_COLUMN,), ("jurisdiction",)],
+    TOKYO_INFORMATION_TABLE: [(DETAIL_KEY_COLUMN,)],
+    DOCUMENTS_TABLE: [("corporate_number",)],
+}
+
+
+def model_values(model: ModelBase) -> list[str]:
+    """テーブルに保存する値を取得する（リストのフィールドは除く）"""
+    return [getattr(model, column) for column in get_model_columns(type(model))]
+
+
+class OutputDatabase:
+    """出力データを保存するSQLiteファイル"""
+
+    def __init__(self, output_path: Path, batch_size: int = 500):
+        """
+        コンストラクタ
+
+        Args:
+            output_path (Path): 出力先のファイルのパス
+            batch_size (int): add_detail()で追加した詳細情報をまとめて書き込む件数
+        """
+        self.output_path = output_path
+        self.batch_size = batch_size
+        self._pending_details: list[
+            tuple[str, Information, BasicInformation, list[SourcedDocument]]
+        ] = []
+        self.writer = SqliteWriter(output_path)
+        self.writer.create_table(
+            APPROVED_NPO_TABLE,
+            [
+                *get_model_columns(ApprovedNpoRow),
+                *(f"{column}_date" for column in APPROVED_NPO_DATE_COLUMNS),
+            ],
+        )
+        self.writer.create_table(ALL_NPO_TABLE, get_model_columns(AllNpoDataRow))
+        self.writer.create_table(
+            NPOPORTAL_INFORMATION_TABLE, [DETAIL_KEY_COLUMN, *get_model_columns(Information)]
+        )
+        self.writer.create_table(
+            TOKYO_INFORMATION_TABLE, [DETAIL_KEY_COLUMN, *get_model_columns(BasicInformation)]
+        )
+        self.writer.create_table(DOCUMENTS_TABLE, DOCUMENT_COLUMNS)
+
+    def add_approved_npo_data(self, rows: Iterable[ApprovedNpoRow]) -> None:
+        """名簿のデータを追加する"""
+        self.writer.insert(
+            APPROVED_NPO_TABLE,
+            (
+                [
+                    *model_values(row),
+                    *(to_iso_date(getattr(row, column)) for column in APPROVED_NPO_DATE_COLUMNS),
+                ]
+                for row in rows
+            ),
+        )
+
+    def add_all_npo_data(self, rows: Iterable[AllNpoDataRow]) -> None:
+        """全NPO法人情報を追加する"""
+        self.writer.insert(ALL_NPO_TABLE, (model_values(row) for row in rows))
+
+    def add_details(
+        self, details: Iterable[tuple[str, Information, BasicInformation, list[SourcedDocument]]]
+    ) -> None:
+        """
+        法人毎の詳細情報を追加する
+
+        Args:
+            details: (名簿の法人番号, NPOポータルの詳細ページの情報, 東京都の法人・団体情報,
+                閲覧書類)
+                ※取得できなかった情報（空のインスタンス）は保存しない
+        """
+        empty_information = Information.emptyInstance()
+        empty_basic_information = BasicInformation.emptyInstance()
+        information_rows = []
+        basic_information_rows = []
+        document_rows = []
+        for corporate_number, information, basic_information, documents in details:
+            if information != empty_information:
+                information_rows.append([corporate_number, *model_values(information)])
+            if basic_information != empty_basic_information:
+                basic_information_rows.append([corporate_number, *model_values(basic_information)])
+            document_rows.extend(
+                (number, source, document.title, document.url)
+                for number, source, document in documents
+            )
+        self.writer.insert(NPOPORTAL_INFORMATION_TABLE, information_rows)
+        self.writer.insert(TOKYO_INFORMATION_TABLE, basic_information_rows)
+        self.writer.insert(DOCUMENTS_TABLE, document_rows)
+
+    def add_detail(
+        self,
+        corporate_number: str,
+        information: Information,
+        basic_information: BasicInformation,
+        documents: list[SourcedDocument],
+    ) -> None:
+        """法人毎の詳細情報を追加する（batch_size件毎にまとめて書き込む）"""
+        self._pending_details.append((corporate_number, information, basic_information, documents))
+        if len(self._pending_details) >= self.batch_size:
+            with metrics.stage("sqlite_write"):
+                self.flush()
+
+    def flush(self) -> None:
+        """add_detail()で追加した詳細情報を書き込む"""
+        if self._pending_details:
+            self.add_details(self._pending_details)
+        self._pending_details.clear()
+
+    def close(self) -> None:
+        """インデックスを作成してファイルを閉じる"""
+        self.flush()
+        # 追加後にまとめて作成した方が速いため、インデックスは最後に作成する
+        for table, indexes in INDEXES.items():
+            for columns in indexes:
+                self.writer.create_index(table, columns)
+        self.writer.close()
+
+    def abort(self) -> None:
+        """書き込み途中のファイルを削除する"""
+        self.writer.abort()
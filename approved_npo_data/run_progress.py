@@ -0,0 +1,132 @@
+"""
+期限付きの実行の進捗と出力の完全性
+
+期限までにすべての法人の詳細ページをスクレイピングできなかった場合は、処理済みの法人番号と出力CSVのパスを
+進捗ファイルに保存する。次回`--resume`を指定して実行した場合は、処理済みの法人の出力データを再利用し、
+残りの法人のみスクレイピングする。
+
+出力CSVと同じ名前の`.status.json`ファイルに、すべての法人を処理したか（complete）を出力する。
+"""
+
+import csv
+import hashlib
+import json
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+from approved_npo_data.csv.csv_row import OutputApprovedNpoRow
+
+logger = getLogger(__name__)
+
+PROGRESS_FILE_NAME = "progress.json"
+
+
+def get_progress_path(base_path: Path) -> Path:
+    """進捗ファイルのパス"""
+    return base_path / "output" / PROGRESS_FILE_NAME
+
+
+def get_status_path(output_csv_path: Path) -> Path:
+    """出力CSVの完全性を記録するファイルのパス"""
+    return output_csv_path.with_suffix(".status.json")
+
+
+def get_roster_digest(corporate_numbers: Iterable[str]) -> str:
+    """処理対象の法人番号（順序を含む）のハッシュ値（進捗が同じ処理対象のものかの判定に使用する）"""
+    return hashlib.sha256("\n".join(corporate_numbers).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class RunProgress:
+    """途中で終了した実行の進捗"""
+
+    output_path: str
+    """途中までの出力CSVのパス"""
+
+    completed: list[str]
+    """処理済みの法人番号"""
+
+    total: int
+    """処理対象の件数"""
+
+    created_at: str
+    """保存した日時"""
+
+    roster_digest: str = ""
+    """処理対象の法人番号のハッシュ値（get_roster_digest()）"""
+
+    def save(self, path: Path) -> None:
+        """進捗ファイルに保存する"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, mode="w", encoding="utf-8") as file:
+            json.dump(asdict(self), file, ensure_ascii=False, indent=2)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "RunProgress | None":
+        """進捗ファイルを読み込む。存在しない、または読み込めない場合はNone"""
+        try:
+            with open(path, encoding="utf-8") as file:
+                return cls(**json.load(file))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("進捗ファイルの読み込みに失敗しました。 path=%r, e=%r", path, e)
+            return None
+
+    def load_completed_rows(self) -> dict[str, OutputApprovedNpoRow]:
+        """途中までの出力CSVから、処理済みの法人の出力データを読み込む（法人番号がキー）"""
+        completed = set(self.completed)
+        rows: dict[str, OutputApprovedNpoRow] = {}
+        with open(self.output_path, encoding="utf-8", newline="") as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for values in reader:
+                if not values:
+                    continue
+                row = OutputApprovedNpoRow(*values)
+                if row.approved_npo_corporate_number in completed:
+                    rows[row.approved_npo_corporate_number] = row
+        return rows
+
+
+def write_status(
+    output_csv_path: Path,
+    complete: bool,
+    processed: int,
+    total: int,
+    deadline: datetime | None,
+    failed: int = 0,
+) -> Path:
+    """
+    出力CSVの完全性（期限までにすべての法人を処理したか）を出力する
+
+    ※取得に失敗した法人（failed）は処理済み（processed）に含めないが、completeには影響しない
+    """
+    status_path = get_status_path(output_csv_path)
+    status = {
+        "output": output_csv_path.name,
+        "complete": complete,
+        "processed": processed,
+        "failed": failed,
+        "total": total,
+        "deadline": deadline.isoformat(timespec="seconds") if deadline else None,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(status_path, mode="w", encoding="utf-8") as file:
+        json.dump(status, file, ensure_ascii=False, indent=2)
+    return status_path
+
+
+def read_status(output_csv_path: Path) -> dict[str, Any] | None:
+    """出力CSVの完全性を読み込む（存在しない、または読み込めない場合はNone）"""
+    try:
+        with open(get_status_path(output_csv_path), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
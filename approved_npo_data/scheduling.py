@@ -0,0 +1,157 @@
+"""
+詳細ページのスクレイピングの優先度
+
+認定有効期間の満了が近い法人、更新申請中の法人、詳細情報が古い（過去の出力で取得できていない）法人から
+順にスクレイピングできるように、名簿の行毎に優先度を計算する。
+
+優先度は`Scorer`（名簿の行 → 0～1の値）の重み付きの和で、値が大きいほど先に処理する。
+`combine_scorers`に任意の`Scorer`を渡すことで、優先度の計算方法を変更できる。
+"""
+
+import csv
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from datetime import date, datetime
+from logging import getLogger
+from pathlib import Path
+
+from approved_npo_data.csv.csv_row import ApprovedNpoRow, OutputApprovedNpoRow
+from approved_npo_data.util.date_format import to_iso_date
+from approved_npo_data.util.file_operations import get_output_timestamp, list_output_paths
+
+logger = getLogger(__name__)
+
+Scorer = Callable[[ApprovedNpoRow], float]
+"""名簿の行の優先度（0～1）を返す関数"""
+
+
+def days_until_expiry(row: ApprovedNpoRow, today: date) -> int | None:
+    """認定有効期間・特例認定有効期間の満了日までの日数（近い方）。満了日がない場合はNone"""
+    expiry_dates = [
+        date.fromisoformat(iso_date)
+        for iso_date in (
+            to_iso_date(row.approved_validity_period_to),
+            to_iso_date(row.special_approved_validity_period_to),
+        )
+        if iso_date
+    ]
+    if not expiry_dates:
+        return None
+    return (min(expiry_dates) - today).days
+
+
+def expiry_scorer(today: date, horizon_days: int) -> Scorer:
+    """
+    認定有効期間の満了が近いほど高くなる優先度
+
+    Args:
+        today (date): 基準日
+        horizon_days (int): 満了が近いとみなす日数（満了日までの日数がこれ以上の場合は0）
+    """
+
+    def score(row: ApprovedNpoRow) -> float:
+        days = days_until_expiry(row, today)
+        if days is None:
+            return 0.0
+        # 満了日を過ぎている場合は、認定状態が変わっている可能性が高いため最も優先する
+        return min(max(1 - days / horizon_days, 0.0), 1.0)
+
+    return score
+
+
+# 更新申請中の列で、更新申請中ではないことを表す値
+NOT_APPLIED_VALUES = ("", "-", "－", "ー", "×")
+
+
+def update_application_scorer(row: ApprovedNpoRow) -> float:
+    """更新申請中の場合に1となる優先度"""
+    return 0.0 if row.update_application.strip() in NOT_APPLIED_VALUES else 1.0
+
+
+def staleness_scorer(
+    last_fetched: Mapping[str, datetime], now: datetime, max_age_days: int
+) -> Scorer:
+    """
+    詳細情報が古いほど高くなる優先度
+
+    Args:
+        last_fetched (Mapping[str, datetime]): 法人番号 → 詳細情報を最後に取得した日時
+        now (datetime): 基準日時
+        max_age_days (int): 古いとみなす日数
+            ※経過日数がこれ以上の場合、または取得したことがない場合は1
+    """
+
+    def score(row: ApprovedNpoRow) -> float:
+        fetched_at = last_fetched.get(row.corporate_number)
+        if fetched_at is None:
+            return 1.0
+        age_days = (now - fetched_at).total_seconds() / (24 * 60 * 60)
+        return min(max(age_days / max_age_days, 0.0), 1.0)
+
+    return score
+
+
+def combine_scorers(weighted_scorers: Iterable[tuple[Scorer, float]]) -> Scorer:
+    """優先度を重み付きで合計する"""
+    weighted_scorers = list(weighted_scorers)
+
+    def score(row: ApprovedNpoRow) -> float:
+        return sum(weight * scorer(row) for scorer, weight in weighted_scorers)
+
+    return score
+
+
+def load_last_fetched(base_path: Path, max_files: int) -> dict[str, datetime]:
+    """
+    過去の出力CSVから、法人番号毎に詳細情報を最後に取得できた日時を取得する
+
+    Args:
+        base_path (Path): 出力先のベースパス（get_output_path()と同じ）
+        max_files (int): 参照する出力CSVの件数（新しい順）
+    """
+    last_fetched: dict[str, datetime] = {}
+    for path in list_output_paths(base_path)[:max_files]:
+        fetched_at = get_output_timestamp(path)
+        try:
+            with open(path, encoding="utf-8", newline="") as file:
+                reader = csv.reader(file)
+                next(reader, None)
+                for values in reader:
+                    if not values:
+                        continue
+                    row = OutputApprovedNpoRow(*values)
+                    # 新しい出力から順に読み込むため、最初に見つかった日時が最後に取得した日時
+                    if row.information_corporate_name:
+                        last_fetched.setdefault(row.approved_npo_corporate_number, fetched_at)
+        except (OSError, TypeError, csv.Error) as e:
+            logger.warning("過去の出力の読み込みに失敗しました。 path=%r, e=%r", path, e)
+    return last_fetched
+
+
+def create_default_scorer(
+    base_path: Path,
+    now: datetime,
+    expiry_horizon_days: int,
+    staleness_days: int,
+    history_files: int,
+) -> Scorer:
+    """満了日、更新申請中、詳細情報の古さを組み合わせた優先度"""
+    return combine_scorers(
+        [
+            (expiry_scorer(now.date(), expiry_horizon_days), 1.0),
+            (update_application_scorer, 1.0),
+            (
+                staleness_scorer(load_last_fetched(base_path, history_files), now, staleness_days),
+                0.5,
+            ),
+        ]
+    )
+
+
+def prioritize(rows: Sequence[ApprovedNpoRow], scorer: Scorer) -> list[int]:
+    """
+    優先度の高い順に並べた行番号を返す
+
+    ※優先度が同じ場合は名簿の順序のまま
+    """
+    scores = [scorer(row) for row in rows]
+    return sorted(range(len(rows)), key=lambda i: -scores[i])
@@ -2,15 +2,37 @@
 
 import re
 
+from approved_npo_data.config import URL_CACHE_PATH, URL_CACHE_TTL_SECONDS
+from approved_npo_data.util.http_client import get_cassette
 from approved_npo_data.util.scraping import scrape
+from approved_npo_data.util.ttl_cache import TtlCache
 
 ALL_APPROVED_NPO_LIST_URL = "https://www.npo-homepage.go.jp/npoportal/certification"
 APPROVED_NPO_DATA_URL_PATTERN = re.compile(r"全国 所轄庁認定・特例認定NPO法人名簿")
 
+# キャッシュのキー
+APPROVED_NPO_DATA_URL_CACHE_KEY = "approved_npo_data_url"
 
-def get_approved_npo_data_url() -> str:
-    """認定NPO法人のデータのURLを取得する"""
+url_cache = TtlCache(URL_CACHE_PATH, URL_CACHE_TTL_SECONDS)
+
+
+def scrape_approved_npo_data_url() -> str:
+    """認定NPO法人のデータのURLをスクレイピングして取得する"""
     soup = scrape(ALL_APPROVED_NPO_LIST_URL)
     link = soup.find("a", href=True, string=APPROVED_NPO_DATA_URL_PATTERN)
 
     return link["href"]  # type: ignore
+
+
+def get_approved_npo_data_url(use_cache: bool = True) -> str:
+    """
+    認定NPO法人のデータのURLを取得する
+
+    use_cache=Trueの場合はキャッシュしたURLを優先して使用する
+    """
+    if get_cassette() is not None:
+        # 記録・再生時は実行環境のキャッシュに左右されないようにキャッシュを読み書きしない
+        return scrape_approved_npo_data_url()
+    if not use_cache:
+        return url_cache.refresh(APPROVED_NPO_DATA_URL_CACHE_KEY, scrape_approved_npo_data_url)
+    return url_cache.get_or_load(APPROVED_NPO_DATA_URL_CACHE_KEY, scrape_approved_npo_data_url)
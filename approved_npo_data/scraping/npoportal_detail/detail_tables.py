@@ -0,0 +1,118 @@
+"""
+NPO法人ポータルの詳細ページから表（基本情報、閲覧書類）の行を抽出する
+
+ページの要素を1回だけ走査し、対象の表の各行の見出し（th）と最初のセル（td）、セル内のリンクを取得する。
+基本情報（information.py）と閲覧書類（viewing_documents.py）はこの結果からモデルを作成する。
+"""
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from bs4 import BeautifulSoup, Tag
+
+INFORMATION_TABLE_SUMMARY = "基本情報"
+VIEWING_DOCUMENTS_TABLE_SUMMARY = "閲覧書類"
+DETAIL_TABLE_SUMMARIES = (INFORMATION_TABLE_SUMMARY, VIEWING_DOCUMENTS_TABLE_SUMMARY)
+
+# 正規表現のパターンを事前にコンパイル
+whitespace_pattern = re.compile(r"\s+")
+
+
+def clean_text(text: str) -> str:
+    """テキストを整形する"""
+    # 改行と連続するスペースを単一のスペースに変換
+    return whitespace_pattern.sub(" ", text.strip())
+
+
+@dataclass
+class TableRow:
+    """表の1行（見出しと最初のセル）"""
+
+    key: str
+    """見出しのテキスト（整形済み）"""
+
+    td: Tag
+    """最初のセル"""
+
+    links: list[Tag] = field(default_factory=list)
+    """最初のセル内のリンク（aタグ）"""
+
+
+@dataclass
+class _RowState:
+    """走査中の行の状態"""
+
+    tr: Tag
+    th: Tag | None = None
+    td: Tag | None = None
+    links: list[Tag] = field(default_factory=list)
+
+    def add(self, node: Tag) -> None:
+        """行内の要素（th、td、a）を追加する"""
+        if _enclosing(node, "tr") is not self.tr:
+            # 対象の表の行の外（入れ子の表等）の要素
+            return
+        if node.name == "th":
+            if self.th is None:
+                self.th = node
+        elif node.name == "td":
+            if self.td is None:
+                self.td = node
+        elif self.td is not None and _enclosing(node, "td") is self.td:
+            self.links.append(node)
+
+
+def _enclosing(node: Tag, name: str) -> Tag | None:
+    """指定した名前の最も近い祖先の要素を返す"""
+    parent = node.parent
+    while parent is not None and parent.name != name:
+        parent = parent.parent
+    return parent
+
+
+def extract_tables(
+    soup: BeautifulSoup, summaries: Iterable[str] = DETAIL_TABLE_SUMMARIES
+) -> dict[str, list[TableRow]]:
+    """
+    詳細ページから表の行を抽出する
+
+    Args:
+        soup (BeautifulSoup): 詳細ページ
+        summaries (Iterable[str]): 抽出する表のsummary属性
+            ※同じsummaryの表が複数ある場合は最初の表
+
+    Returns:
+        dict[str, list[TableRow]]: summary属性 → 見出しとセルの両方がある行
+            ※表が見つからなかった場合はキーが存在しない
+    """
+    wanted = set(summaries)
+    # id(表の要素) → 走査中の行の状態
+    tables: dict[int, list[_RowState]] = {}
+    states: dict[str, list[_RowState]] = {}
+    row: _RowState | None = None
+    for node in soup.descendants:
+        if not isinstance(node, Tag):
+            continue
+        name = node.name
+        if name == "table":
+            summary = node.get("summary")
+            if isinstance(summary, str) and summary in wanted and summary not in states:
+                states[summary] = tables[id(node)] = []
+        elif name == "tr":
+            rows = tables.get(id(_enclosing(node, "table")))
+            row = None
+            if rows is not None:
+                row = _RowState(node)
+                rows.append(row)
+        elif row is not None and name in ("th", "td", "a"):
+            row.add(node)
+
+    return {
+        summary: [
+            TableRow(clean_text(state.th.get_text(strip=True)), state.td, state.links)
+            for state in rows
+            if state.th is not None and state.td is not None
+        ]
+        for summary, rows in states.items()
+    }
@@ -1,52 +1,60 @@
 """NPO法人ポータルの詳細ページから基本情報をスクレイピングする"""
 
-import re
-
 from bs4 import BeautifulSoup
 
+from approved_npo_data.scraping.npoportal_detail.detail_tables import (
+    INFORMATION_TABLE_SUMMARY,
+    TableRow,
+    clean_text,
+    extract_tables,
+)
 from approved_npo_data.scraping.npoportal_detail.Information_model import Information
+from approved_npo_data.util.text_format import standardize_keys, standardize_text_for_key
 from approved_npo_data.util.url import extract_embedded_url
 
+# 標準化した項目名 → Informationの項目名
+# NOTE: 表の項目名の空白、全角英数字等の表記の揺れを吸収するため、標準化した項目名で対応させる
+INFORMATION_KEYS = {standardize_text_for_key(key): key for key in Information.get_field_mapping()}
+
+
+def table_rows_to_dict(rows: list[TableRow] | None) -> dict[str, str]:
+    """
+    基本情報の表の行を辞書に変換する。
+
+    ※項目名は標準化し、Informationの項目名と表記が異なる場合はInformationの項目名に揃える
+    """
+    if rows is None:
+        raise ValueError("基本情報のテーブルが見つかりませんでした。")
 
-def clean_text(text: str) -> str:
-    """テキストを整形する"""
-    # 改行と連続するスペースを単一のスペースに変換
-    return re.sub(r"\s+", " ", text.strip())
+    data = {}
+    for row in rows:
+        # リンクがある場合はhref属性を取得し、リンクがない場合はテキストを取得
+        if row.links:
+            value = extract_embedded_url(row.links[0]["href"])  # type: ignore
+        else:
+            value = clean_text(row.td.get_text())
+        data[row.key] = value
+    return {INFORMATION_KEYS.get(key, key): value for key, value in standardize_keys(data).items()}
 
 
 def extract_table_data(soup: BeautifulSoup) -> dict[str, str]:
     """
     BeautifulSoupオブジェクトから基本情報を辞書として抽出する。
     """
-    table = soup.find("table", summary="基本情報")
-    if not table:
-        raise ValueError("基本情報のテーブルが見つかりませんでした。")
-    data = {}
+    tables = extract_tables(soup, [INFORMATION_TABLE_SUMMARY])
+    return table_rows_to_dict(tables.get(INFORMATION_TABLE_SUMMARY))
 
-    if table:
-        for row in table.find_all("tr"):  # type: ignore
-            th = row.find("th")
-            td = row.find("td")
-            if th and td:
-                key = clean_text(th.get_text(strip=True))
-                # リンクがある場合はhref属性を取得し、リンクがない場合はテキストを取得
-                if a_tag := td.find("a"):
-                    value = extract_embedded_url(a_tag["href"])
-                else:
-                    value = clean_text(td.get_text())
-                data[key] = value
 
-    return data
+def create_npo_information(rows: list[TableRow] | None) -> Information:
+    """
+    基本情報の表の行からNPOInformationを生成する。
+    """
+    return Information.from_dict(table_rows_to_dict(rows))
 
 
 def scrape_npo_information(soup: BeautifulSoup) -> Information:
     """
     NPOの詳細情報をスクレイピングしてNPOInformationを生成する。
     """
-    # テーブルデータを辞書として抽出
-    data_dict = extract_table_data(soup)
-
-    # 抽出したデータを元にNPOInformationインスタンスを生成
-    information = Information.from_dict(data_dict)
-
-    return information
+    tables = extract_tables(soup, [INFORMATION_TABLE_SUMMARY])
+    return create_npo_information(tables.get(INFORMATION_TABLE_SUMMARY))
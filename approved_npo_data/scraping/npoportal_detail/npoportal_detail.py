@@ -2,26 +2,47 @@
 
 from logging import getLogger
 
-from approved_npo_data.scraping.npoportal_detail.information import scrape_npo_information
+from approved_npo_data.scraping.document import LinkDocument
+from approved_npo_data.scraping.npoportal_detail.detail_tables import (
+    INFORMATION_TABLE_SUMMARY,
+    VIEWING_DOCUMENTS_TABLE_SUMMARY,
+    extract_tables,
+)
+from approved_npo_data.scraping.npoportal_detail.information import create_npo_information
 from approved_npo_data.scraping.npoportal_detail.Information_model import Information
-from approved_npo_data.scraping.npoportal_detail.viewing_documents import scrape_viewing_documents
+from approved_npo_data.scraping.npoportal_detail.viewing_documents import create_viewing_documents
 from approved_npo_data.scraping.npoportal_detail.viewing_documents_model import (
     FinancialActivityReport,
 )
-from approved_npo_data.util.scraping import scrape
+from approved_npo_data.util.metrics import metrics
+from approved_npo_data.util.scraping import FetchError, fetch_html_once, parse_html
 
 logger = getLogger(__name__)
 
 
-def get_detail_data(url: str, associate_name="") -> tuple[Information, list[str]]:
-    """詳細ページのデータを取得する"""
-    empty_data = Information.emptyInstance(), ["" for _ in range(23)]
+def get_detail_data(
+    url: str, associate_name=""
+) -> tuple[Information, list[str], list[LinkDocument]]:
+    """
+    詳細ページのデータを取得する
+
+    最新年度の財務系の報告書の文書も合わせて返す
+    ※詳細ページの取得に失敗した場合はFetchErrorを送出する（解析に失敗した場合は空のデータを返す）
+    """
+    empty_data = Information.emptyInstance(), ["" for _ in range(23)], []
     if not url:
         return empty_data
     try:
-        soup = scrape(url)
-        viewing_documents = scrape_viewing_documents(soup)
-        information = scrape_npo_information(soup)
+        with metrics.stage("detail_fetch"):
+            content = fetch_html_once(url)
+        with metrics.stage("detail_parse"):
+            soup = parse_html(content)
+            # 基本情報と閲覧書類等の表は1回の走査でまとめて抽出する
+            tables = extract_tables(soup)
+            viewing_documents = create_viewing_documents(
+                tables.get(VIEWING_DOCUMENTS_TABLE_SUMMARY)
+            )
+            information = create_npo_information(tables.get(INFORMATION_TABLE_SUMMARY))
         financial_activity_report = viewing_documents.financial_activity_reports.get_latest_report()
 
         def f(report: FinancialActivityReport):
@@ -30,10 +51,19 @@ def get_detail_data(url: str, associate_name="") -> tuple[Information, list[str]
 
         information_row = information.to_csv_row()
         year, urls = f(financial_activity_report) if financial_activity_report else ("", "")
+        documents = financial_activity_report.documents if financial_activity_report else []
         # TODO: 本来はdataclassを返すべきだがとりあえず値だけListで返す
-        return information, information_row + [year, urls]
+        return information, information_row + [year, urls], documents
+    except FetchError:
+        # 取得の失敗は呼び出し元で後から再試行する
+        metrics.inc("fetch_failures_total", source="npoportal")
+        raise
     except Exception as e:
+        metrics.inc("parse_failures_total", source="npoportal")
         logger.error(
-            f"団体詳細ページのスクレイピングに失敗しました。{associate_name=}, {url=}, {e=}"
+            "団体詳細ページのスクレイピングに失敗しました。associate_name=%r, url=%r, e=%r",
+            associate_name,
+            url,
+            e,
         )
         return empty_data
@@ -2,8 +2,13 @@
 
 import re
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 
+from approved_npo_data.scraping.npoportal_detail.detail_tables import (
+    VIEWING_DOCUMENTS_TABLE_SUMMARY,
+    TableRow,
+    extract_tables,
+)
 from approved_npo_data.scraping.npoportal_detail.viewing_documents_model import (
     Bylaws,
     FinancialActivityReport,
@@ -14,11 +19,13 @@ from approved_npo_data.scraping.npoportal_detail.viewing_documents_model import
     ViewingDocuments,
 )
 
+# 年度のフォーマット（例: 2023年度）
+nendo_pattern = re.compile(r"^(\d+)年度$")
+
 
 def is_nendo_format(text: str) -> bool:
     """年度のフォーマットかを判定する"""
-    pattern = r"^\d+年度$"
-    return bool(re.match(pattern, text))
+    return bool(nendo_pattern.match(text))
 
 
 def is_bylaws(text: str) -> bool:
@@ -27,23 +34,34 @@ def is_bylaws(text: str) -> bool:
 
 
 def create_report_from_category(
-    category: str, td
+    category: str, td: Tag, links: list[Tag] | None = None
 ) -> tuple[str, FinancialActivityReport | Bylaws | OtherReport]:
-    """カテゴリから報告書を作成する"""
+    """
+    カテゴリから報告書を作成する
+
+    ※linksはtd内のリンク（Noneの場合はtdから検索する）
+    """
+    if links is None:
+        links = td.find_all("a")
+
     # 年度のカテゴリかを判別
-    if is_nendo_format(category):
-        year = int(re.findall(r"\d+", category)[0])
+    if nendo_match := nendo_pattern.match(category):
+        year = int(nendo_match.group(1))
         documents = [
-            LinkDocument(title=a.get_text(strip=True), url=a["href"]) for a in td.find_all("a")
+            LinkDocument(title=a.get_text(strip=True), url=a["href"])  # type: ignore
+            for a in links
         ]
         report = FinancialActivityReport(category=category, year=year, documents=documents)
         return "financial_activity_report", report
 
     # 定款カテゴリかを判別
     elif is_bylaws(category):
-        document_link = td.find("a")
-        if document_link:
-            doc = LinkDocument(title=document_link.get_text(strip=True), url=document_link["href"])
+        if links:
+            document_link = links[0]
+            doc = LinkDocument(
+                title=document_link.get_text(strip=True),
+                url=document_link["href"],  # type: ignore
+            )
         else:
             doc = NonLinkDocument(value=td.get_text(strip=True))
         return "bylaws", Bylaws(category=category, document=doc)
@@ -53,37 +71,34 @@ def create_report_from_category(
         return "other", OtherReport(category=category, value=td.get_text(strip=True))
 
 
-def scrape_viewing_documents(soup: BeautifulSoup) -> ViewingDocuments:
-    """閲覧書類等をスクレイピングする"""
-    # 「閲覧書類等」のテーブルを探す
-    table = soup.find("table", {"summary": "閲覧書類"})
-    if not table:
+def create_viewing_documents(rows: list[TableRow] | None) -> ViewingDocuments:
+    """閲覧書類等の表の行からViewingDocumentsを生成する"""
+    if rows is None:
         raise ValueError("閲覧書類等のテーブルが見つかりませんでした。")
 
     bylaws = None
     other_reports = []
     financial_reports = FinancialActivityReports(category="Financial Reports")
 
-    rows = table.find_all("tr")  # type: ignore
-
     for row in rows:
-        th = row.find("th")
-        td = row.find("td")
-
-        if th and td:
-            category: str = th.get_text(strip=True)
-            category_type, data = create_report_from_category(category, td)
-            if category_type == "financial_activity_report":
-                financial_reports.reports.append(data)  # type: ignore
-            elif category_type == "bylaws":
-                if bylaws:
-                    raise ValueError("定款のカテゴリが複数存在します。")
-                bylaws = data
-            elif category_type == "other":
-                other_reports.append(data)
+        category_type, data = create_report_from_category(row.key, row.td, row.links)
+        if category_type == "financial_activity_report":
+            financial_reports.reports.append(data)  # type: ignore
+        elif category_type == "bylaws":
+            if bylaws:
+                raise ValueError("定款のカテゴリが複数存在します。")
+            bylaws = data
+        elif category_type == "other":
+            other_reports.append(data)
 
     return ViewingDocuments(
         financial_activity_reports=financial_reports,
         bylaws=bylaws,  # type: ignore
         other=other_reports,
     )
+
+
+def scrape_viewing_documents(soup: BeautifulSoup) -> ViewingDocuments:
+    """閲覧書類等をスクレイピングする"""
+    tables = extract_tables(soup, [VIEWING_DOCUMENTS_TABLE_SUMMARY])
+    return create_viewing_documents(tables.get(VIEWING_DOCUMENTS_TABLE_SUMMARY))
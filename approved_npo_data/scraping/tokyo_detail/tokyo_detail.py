@@ -1,51 +1,62 @@
 """東京都の法人・団体情報をスクレイピングしてクラスに格納するスクリプト"""
 
 from logging import getLogger
+from typing import Any
 from urllib.parse import urljoin, urlparse
 
-from bs4 import BeautifulSoup
+from bs4 import Tag
 
 from approved_npo_data.scraping.document import LinkDocument
 from approved_npo_data.scraping.tokyo_detail.information_model import BasicInformation
-from approved_npo_data.util.scraping import scrape
+from approved_npo_data.util.metrics import metrics
+from approved_npo_data.util.scraping import FetchError, fetch_html_once, parse_html
 
 logger = getLogger(__name__)
 
 
-def scrape_table_to_dict(details_section: BeautifulSoup) -> dict[str, str]:
-    """スクレイピング対象のテーブルを辞書形式に変換"""
-
-    def f(dt):
-        key = dt.text.strip()
-        dd = dt.find_next("dd")
-        value = dd.text.strip() if dd else ""
-        return key, value
-
-    return {k: v for k, v in (f(dt) for dt in details_section.find_all("dt"))}
-
-
-def extract_documents(details_section: BeautifulSoup, base_url: str) -> list[LinkDocument]:
-    """閲覧書類のリストを取得し、絶対URLに変換"""
-    links = details_section.find_all("a", href=True)
-    return [
-        LinkDocument(
-            title=link.text.strip(),
-            url=urljoin(base_url, link["href"].strip()),
-        )
-        for link in links
-    ]
-
-
-def create_basic_information(details_section: BeautifulSoup, base_url: str) -> BasicInformation:
-    """辞書データを使用して BasicInformation インスタンスを作成"""
-    # テーブルデータを辞書形式に変換
-    table_data = scrape_table_to_dict(details_section)
-
-    # 閲覧書類を追加で処理
-    table_data["閲覧書類"] = extract_documents(details_section, base_url)  # type: ignore
-
-    # BasicInformation のインスタンスを生成
-    return BasicInformation.from_dict(table_data)
+def parse_details_section(details_section: Tag, base_url: str) -> dict[str, Any]:
+    """
+    法人・団体情報詳細セクションを1回だけ走査し、項目名と値の辞書に変換する
+
+    dtの値はその後の最初のddとし、セクション内のリンクは閲覧書類（絶対URL）として"閲覧書類"に格納する
+    """
+    table_data: dict[str, Any] = {}
+    documents: list[LinkDocument] = []
+    # 対応するddがまだ出現していない項目名（dtが連続する場合は同じddを値とする）
+    pending_keys: list[str] = []
+    # dt、ddを直接含む要素（セクションとdt、ddをまとめるdiv）
+    containers = {id(details_section)}
+    for node in details_section.descendants:
+        if not isinstance(node, Tag):
+            continue
+        name = node.name
+        if name == "a":
+            href = node.get("href")
+            if isinstance(href, str):
+                documents.append(
+                    LinkDocument(title=node.text.strip(), url=urljoin(base_url, href.strip()))
+                )
+        elif id(node.parent) not in containers:
+            continue
+        elif name == "dt":
+            key = node.text.strip()
+            table_data[key] = ""
+            pending_keys.append(key)
+        elif name == "dd":
+            value = node.text.strip()
+            for key in pending_keys:
+                table_data[key] = value
+            pending_keys.clear()
+        elif name == "div":
+            containers.add(id(node))
+
+    table_data["閲覧書類"] = documents
+    return table_data
+
+
+def create_basic_information(details_section: Tag, base_url: str) -> BasicInformation:
+    """法人・団体情報詳細セクションから BasicInformation インスタンスを作成"""
+    return BasicInformation.from_dict(parse_details_section(details_section, base_url))
 
 
 def is_tokyo_detail_url(url: str) -> bool:
@@ -64,20 +75,32 @@ def is_tokyo_detail_url(url: str) -> bool:
 
 
 def scrape_tokyo_detail(url: str, associate_name="") -> BasicInformation:
-    """東京都の法人・団体情報詳細を取得"""
+    """
+    東京都の法人・団体情報詳細を取得
+
+    ※詳細ページの取得に失敗した場合はFetchErrorを送出する（解析に失敗した場合は空のデータを返す）
+    """
     # url = "https://www.seikatubunka.metro.tokyo.lg.jp/houjin/npo_houjin/list/ledger/0007570.html"
     empty_data = BasicInformation.emptyInstance()
     if not is_tokyo_detail_url(url):
         return empty_data
     try:
         # HTMLの取得と解析
-        soup = scrape(url)
-
-        # 法人・団体情報詳細セクションの取得
-        details_section = soup.find("dl", class_="Corp_detail_dl")
-        basic_info = create_basic_information(details_section, url)  # type: ignore
+        with metrics.stage("tokyo_fetch"):
+            content = fetch_html_once(url)
+        with metrics.stage("tokyo_parse"):
+            soup = parse_html(content)
+
+            # 法人・団体情報詳細セクションの取得
+            details_section = soup.find("dl", class_="Corp_detail_dl")
+            basic_info = create_basic_information(details_section, url)  # type: ignore
         return basic_info
+    except FetchError:
+        # 取得の失敗は呼び出し元で後から再試行する
+        metrics.inc("fetch_failures_total", source="tokyo")
+        raise
     except Exception as e:
+        metrics.inc("parse_failures_total", source="tokyo")
         base_message = "東京都の法人・団体情報詳細ページのスクレイピングに失敗しました。"
-        logger.error(f"{base_message} {associate_name=}, {url=}, {e=}")
+        logger.error("%s associate_name=%r, url=%r, e=%r", base_message, associate_name, url, e)
         return empty_data
@@ -0,0 +1,145 @@
+"""
+定款に記載された目的、特定非営利活動に係る事業、活動分野の全文検索インデックス（SQLite FTS5）
+
+文字列は`standardize_text_for_key`で標準化した上で文字単位のN-gramに分割し、空白区切りで保存する。
+検索語も同じようにN-gramに分割し、連続するN-gramのフレーズとして検索するため、部分一致で検索できる。
+"""
+
+import sqlite3
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+from approved_npo_data.csv.csv_row import AllNpoDataRow
+from approved_npo_data.scraping.npoportal_detail.Information_model import Information
+from approved_npo_data.util.file_operations import SqliteWriter
+from approved_npo_data.util.text_format import to_ngrams
+
+SEARCH_TABLE = "npo_search"
+
+# N-gramの文字数
+NGRAM_SIZE = 2
+
+PURPOSE_COLUMN = "purpose"
+BUSINESS_COLUMN = "business"
+ACTIVITY_FIELDS_COLUMN = "activity_fields"
+SEARCH_COLUMNS = (PURPOSE_COLUMN, BUSINESS_COLUMN, ACTIVITY_FIELDS_COLUMN)
+
+
+def to_index_text(*texts: str) -> str:
+    """インデックスに保存する文字列（空白区切りのN-gram）に変換する"""
+    # 別の文字列をまたいだN-gramが作られないように、文字列毎に分割する
+    return " ".join(" ".join(to_ngrams(text, NGRAM_SIZE)) for text in texts if text)
+
+
+def to_match_query(query: str, column: str | None = None) -> str:
+    """
+    検索語をFTS5の検索式に変換する
+
+    空白で区切られた検索語はすべて含むものを検索する（AND検索）
+    """
+    phrases = []
+    for term in query.split():
+        ngrams = to_ngrams(term, NGRAM_SIZE)
+        if not ngrams:
+            continue
+        if len(ngrams) < NGRAM_SIZE:
+            # N文字未満の場合は前方一致で検索する
+            phrase = '"' + ngrams[0].replace('"', '""') + '" *'
+        else:
+            full_ngrams = ngrams[: len(ngrams) - NGRAM_SIZE + 1]
+            phrase = '"' + " ".join(gram.replace('"', '""') for gram in full_ngrams) + '"'
+        phrases.append(f"{column} : {phrase}" if column else phrase)
+    return " AND ".join(phrases)
+
+
+def activity_fields_of(row: AllNpoDataRow) -> list[str]:
+    """全NPO法人情報の活動分野（活動分野１～２０）を取得する"""
+    return [getattr(row, f"activity_area_{i}") for i in range(1, 21)]
+
+
+def build_search_index(
+    output_path: Path,
+    all_npo_data: Iterable[AllNpoDataRow],
+    informations: Mapping[str, Information],
+) -> None:
+    """
+    全文検索インデックスを作成する
+
+    Args:
+        output_path (Path): 出力先のファイルのパス
+        all_npo_data (Iterable[AllNpoDataRow]): 全NPO法人情報
+        informations (Mapping[str, Information]): 法人番号をキーとしたNPOポータルの詳細ページの情報
+            ※全NPO法人情報と異なる内容の場合は両方の内容で検索できるようにする
+    """
+
+    def rows():
+        for row in all_npo_data:
+            information = informations.get(row.corporate_number, Information.emptyInstance())
+            yield (
+                row.corporate_number,
+                to_index_text(
+                    row.purpose_described_in_the_articles,
+                    information.articles_of_incorporation_purpose,
+                ),
+                to_index_text(
+                    row.specific_non_profit_activities,
+                    information.specified_nonprofit_activities,
+                ),
+                to_index_text(*activity_fields_of(row), information.activity_fields),
+            )
+
+    writer = SqliteWriter(output_path)
+    try:
+        # ASCIIのトークナイザは空白等のASCIIの記号のみで区切るため、N-gramがそのままトークンになる
+        writer.create_fts_table(
+            SEARCH_TABLE, ["corporate_number", *SEARCH_COLUMNS], ["corporate_number"], "ascii"
+        )
+        writer.insert(SEARCH_TABLE, rows())
+        with writer.connection:
+            writer.connection.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES('optimize')"
+            )
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+
+class SearchIndex:
+    """全文検索インデックスを検索する"""
+
+    def __init__(self, path: Path):
+        """
+        コンストラクタ
+
+        Args:
+            path (Path): build_search_index()で作成したファイルのパス
+        """
+        self.path = path
+        self.connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+
+    def search(self, query: str, column: str | None = None, limit: int = 100) -> list[str]:
+        """
+        検索語を含む法人の法人番号を関連度の高い順に返す
+
+        Args:
+            query (str): 検索語（空白で区切った場合はAND検索）
+            column (str | None): 検索対象の列（purpose, business, activity_fields）
+                ※Noneの場合はすべての列
+            limit (int): 最大件数
+        """
+        if column is not None and column not in SEARCH_COLUMNS:
+            raise ValueError(f"不明な列です: {column}")
+        match_query = to_match_query(query, column)
+        if not match_query:
+            return []
+        cursor = self.connection.execute(
+            f"SELECT corporate_number FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH ? "
+            "ORDER BY rank LIMIT ?",
+            (match_query, limit),
+        )
+        return [corporate_number for (corporate_number,) in cursor]
+
+    def close(self) -> None:
+        """ファイルを閉じる"""
+        self.connection.close()
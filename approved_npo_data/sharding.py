@@ -0,0 +1,208 @@
+"""
+実行の分割（シャーディング）
+
+法人番号のハッシュ値で名簿の行を決定的にN個のシャードに分割し、複数のプロセス・ホストで分担して
+スクレイピングする。各シャードは`shards/{i}of{N}`フォルダに出力し、merge_shard_outputs()で
+1つの出力CSV（名簿の順序）に結合する。
+"""
+
+import csv
+import hashlib
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+from approved_npo_data.csv.csv_row import ApprovedNpoRow, OutputApprovedNpoRow
+from approved_npo_data.run_progress import get_roster_digest
+from approved_npo_data.util.file_operations import list_output_paths
+
+logger = getLogger(__name__)
+
+# シャード毎の出力先のフォルダ名
+SHARDS_DIR_NAME = "shards"
+
+# シャードの出力先のフォルダ名（`{i}of{N}`）
+shard_dir_name_pattern = re.compile(r"^(\d+)of(\d+)$")
+
+
+def shard_index(corporate_number: str, count: int) -> int:
+    """
+    法人番号が属するシャードの番号（1～count）
+
+    ※プロセス・ホストによらず同じ値になるように、組み込みのhash()ではなくSHA-256を使用する
+    """
+    digest = hashlib.sha256(corporate_number.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+@dataclass(frozen=True)
+class Shard:
+    """シャード（count個に分割したうちのindex番目）"""
+
+    index: int
+    """シャードの番号（1始まり）"""
+
+    count: int
+    """シャードの数"""
+
+    def __post_init__(self):
+        """番号の範囲を検証する"""
+        if not 1 <= self.index <= self.count:
+            raise ValueError(f"シャードの番号は1～{self.count}で指定してください: {self.index}")
+
+    @classmethod
+    def parse(cls, text: str) -> "Shard":
+        """`i/N`形式（例: `1/4`）の文字列から作成する"""
+        index, sep, count = text.partition("/")
+        if not sep:
+            raise ValueError(f"シャードは`i/N`形式で指定してください: {text}")
+        return cls(int(index), int(count))
+
+    @property
+    def name(self) -> str:
+        """シャードの名前（出力先のフォルダ名）"""
+        return f"{self.index}of{self.count}"
+
+    def contains(self, corporate_number: str) -> bool:
+        """法人番号がこのシャードに属するか"""
+        return shard_index(corporate_number, self.count) == self.index
+
+    def get_base_path(self, base_path: Path) -> Path:
+        """シャードの出力先のベースパス（get_output_path()に渡す）"""
+        return base_path / SHARDS_DIR_NAME / self.name
+
+
+def parse_shard_dir_name(name: str) -> Shard | None:
+    """フォルダ名（例: `1of4`）からシャードを作成する（シャードの出力先でない場合はNone）"""
+    match = shard_dir_name_pattern.match(name)
+    if not match:
+        return None
+    try:
+        return Shard(int(match[1]), int(match[2]))
+    except ValueError:
+        return None
+
+
+def find_latest_shard_outputs(base_path: Path) -> dict[Shard, Path]:
+    """シャード毎の最新の出力CSVのパスを返す（出力CSVがないシャードは含まない）"""
+    shards_path = base_path / SHARDS_DIR_NAME
+    if not shards_path.is_dir():
+        return {}
+    outputs = {}
+    for shard_path in shards_path.iterdir():
+        shard = parse_shard_dir_name(shard_path.name)
+        if shard is None:
+            continue
+        if paths := list_output_paths(shard_path):
+            outputs[shard] = paths[0]
+    return outputs
+
+
+def find_shard_outputs(base_path: Path) -> list[Path]:
+    """
+    最新の実行の各シャードの最新の出力CSVのパスをシャードの番号順に返す
+
+    最新の出力CSVのシャードと同じ数（N）に分割したシャードのみを対象とし、以前に別の数で分割した
+    シャードの出力は結合しない。1～Nのいずれかのシャードの出力CSVがない場合や、シャードの名簿が
+    一致しない（別の実行の出力である）場合はValueErrorを送出する。
+    """
+    outputs = find_latest_shard_outputs(base_path)
+    if not outputs:
+        return []
+    count = max(outputs, key=lambda shard: outputs[shard].name).count
+    ignored = sorted(shard.name for shard in outputs if shard.count != count)
+    if ignored:
+        logger.warning(
+            "シャードの数が異なる出力は結合しません。 count=%r, ignored=%r", count, ignored
+        )
+
+    shards = [Shard(index, count) for index in range(1, count + 1)]
+    missing = [shard.name for shard in shards if shard not in outputs]
+    if missing:
+        raise ValueError(f"出力CSVがないシャードがあります: {missing}")
+    output_paths = [outputs[shard] for shard in shards]
+
+    roster_digests = {
+        output_path: get_roster_digest(read_roster(roster_path))
+        for output_path in output_paths
+        if (roster_path := find_roster_path([output_path])) is not None
+    }
+    if len(set(roster_digests.values())) > 1:
+        raise ValueError(f"シャードの名簿が一致しません（別の実行の出力です）: {roster_digests}")
+    return output_paths
+
+
+def find_roster_path(output_paths: Iterable[Path]) -> Path | None:
+    """
+    シャードの出力CSVと同じフォルダの最新の名簿のCSVのパスを返す
+
+    ※名簿のCSVは各シャードが分割前のすべての行を出力している
+    """
+    roster_paths = [
+        path
+        for output_path in output_paths
+        for path in list_output_paths(output_path.parent.parent, "approved_npo_data")
+    ]
+    return max(roster_paths, key=lambda path: path.name, default=None)
+
+
+def read_roster(path: Path) -> list[str]:
+    """名簿のCSVから法人番号を名簿の順序で読み込む"""
+    with open(path, encoding="utf-8", newline="") as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        return [ApprovedNpoRow(*values).corporate_number for values in reader if values]
+
+
+def read_output_csv(path: Path) -> list[OutputApprovedNpoRow]:
+    """出力CSVを読み込む（ヘッダがOutputApprovedNpoRowと異なる場合はValueError）"""
+    with open(path, encoding="utf-8", newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header != OutputApprovedNpoRow.get_csv_header():
+            raise ValueError(f"出力CSVのヘッダが一致しません: {path}")
+        return [OutputApprovedNpoRow(*values) for values in reader if values]
+
+
+def has_detail(row: OutputApprovedNpoRow) -> bool:
+    """詳細ページの情報を取得できた行か"""
+    return bool(row.information_corporate_name)
+
+
+def merge_shard_outputs(
+    output_paths: Sequence[Path], roster: Sequence[str]
+) -> tuple[list[OutputApprovedNpoRow], list[str]]:
+    """
+    シャードの出力CSVを1つに結合する
+
+    Args:
+        output_paths (Sequence[Path]): シャードの出力CSVのパス
+        roster (Sequence[str]): 名簿の順序の法人番号
+
+    Returns:
+        tuple[list[OutputApprovedNpoRow], list[str]]: 名簿の順序の出力データと、どのシャードにも
+            含まれていなかった法人番号
+            ※名簿にない法人は法人番号の順で最後に追加する
+            ※同じ法人が複数のシャードに含まれる場合は、詳細ページの情報を取得できた行を優先する
+    """
+    rows: dict[str, OutputApprovedNpoRow] = {}
+    for path in output_paths:
+        for row in read_output_csv(path):
+            corporate_number = row.approved_npo_corporate_number
+            existing = rows.get(corporate_number)
+            if existing is not None:
+                logger.warning(
+                    "同じ法人が複数のシャードに含まれています。 corporate_number=%r, path=%r",
+                    corporate_number,
+                    path,
+                )
+                if has_detail(existing) or not has_detail(row):
+                    continue
+            rows[corporate_number] = row
+
+    missing = [corporate_number for corporate_number in roster if corporate_number not in rows]
+    merged = [rows.pop(corporate_number) for corporate_number in roster if corporate_number in rows]
+    merged.extend(rows[corporate_number] for corporate_number in sorted(rows))
+    return merged, missing
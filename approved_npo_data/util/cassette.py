@@ -0,0 +1,90 @@
+"""HTTPのリクエストとレスポンスを記録し、ネットワークに接続せずに再生する"""
+
+import json
+import threading
+from logging import getLogger
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from approved_npo_data.util.content_store import ContentStore, sha256_hex
+
+logger = getLogger(__name__)
+
+
+class CassetteMissError(requests.ConnectionError):
+    """再生時に記録が存在しない"""
+
+
+class Cassette:
+    """
+    HTTPのレスポンスを記録・再生するストア
+
+    レスポンスのメタデータは`{root}/requests/{URLのハッシュ値の先頭2文字}/{URLのハッシュ値}.json`に、
+    本文は`ContentStore`に保存する。同じURLを再度記録した場合は上書きする。
+    """
+
+    RECORD = "record"
+    REPLAY = "replay"
+
+    def __init__(self, root: Path, mode: str):
+        """
+        コンストラクタ
+
+        Args:
+            root (Path): 記録の保存先
+            mode (str): 記録する場合は"record"、再生する場合は"replay"
+        """
+        if mode not in (self.RECORD, self.REPLAY):
+            raise ValueError(f"不明なモードです: {mode}")
+        self.root = root
+        self.mode = mode
+        self.bodies = ContentStore(root)
+
+    @property
+    def is_replaying(self) -> bool:
+        """再生モードか"""
+        return self.mode == self.REPLAY
+
+    def entry_path(self, url: str) -> Path:
+        """URLに対応するメタデータの保存先のパスを返す"""
+        key = sha256_hex(url.encode("utf-8"))
+        return self.root / "requests" / key[:2] / f"{key}.json"
+
+    def save(self, url: str, response: requests.Response) -> None:
+        """レスポンスを記録する"""
+        stored = self.bodies.put(response.content)
+        entry = {
+            "url": url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "sha256": stored.sha256,
+        }
+        path = self.entry_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, mode="w", encoding="utf-8") as file:
+            json.dump(entry, file, ensure_ascii=False, indent=2)
+        tmp_path.replace(path)
+
+    def load(self, url: str) -> requests.Response:
+        """記録したレスポンスを返す。記録が存在しない場合はCassetteMissErrorを送出する"""
+        path = self.entry_path(url)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+            content = self.bodies.path_for(entry["sha256"]).read_bytes()
+        except (OSError, ValueError, KeyError) as e:
+            raise CassetteMissError(f"記録が存在しません: {url}") from e
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = entry["status_code"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        response._content = content
+        return response
@@ -0,0 +1,192 @@
+"""
+ホスト毎のサーキットブレーカー
+
+ホストへのリクエストの失敗率が閾値を超えた場合はサーキットを開き、一定時間リクエストを送信せずに
+すぐに失敗させる（停止しているサイトにリクエストを送り続けないようにする）。
+一定時間後は試行（half-open）として少数のリクエストのみ送信し、成功した場合はサーキットを閉じる。
+
+- closed: 通常どおりリクエストを送信する
+- open: リクエストを送信せずにCircuitOpenErrorを送出する
+- half_open: 試行のリクエストのみ送信する
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from logging import getLogger
+
+import requests
+
+from approved_npo_data.util.metrics import metrics
+
+logger = getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.RequestException):
+    """サーキットブレーカーが開いているため、リクエストを送信しなかった"""
+
+    def __init__(self, host: str, retry_after: float):
+        """
+        コンストラクタ
+
+        Args:
+            host (str): ホスト
+            retry_after (float): 試行のリクエストを送信できるまでの秒数
+        """
+        super().__init__(
+            f"サーキットブレーカーが開いているため、リクエストを送信しませんでした: "
+            f"host={host}, retry_after={retry_after:.1f}"
+        )
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """1ホスト分のサーキットブレーカー"""
+
+    def __init__(
+        self,
+        host: str,
+        failure_rate: float,
+        window_size: int,
+        min_requests: int,
+        open_seconds: float,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        コンストラクタ
+
+        Args:
+            host (str): ホスト
+            failure_rate (float): サーキットを開く失敗率（0～1）
+            window_size (int): 失敗率を計算する直近のリクエスト数
+            min_requests (int): 失敗率を計算する最小のリクエスト数（これ未満の場合は開かない）
+            open_seconds (float): サーキットを開いてから試行のリクエストを送信するまでの秒数
+            half_open_max_calls (int): 試行（half-open）で同時に送信するリクエスト数
+            clock (Callable[[], float]): 現在時刻（秒）を返す関数
+        """
+        self.host = host
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._state = CLOSED
+        # 直近のリクエストの結果（Trueが成功）
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """現在の状態（closed、open、half_open）"""
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def retry_after(self) -> float:
+        """試行のリクエストを送信できるまでの秒数（開いていない場合は0）"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(self._opened_at + self.open_seconds - self.clock(), 0.0)
+
+    def allow(self) -> bool:
+        """リクエストを送信してよいか（half-openの場合は試行のリクエスト数を数える）"""
+        with self._lock:
+            self._update_state()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def record(self, success: bool) -> None:
+        """リクエストの結果を記録する"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if success:
+                    self._transition(CLOSED)
+                else:
+                    self._transition(OPEN)
+                return
+            if self._state == OPEN:
+                # 開く前に送信したリクエストの結果は無視する
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            total = len(self._outcomes)
+            if total >= self.min_requests and failures / total >= self.failure_rate:
+                self._transition(OPEN)
+
+    def _update_state(self) -> None:
+        if self._state == OPEN and self.clock() >= self._opened_at + self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        previous, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = self.clock()
+        elif state == HALF_OPEN:
+            self._half_open_calls = 0
+        else:
+            self._outcomes.clear()
+        metrics.set_gauge("circuit_breaker_open", 0 if state == CLOSED else 1, host=self.host)
+        log = logger.warning if state == OPEN else logger.info
+        log(
+            "サーキットブレーカーの状態が変わりました。 host=%r, previous=%r, state=%r",
+            self.host,
+            previous,
+            state,
+        )
+
+
+class HostCircuitBreakers:
+    """ホスト毎のサーキットブレーカー（同じ設定で必要になった時に作成する）"""
+
+    def __init__(
+        self,
+        failure_rate: float,
+        window_size: int,
+        min_requests: int,
+        open_seconds: float,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        コンストラクタ
+
+        ※引数はCircuitBreakerと同じ
+        """
+        self._settings = (failure_rate, window_size, min_requests, open_seconds)
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> CircuitBreaker:
+        """ホストのサーキットブレーカーを取得する"""
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    host,
+                    *self._settings,
+                    half_open_max_calls=self.half_open_max_calls,
+                    clock=self.clock,
+                )
+            return breaker
+
+    def states(self) -> dict[str, str]:
+        """ホスト → 現在の状態"""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.host: breaker.state for breaker in breakers}
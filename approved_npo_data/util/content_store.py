@@ -0,0 +1,113 @@
+"""コンテンツのハッシュ値をキーとしてファイルを保存するストア"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+logger = getLogger(__name__)
+
+
+def sha256_hex(content: bytes) -> str:
+    """コンテンツのSHA-256ハッシュ値を16進数文字列で返す"""
+    return hashlib.sha256(content).hexdigest()
+
+
+@dataclass(frozen=True)
+class StoredContent:
+    """ストアに保存されたコンテンツ"""
+
+    sha256: str
+    """コンテンツのSHA-256ハッシュ値"""
+
+    path: Path
+    """保存先のパス"""
+
+
+class ContentStore:
+    """
+    コンテンツアドレス方式のファイルストア
+
+    ファイルは`{root}/objects/{ハッシュ値の先頭2文字}/{ハッシュ値}{拡張子}`に保存される。
+    同じ内容のファイルは（拡張子が異なっても）1つしか保存されず、取得元のURLとの対応は`{root}/index.json`に記録する。
+    """
+
+    INDEX_FILE_NAME = "index.json"
+
+    def __init__(self, root: Path):
+        """
+        コンストラクタ
+
+        Args:
+            root (Path): ストアのルートディレクトリ
+        """
+        self.root = root
+        self._lock = threading.Lock()
+        self._index: dict[str, dict[str, str]] = self._load_index()
+
+    @property
+    def index_path(self) -> Path:
+        """URLとコンテンツの対応を記録するファイルのパス"""
+        return self.root / self.INDEX_FILE_NAME
+
+    def _load_index(self) -> dict[str, dict[str, str]]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(
+                "インデックスを読み込めませんでした。 self.index_path=%r, e=%r", self.index_path, e
+            )
+            return {}
+
+    def path_for(self, sha256: str, suffix: str = "") -> Path:
+        """ハッシュ値に対応する保存先のパスを返す"""
+        return self.root / "objects" / sha256[:2] / f"{sha256}{suffix}"
+
+    def find(self, sha256: str) -> Path | None:
+        """ハッシュ値に対応する保存済みのファイルのパスを拡張子によらず返す。存在しない場合はNone"""
+        paths = self.path_for(sha256).parent.glob(f"{sha256}*")
+        return min((path for path in paths if not path.name.endswith(".tmp")), default=None)
+
+    def put(self, content: bytes, suffix: str = "") -> StoredContent:
+        """
+        コンテンツを保存する。同じ内容のファイルが存在する場合は書き込まない
+
+        ※同じ内容のファイルが別の拡張子で保存されている場合は、そのファイルを返す
+        """
+        sha256 = sha256_hex(content)
+        path = self.find(sha256)
+        if path is None:
+            path = self.path_for(sha256, suffix)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(content)
+            tmp_path.replace(path)
+        return StoredContent(sha256=sha256, path=path)
+
+    def lookup(self, url: str) -> StoredContent | None:
+        """URLに対応する保存済みのコンテンツを返す。ファイルが存在しない場合はNoneを返す"""
+        with self._lock:
+            entry = self._index.get(url)
+        if entry is None:
+            return None
+        stored = StoredContent(sha256=entry["sha256"], path=Path(entry["path"]))
+        return stored if stored.path.exists() else None
+
+    def record(self, url: str, stored: StoredContent) -> None:
+        """URLと保存済みのコンテンツの対応を記録する"""
+        with self._lock:
+            self._index[url] = {"sha256": stored.sha256, "path": str(stored.path)}
+
+    def save_index(self) -> None:
+        """URLとコンテンツの対応をファイルに書き込む"""
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".json.tmp")
+            with open(tmp_path, mode="w", encoding="utf-8") as file:
+                json.dump(self._index, file, ensure_ascii=False, indent=2)
+            tmp_path.replace(self.index_path)
@@ -1,5 +1,9 @@
 """日時関連の関数群"""
 
+import re
+import unicodedata
+from datetime import date
+
 
 def simple_format_time(duration: int | float) -> str:
     """
@@ -8,3 +12,36 @@ def simple_format_time(duration: int | float) -> str:
     hours, remainder = divmod(duration, 3600)
     minutes, seconds = divmod(remainder, 60)
     return f"{int(hours)}時間{int(minutes)}分{int(seconds)}秒"
+
+
+# 和暦の元年（西暦）
+ERA_START_YEARS = {"令和": 2018, "R": 2018, "平成": 1988, "H": 1988, "昭和": 1925, "S": 1925}
+
+# 西暦の日付のパターン（例: 2021/4/1、2021-04-01、2021.4.1、2021年4月1日）
+western_date_pattern = re.compile(r"(\d{4})\s*[/\-.年]\s*(\d{1,2})\s*[/\-.月]\s*(\d{1,2})\s*日?")
+
+# 和暦の日付のパターン（例: 令和3年4月1日、R3.4.1、平成元年5月1日）
+japanese_date_pattern = re.compile(
+    r"(令和|平成|昭和|[RHS])\s*(\d{1,2}|元)\s*[/\-.年]\s*(\d{1,2})\s*[/\-.月]\s*(\d{1,2})\s*日?"
+)
+
+
+def to_iso_date(text: str) -> str:
+    """
+    日付の文字列をISO 8601形式（YYYY-MM-DD）に変換する
+
+    西暦と和暦（令和・平成・昭和）に対応し、日付として解釈できない場合は空文字を返す
+    """
+    text = unicodedata.normalize("NFKC", text).strip()
+    if match := western_date_pattern.search(text):
+        year, month, day = (int(value) for value in match.groups())
+    elif match := japanese_date_pattern.search(text):
+        era, era_year, month_text, day_text = match.groups()
+        year = ERA_START_YEARS[era] + (1 if era_year == "元" else int(era_year))
+        month, day = int(month_text), int(day_text)
+    else:
+        return ""
+    try:
+        return date(year, month, day).isoformat()
+    except ValueError:
+        return ""
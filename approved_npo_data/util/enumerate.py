@@ -19,6 +19,6 @@ def controlled_enumerate(
         if max_items is not None and i >= max_items:
             break
         if i % log_interval == 0:
-            logger.info(f"{i + 1}/{all_size}")
+            logger.info("%s/%s", i + 1, all_size)
 
         yield i, d
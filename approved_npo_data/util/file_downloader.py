@@ -6,12 +6,27 @@ import tempfile
 from logging import getLogger
 from pathlib import Path
 
-import requests
-from requests.exceptions import RequestException
+from requests.exceptions import HTTPError, RequestException
+
+from approved_npo_data.util.http_client import http_get
 
 logger = getLogger(__name__)
 
 
+def download_content(url: str, **kwargs) -> bytes:
+    """
+    Download a file from a URL and return its content.
+
+    ※kwargsはhttp_getにそのまま渡される
+    """
+    try:
+        response = http_get(url, **kwargs)
+        response.raise_for_status()
+    except RequestException as e:
+        raise Exception(f"Failed to download the file: {e}") from e
+    return response.content
+
+
 def download_file(url: str, save_directory_path: Path | None = None) -> Path:
     """
     Download a file from a URL and save it to a directory.
@@ -23,13 +38,19 @@ def download_file(url: str, save_directory_path: Path | None = None) -> Path:
     file_name = url.split("/")[-1]
     save_path = save_directory_path / file_name
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-    except RequestException as e:
-        raise Exception(f"Failed to download the file: {e}") from e
+    content = download_content(url)
 
     with open(save_path, "wb") as file:
-        file.write(response.content)
-    logger.debug(f"Zip file downloaded and saved to: {save_path}")
+        file.write(content)
+    logger.debug("Zip file downloaded and saved to: %s", save_path)
     return save_path
+
+
+def is_not_found_error(error: BaseException) -> bool:
+    """ダウンロードの失敗がHTTP 404によるものかを判定する"""
+    cause = error.__cause__
+    return (
+        isinstance(cause, HTTPError)
+        and cause.response is not None
+        and cause.response.status_code == 404
+    )
@@ -1,12 +1,16 @@
 """ファイル操作に関するユーティリティ関数群"""
 
 import csv
+import re
+import sqlite3
 import tempfile
 import zipfile
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from dataclasses import fields
 from datetime import datetime
 from logging import getLogger
 from pathlib import Path
+from typing import Any, get_origin
 
 from approved_npo_data.util.model_base import ModelBase
 
@@ -21,7 +25,7 @@ def extract_zip_file(zip_path: Path, extract_to: Path | None = None) -> Path:
     extract_to.mkdir(parents=True, exist_ok=True)
     with zipfile.ZipFile(zip_path, "r") as zip_ref:
         zip_ref.extractall(extract_to)
-    logger.debug(f"Files extracted to: {extract_to}")
+    logger.debug("Files extracted to: %s", extract_to)
     return extract_to
 
 
@@ -31,17 +35,129 @@ def save_csv(data: Sequence[ModelBase], output_path: Path) -> None:
         # NOTE: データが空の場合空のListが渡ってくるため、データの型が取れずヘッダが作成できない
         raise ValueError("空のデータでCSVを保存することはできません")
 
-    with open(output_path, mode="w", newline="", encoding="utf-8") as file:
+    # 読み込む側から書き込み途中のファイルが見えないように、一時ファイルに書き込んでから置き換える
+    tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+    with open(tmp_path, mode="w", newline="", encoding="utf-8") as file:
         writer = csv.writer(file, quoting=csv.QUOTE_ALL)
         writer.writerow(type(data[0]).get_csv_header())
         writer.writerows(row.to_csv_row() for row in data)
-    logger.debug(f"Data saved to: {output_path}")
+    tmp_path.replace(output_path)
+    logger.debug("Data saved to: %s", output_path)
 
 
-def get_output_path(base_path: Path, prefix: str = "output") -> Path:
+def get_model_columns(model: type[ModelBase]) -> list[str]:
+    """
+    SQLiteのテーブルの列名（フィールド名）を取得する
+
+    ※リストのフィールドは別のテーブルに保存するため含めない
+    """
+    return [field.name for field in fields(model) if get_origin(field.type) is not list]
+
+
+class SqliteWriter:
+    """
+    SQLiteファイルでデータを保存する
+
+    書き込み中は一時ファイルに書き込み、close()で出力先のファイルに置き換えるため、
+    読み込む側から書き込み途中のファイルが見えることはない
+    """
+
+    def __init__(self, output_path: Path):
+        """
+        コンストラクタ
+
+        Args:
+            output_path (Path): 出力先のファイルのパス
+        """
+        self.output_path = output_path
+        self.tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+        self.tmp_path.unlink(missing_ok=True)
+        self.connection = sqlite3.connect(self.tmp_path)
+        # 一時ファイルのため、書き込み中の耐障害性よりも書き込み速度を優先する
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self._columns: dict[str, list[str]] = {}
+
+    def create_table(self, table: str, columns: Sequence[str]) -> None:
+        """テーブルを作成する（列の型はすべてTEXT）"""
+        definition = ", ".join(f'"{column}" TEXT' for column in columns)
+        with self.connection:
+            self.connection.execute(f'CREATE TABLE "{table}" ({definition})')
+        self._columns[table] = list(columns)
+
+    def create_fts_table(
+        self,
+        table: str,
+        columns: Sequence[str],
+        unindexed: Sequence[str] = (),
+        tokenize: str = "unicode61",
+    ) -> None:
+        """
+        全文検索（FTS5）のテーブルを作成する
+
+        Args:
+            table (str): テーブル名
+            columns (Sequence[str]): 列名
+            unindexed (Sequence[str]): 検索の対象にしない列名
+            tokenize (str): トークナイザ
+        """
+        definition = ", ".join(
+            f'"{column}"' + (" UNINDEXED" if column in unindexed else "") for column in columns
+        )
+        with self.connection:
+            self.connection.execute(
+                f'CREATE VIRTUAL TABLE "{table}" '
+                f"USING fts5({definition}, tokenize = '{tokenize}')"
+            )
+        self._columns[table] = list(columns)
+
+    def insert(self, table: str, rows: Iterable[Sequence[Any]]) -> None:
+        """1つのトランザクションでまとめて行を追加する"""
+        columns = self._columns[table]
+        placeholders = ", ".join("?" for _ in columns)
+        with self.connection:
+            self.connection.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+
+    def create_index(self, table: str, columns: Sequence[str]) -> None:
+        """インデックスを作成する"""
+        name = f"idx_{table}_{'_'.join(columns)}"
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        with self.connection:
+            self.connection.execute(f'CREATE INDEX "{name}" ON "{table}" ({column_list})')
+
+    def close(self) -> None:
+        """統計情報を更新してファイルを閉じ、出力先のファイルに置き換える"""
+        with self.connection:
+            self.connection.execute("ANALYZE")
+        self.connection.close()
+        self.tmp_path.replace(self.output_path)
+        logger.debug("Data saved to: %s", self.output_path)
+
+    def abort(self) -> None:
+        """ファイルを閉じ、書き込み途中の一時ファイルを削除する"""
+        self.connection.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+def get_output_path(base_path: Path, prefix: str = "output", suffix: str = ".csv") -> Path:
     """出力ファイルのパスを取得する"""
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     output_base_path = base_path / "output"
     output_base_path.mkdir(parents=True, exist_ok=True)
 
-    return output_base_path / f"{prefix}_{timestamp}.csv"
+    return output_base_path / f"{prefix}_{timestamp}{suffix}"
+
+
+def list_output_paths(base_path: Path, prefix: str = "output", suffix: str = ".csv") -> list[Path]:
+    """get_output_path()で作成した出力ファイルのパスを新しい順に返す"""
+    pattern = re.compile(rf"^{re.escape(prefix)}_\d{{14}}{re.escape(suffix)}$")
+    output_base_path = base_path / "output"
+    if not output_base_path.is_dir():
+        return []
+    paths = [path for path in output_base_path.iterdir() if pattern.match(path.name)]
+    return sorted(paths, key=lambda path: path.name, reverse=True)
+
+
+def get_output_timestamp(path: Path) -> datetime:
+    """get_output_path()で作成した出力ファイルのパスから作成日時を取得する"""
+    return datetime.strptime(path.stem.rsplit("_", 1)[-1], "%Y%m%d%H%M%S")
@@ -0,0 +1,111 @@
+"""HTTPリクエストを送信するための関数群"""
+
+from time import perf_counter
+from urllib.parse import urlparse
+
+import requests
+
+from approved_npo_data.util.cassette import Cassette
+from approved_npo_data.util.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HostCircuitBreakers,
+)
+from approved_npo_data.util.metrics import metrics
+
+# 記録・再生に使用するカセット（Noneの場合は記録・再生しない）
+_cassette: Cassette | None = None
+
+# ホスト毎のサーキットブレーカー（Noneの場合は使用しない）
+_circuit_breakers: HostCircuitBreakers | None = None
+
+
+def set_cassette(cassette: Cassette | None) -> None:
+    """
+    HTTPのレスポンスの記録・再生に使用するカセットを設定する
+
+    Noneを渡した場合は記録・再生を終了する
+    """
+    global _cassette
+    _cassette = cassette
+
+
+def get_cassette() -> Cassette | None:
+    """設定されているカセットを返す"""
+    return _cassette
+
+
+def set_circuit_breakers(circuit_breakers: HostCircuitBreakers | None) -> None:
+    """
+    ホスト毎のサーキットブレーカーを設定する
+
+    Noneを渡した場合は使用しない
+    """
+    global _circuit_breakers
+    _circuit_breakers = circuit_breakers
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker | None:
+    """
+    ホストのサーキットブレーカーを返す
+
+    ※設定されていない場合、記録したレスポンスを再生している場合はNone
+    """
+    if _circuit_breakers is None or is_replaying():
+        return None
+    return _circuit_breakers.get(host)
+
+
+def is_failure_status(status_code: int) -> bool:
+    """サーキットブレーカーで失敗とみなすステータスコードか（429、5xx）"""
+    return status_code == 429 or status_code >= 500
+
+
+def is_replaying() -> bool:
+    """記録したレスポンスを再生しているか（ネットワークに接続しないか）"""
+    return _cassette is not None and _cassette.is_replaying
+
+
+def send_get(url: str, **kwargs) -> requests.Response:
+    """カセットの設定に従ってレスポンスを再生、またはリクエストを送信して記録する"""
+    cassette = _cassette
+    if cassette is not None and cassette.is_replaying:
+        return cassette.load(url)
+    response = requests.get(url, **kwargs)
+    if cassette is not None:
+        cassette.save(url, response)
+    return response
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """
+    GETリクエストを送信する
+
+    ホスト毎のリクエスト数、ステータスコード、レイテンシ、転送バイト数を計測する
+    サーキットブレーカーが開いているホストにはリクエストを送信せずにCircuitOpenErrorを送出する
+    ※kwargsはrequests.getにそのまま渡される
+    """
+    host = urlparse(url).netloc
+    breaker = get_circuit_breaker(host)
+    if breaker is not None and not breaker.allow():
+        metrics.inc("http_short_circuits_total", host=host)
+        raise CircuitOpenError(host, breaker.retry_after())
+
+    start = perf_counter()
+    metrics.add_gauge("http_requests_in_flight", 1, host=host)
+    try:
+        response = send_get(url, **kwargs)
+    except requests.RequestException:
+        metrics.inc("http_requests_total", host=host, status="error")
+        if breaker is not None:
+            breaker.record(False)
+        raise
+    finally:
+        metrics.add_gauge("http_requests_in_flight", -1, host=host)
+        metrics.observe("http_request_seconds", perf_counter() - start, host=host)
+
+    if breaker is not None:
+        breaker.record(not is_failure_status(response.status_code))
+    metrics.inc("http_requests_total", host=host, status=response.status_code)
+    metrics.inc("http_response_bytes_total", len(response.content), host=host)
+    return response
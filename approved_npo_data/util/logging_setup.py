@@ -0,0 +1,105 @@
+"""ロギングの設定"""
+
+import atexit
+import threading
+import time
+from logging import WARNING, Filter, Handler, Logger, LogRecord, config, getLogger, root
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from queue import SimpleQueue
+
+
+class RepeatedMessageFilter(Filter):
+    """
+    同じメッセージのログを間引くフィルタ
+
+    ロガー、ログレベル、メッセージのテンプレート（%形式の引数を埋め込む前の文字列）が同じログを
+    1つの種類とみなし、interval_seconds秒毎にburst件まで出力する。
+    間引いた件数は次に出力されるログのメッセージに付与する。
+    ※max_levelより重要度の高いログ（デフォルトではERROR以上）は間引かない
+    """
+
+    def __init__(self, interval_seconds: float = 60, burst: int = 10, max_level: int = WARNING):
+        """
+        コンストラクタ
+
+        Args:
+            interval_seconds (float): 件数を数える期間（秒）
+            burst (int): 期間内に出力するログの件数
+            max_level (int): 間引く対象とする最大のログレベル
+        """
+        super().__init__()
+        self.interval_seconds = interval_seconds
+        self.burst = burst
+        self.max_level = max_level
+        self._lock = threading.Lock()
+        # キー: (期間の開始時刻, 期間内の件数, 間引いた件数)
+        self._counters: dict[tuple[str, int, str], tuple[float, int, int]] = {}
+
+    def filter(self, record: LogRecord) -> bool:
+        """ログを出力するかを判定する"""
+        if record.levelno > self.max_level:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window_start, count, suppressed = self._counters.get(key, (now, 0, 0))
+            if now - window_start >= self.interval_seconds:
+                window_start, count = now, 0
+            if count >= self.burst:
+                self._counters[key] = (window_start, count, suppressed + 1)
+                return False
+            self._counters[key] = (window_start, count + 1, 0)
+        if suppressed:
+            record.msg = f"{record.msg} (同じログを{suppressed}件間引きました)"
+        return True
+
+
+class LogListener(QueueListener):
+    """複数回stopを呼んでもエラーにならないQueueListener"""
+
+    def stop(self) -> None:
+        """キューに残っているログを出力してスレッドを停止する"""
+        if self._thread is not None:
+            super().stop()
+
+
+def _configured_loggers() -> list[Logger]:
+    """ハンドラが設定されているロガーを取得する"""
+    loggers = [root] + [
+        logger for logger in Logger.manager.loggerDict.values() if isinstance(logger, Logger)
+    ]
+    return [logger for logger in loggers if logger.handlers]
+
+
+def setup_logging(
+    config_path: str | Path,
+    sampling_interval_seconds: float = 60,
+    sampling_burst: int = 10,
+) -> LogListener:
+    """
+    設定ファイルを読み込み、ログ出力をバックグラウンドのスレッドで行うように設定する
+
+    設定ファイルのハンドラはQueueListenerに移し、各ロガーにはキューに積むだけの
+    QueueHandlerを設定する。これにより、ログを出力する側はファイルや標準出力への書き込みを待たない。
+    """
+    config.fileConfig(config_path, disable_existing_loggers=False)
+
+    loggers = _configured_loggers()
+    handlers: list[Handler] = []
+    for logger in loggers:
+        handlers.extend(handler for handler in logger.handlers if handler not in handlers)
+
+    queue: SimpleQueue[LogRecord] = SimpleQueue()
+    queue_handler = QueueHandler(queue)
+    queue_handler.addFilter(RepeatedMessageFilter(sampling_interval_seconds, sampling_burst))
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+
+    listener = LogListener(queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    getLogger(__name__).debug("logging listener started. handlers=%s", handlers)
+    return listener
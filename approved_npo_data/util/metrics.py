@@ -0,0 +1,175 @@
+"""処理時間や件数などの計測値を集計する"""
+
+import json
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, ExitStack, contextmanager
+from logging import getLogger
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+logger = getLogger(__name__)
+
+# ラベル（名前と値の組）
+Labels = tuple[tuple[str, str], ...]
+
+# 処理段階の開始・終了時に呼ばれるフック（処理段階の名前を受け取るコンテキストマネージャ）
+StageHook = Callable[[str], AbstractContextManager[None]]
+
+# 各処理段階の処理時間を記録する計測値の名前
+STAGE_SECONDS = "stage_seconds"
+
+
+def to_labels(labels: dict[str, Any]) -> Labels:
+    """ラベルを辞書のキーとして使える形式に変換する"""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """ソート済みの値からパーセンタイル値を線形補間で求める"""
+    if not sorted_values:
+        raise ValueError("空のデータのパーセンタイル値は求められません")
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize_samples(samples: list[float]) -> dict[str, float]:
+    """観測値の統計値を求める"""
+    sorted_samples = sorted(samples)
+    return {
+        "count": len(sorted_samples),
+        "sum": sum(sorted_samples),
+        "min": sorted_samples[0],
+        "max": sorted_samples[-1],
+        "p50": percentile(sorted_samples, 50),
+        "p95": percentile(sorted_samples, 95),
+        "p99": percentile(sorted_samples, 99),
+    }
+
+
+class MetricsRegistry:
+    """
+    計測値のレジストリ
+
+    - counter: 増加のみする値（リクエスト数、転送バイト数など）
+    - gauge: 増減する現在値（処理中のリクエスト数など）
+    - observation: 観測値の分布（処理時間など）
+    いずれも名前とラベルの組ごとに集計する。複数スレッドから使用できる。
+    """
+
+    def __init__(self):
+        """コンストラクタ"""
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._gauges: dict[str, dict[Labels, float]] = {}
+        self._observations: dict[str, dict[Labels, list[float]]] = {}
+        self._stage_hooks: list[StageHook] = []
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """counterを増やす"""
+        key = to_labels(labels)
+        with self._lock:
+            values = self._counters.setdefault(name, {})
+            values[key] = values.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """gaugeを設定する"""
+        with self._lock:
+            self._gauges.setdefault(name, {})[to_labels(labels)] = value
+
+    def add_gauge(self, name: str, delta: float, **labels: Any) -> None:
+        """gaugeを増減する"""
+        key = to_labels(labels)
+        with self._lock:
+            values = self._gauges.setdefault(name, {})
+            values[key] = values.get(key, 0) + delta
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """観測値を記録する"""
+        with self._lock:
+            self._observations.setdefault(name, {}).setdefault(to_labels(labels), []).append(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """ブロックの処理時間（秒）を観測値として記録する"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start, **labels)
+
+    def add_stage_hook(self, hook: StageHook) -> None:
+        """処理段階の開始・終了時に呼ばれるフックを追加する"""
+        self._stage_hooks.append(hook)
+
+    def remove_stage_hook(self, hook: StageHook) -> None:
+        """処理段階の開始・終了時に呼ばれるフックを削除する"""
+        self._stage_hooks.remove(hook)
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """処理段階の処理時間を記録する"""
+        with ExitStack() as stack:
+            for hook in list(self._stage_hooks):
+                stack.enter_context(hook(stage))
+            with self.timer(STAGE_SECONDS, stage=stage):
+                yield
+
+    def counters(self) -> dict[str, dict[Labels, float]]:
+        """counterのスナップショットを取得する"""
+        with self._lock:
+            return {name: dict(values) for name, values in self._counters.items()}
+
+    def gauges(self) -> dict[str, dict[Labels, float]]:
+        """gaugeのスナップショットを取得する"""
+        with self._lock:
+            return {name: dict(values) for name, values in self._gauges.items()}
+
+    def observations(self) -> dict[str, dict[Labels, list[float]]]:
+        """観測値のスナップショットを取得する"""
+        with self._lock:
+            return {
+                name: {labels: list(samples) for labels, samples in values.items()}
+                for name, values in self._observations.items()
+            }
+
+    def summary(self) -> dict[str, Any]:
+        """計測値の集計結果をJSONに変換できる形式で取得する"""
+
+        def entries(values: dict[Labels, Any], convert) -> list[dict[str, Any]]:
+            return [{"labels": dict(labels), **convert(value)} for labels, value in values.items()]
+
+        return {
+            "counters": {
+                name: entries(values, lambda v: {"value": v})
+                for name, values in self.counters().items()
+            },
+            "gauges": {
+                name: entries(values, lambda v: {"value": v})
+                for name, values in self.gauges().items()
+            },
+            "observations": {
+                name: entries(values, summarize_samples)
+                for name, values in self.observations().items()
+            },
+        }
+
+    def write_json(self, output_path: Path) -> None:
+        """集計結果をJSONファイルに出力する"""
+        with open(output_path, mode="w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, ensure_ascii=False, indent=2)
+        logger.debug("Metrics saved to: %s", output_path)
+
+    def reset(self) -> None:
+        """計測値をすべて削除する"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+# アプリケーション全体で共有するレジストリ
+metrics = MetricsRegistry()
@@ -0,0 +1,149 @@
+"""計測値をPrometheus / OpenMetricsのテキスト形式で出力する"""
+
+import bisect
+import threading
+from logging import getLogger
+from pathlib import Path
+
+from approved_npo_data.util.metrics import Labels, MetricsRegistry
+
+logger = getLogger(__name__)
+
+# ヒストグラムのバケットの上限値（秒）
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 出力する計測値の名前の接頭辞
+METRIC_NAME_PREFIX = "approved_npo_data_"
+
+
+def escape_label_value(value: str) -> str:
+    """ラベルの値をエスケープする"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Labels, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    """ラベルを`{name="value",...}`の形式に変換する"""
+    items = labels + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in items) + "}"
+
+
+def format_value(value: float) -> str:
+    """値を文字列に変換する"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_histogram(
+    name: str, values: dict[Labels, list[float]], buckets: tuple[float, ...]
+) -> list[str]:
+    """観測値をヒストグラムの行に変換する"""
+    lines = []
+    for labels, samples in values.items():
+        sorted_samples = sorted(samples)
+        for bucket in (*buckets, float("inf")):
+            count = bisect.bisect_right(sorted_samples, bucket)
+            le = (("le", format_value(bucket)),)
+            lines.append(f"{name}_bucket{format_labels(labels, le)} {count}")
+        lines.append(f"{name}_count{format_labels(labels)} {len(sorted_samples)}")
+        lines.append(f"{name}_sum{format_labels(labels)} {format_value(sum(sorted_samples))}")
+    return lines
+
+
+def render_metrics(
+    registry: MetricsRegistry,
+    openmetrics: bool = False,
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+) -> str:
+    """
+    計測値をテキスト形式に変換する
+
+    openmetrics=Falseの場合はnode_exporterのtextfile collectorが読み込める
+    Prometheusのテキスト形式、Trueの場合はOpenMetrics形式で出力する。
+    ※両者の違いはcounterのTYPE行の名前（`_total`の有無）と末尾の`# EOF`のみ
+    """
+    lines = []
+    for name, values in sorted(registry.counters().items()):
+        full_name = METRIC_NAME_PREFIX + name.removesuffix("_total")
+        type_name = full_name if openmetrics else f"{full_name}_total"
+        lines.append(f"# TYPE {type_name} counter")
+        lines.extend(
+            f"{full_name}_total{format_labels(labels)} {format_value(value)}"
+            for labels, value in values.items()
+        )
+    for name, values in sorted(registry.gauges().items()):
+        full_name = METRIC_NAME_PREFIX + name
+        lines.append(f"# TYPE {full_name} gauge")
+        lines.extend(
+            f"{full_name}{format_labels(labels)} {format_value(value)}"
+            for labels, value in values.items()
+        )
+    for name, values in sorted(registry.observations().items()):
+        full_name = METRIC_NAME_PREFIX + name
+        lines.append(f"# TYPE {full_name} histogram")
+        lines.extend(render_histogram(full_name, values, buckets))
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(registry: MetricsRegistry, output_path: Path, openmetrics=False) -> None:
+    """
+    計測値をファイルに出力する
+
+    読み込み途中のファイルを参照されないように、一時ファイルに書き込んでから置き換える
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+    tmp_path.write_text(render_metrics(registry, openmetrics), encoding="utf-8")
+    tmp_path.replace(output_path)
+
+
+class MetricsFileWriter:
+    """計測値を定期的にファイルに出力する"""
+
+    def __init__(self, registry: MetricsRegistry, output_path: Path, interval_seconds: float):
+        """
+        コンストラクタ
+
+        Args:
+            registry (MetricsRegistry): 出力する計測値のレジストリ
+            output_path (Path): 出力先のファイル（node_exporterの場合は`*.prom`）
+            interval_seconds (float): 出力間隔（秒）
+        """
+        self.registry = registry
+        self.output_path = output_path
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def write(self) -> None:
+        """計測値をファイルに出力する"""
+        try:
+            write_metrics_file(self.registry, self.output_path)
+        except OSError as e:
+            # 計測値の出力に失敗しても処理は継続する
+            logger.warning(
+                "計測値を出力できませんでした。 output_path=%r, e=%r", self.output_path, e
+            )
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            self.write()
+
+    def start(self) -> "MetricsFileWriter":
+        """定期的な出力を開始する"""
+        self.write()
+        self._thread = threading.Thread(target=self._run, name="metrics-file-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """定期的な出力を停止し、最終的な計測値を出力する"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
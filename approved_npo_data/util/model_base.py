@@ -60,7 +60,7 @@ class ModelBase(ABC):  # noqa: B024
         # チェック部分
         unknown_keys = data_keys - field_keys
         if unknown_keys:
-            logger.warning(f"未知のキーが存在します: {', '.join(unknown_keys)}")
+            logger.warning("未知のキーが存在します: %s", ", ".join(unknown_keys))
 
         missing_keys = {
             key
@@ -69,7 +69,7 @@ class ModelBase(ABC):  # noqa: B024
             if not any(f.metadata.get("optional") for f in fields(cls) if f.metadata["key"] == key)
         }
         if missing_keys:
-            logger.warning(f"必要なキーが存在しませんでした: {', '.join(missing_keys)}")
+            logger.warning("必要なキーが存在しませんでした: %s", ", ".join(missing_keys))
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> Self:
@@ -0,0 +1,22 @@
+"""数値のフォーマットを扱う関数群"""
+
+import re
+import unicodedata
+
+# 金額のパターン（△、▲、-は負数を表す）
+amount_pattern = re.compile(r"([△▲\-]?)\s*(\d{1,3}(?:,\d{3})+|\d+)")
+
+
+def parse_amount(text: str) -> int | None:
+    """
+    文字列から金額を取得する
+
+    ※複数の金額が含まれる場合は最後の金額を返す（決算書類の合計列を想定）
+    """
+    text = unicodedata.normalize("NFKC", text)
+    matches = amount_pattern.findall(text)
+    if not matches:
+        return None
+    sign, digits = matches[-1]
+    amount = int(digits.replace(",", ""))
+    return -amount if sign else amount
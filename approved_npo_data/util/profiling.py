@@ -0,0 +1,210 @@
+"""処理段階ごとのプロファイリング"""
+
+import cProfile
+import threading
+import tracemalloc
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+
+from approved_npo_data.util.metrics import MetricsRegistry
+
+logger = getLogger(__name__)
+
+# StageProfilerをインストールしているか
+_profiling = False
+
+
+def is_profiling() -> bool:
+    """処理段階のプロファイリング中か"""
+    return _profiling
+
+
+class _DeferredFuture(Future):
+    """結果を取得する際に、呼び出し元のスレッドで関数を実行するFuture"""
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    def run(self) -> None:
+        """未実行の場合は関数を実行する（取り消された場合は実行しない）"""
+        with self._condition:
+            if self.running() or self.done() or not self.set_running_or_notify_cancel():
+                return
+        try:
+            result = self._fn(*self._args, **self._kwargs)
+        except BaseException as e:
+            self.set_exception(e)
+        else:
+            self.set_result(result)
+
+    def result(self, timeout: float | None = None):
+        self.run()
+        return super().result(timeout)
+
+    def exception(self, timeout: float | None = None):
+        self.run()
+        return super().exception(timeout)
+
+
+class InlineExecutor(Executor):
+    """
+    スレッドを使用せず、結果を取得する際に呼び出し元のスレッドでタスクを実行するExecutor
+
+    結果を取得するまでタスクを実行しないため、ThreadPoolExecutorと同様に未着手のタスクを
+    取り消せる（結果を取得しなかったタスクはshutdown()で実行する）
+    """
+
+    def __init__(self):
+        """コンストラクタ"""
+        self._futures: list[_DeferredFuture] = []
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        """タスクを登録する（結果を取得するまで実行しない）"""
+        future = _DeferredFuture(fn, args, kwargs)
+        self._futures.append(future)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """結果を取得しなかったタスクを実行する（cancel_futuresがTrueの場合は取り消す）"""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            if cancel_futures:
+                future.cancel()
+            elif wait:
+                future.run()
+
+
+def create_executor(max_workers: int, thread_name_prefix: str = "") -> Executor:
+    """
+    タスクを並行して実行するExecutorを作成する
+
+    ※プロファイリング中は、別のスレッドで実行される処理段階を計測できないため
+    （cProfileは同時に1つしか有効にできない）、呼び出し元のスレッドで順に実行するInlineExecutorを返す
+    """
+    if _profiling:
+        return InlineExecutor()
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+
+class StageProfiler:
+    """
+    処理段階ごとにcProfileの統計とtracemallocのスナップショットを取得する
+
+    MetricsRegistry.stageのフックとして登録して使用する。
+    - cProfile: 処理段階ごとに`{output_dir}/{処理段階}.pstats`に出力する。
+      処理段階が入れ子になっている場合は内側の処理段階にのみ計上する
+    - tracemalloc: 各処理段階の最初の実行の開始・終了時にスナップショットを取得し、
+      その間にメモリを多く確保した箇所を`{output_dir}/tracemalloc.txt`に出力する
+
+    ※cProfileは同時に1つしか有効にできないため、複数のスレッドで同時に実行された処理段階は
+      最初に開始したもののみ計測する。並行して実行する処理段階はcreate_executor()で作成した
+      Executorで実行する（プロファイリング中は呼び出し元のスレッドで実行される）
+    """
+
+    def __init__(self, output_dir: Path, top_n: int = 10):
+        """
+        コンストラクタ
+
+        Args:
+            output_dir (Path): 出力先のディレクトリ
+            top_n (int): レポートに出力するメモリ確保箇所の件数
+        """
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._allocations: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+        self._stack: list[str] = []
+        self._owner: int | None = None
+
+    def _profile(self, name: str) -> cProfile.Profile:
+        if name not in self._profiles:
+            self._profiles[name] = cProfile.Profile()
+        return self._profiles[name]
+
+    def _acquire(self) -> bool:
+        """プロファイリングを実行するスレッドかを判定する"""
+        with self._lock:
+            current = threading.get_ident()
+            if self._owner is None:
+                self._owner = current
+            return self._owner == current
+
+    def _release(self) -> None:
+        with self._lock:
+            if not self._stack:
+                self._owner = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """処理段階をプロファイリングする"""
+        if not self._acquire():
+            yield
+            return
+
+        before = None
+        if tracemalloc.is_tracing() and name not in self._allocations:
+            # 先に登録しておき、入れ子の処理段階で同じ名前が使われても重複して取得しない
+            self._allocations[name] = []
+            before = tracemalloc.take_snapshot()
+
+        if self._stack:
+            self._profile(self._stack[-1]).disable()
+        self._stack.append(name)
+        profile = self._profile(name)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._stack.pop()
+            if self._stack:
+                self._profile(self._stack[-1]).enable()
+            if before is not None:
+                after = tracemalloc.take_snapshot()
+                stats = after.compare_to(before, "lineno")[: self.top_n]
+                self._allocations[name] = [str(stat) for stat in stats]
+            self._release()
+
+    def install(self, registry: MetricsRegistry) -> "StageProfiler":
+        """MetricsRegistryに登録し、プロファイリングを開始する"""
+        global _profiling
+        _profiling = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        registry.add_stage_hook(self.stage)
+        return self
+
+    def uninstall(self, registry: MetricsRegistry) -> None:
+        """MetricsRegistryから登録を解除し、結果を出力する"""
+        global _profiling
+        _profiling = False
+        registry.remove_stage_hook(self.stage)
+        self.dump()
+        tracemalloc.stop()
+
+    def dump(self) -> None:
+        """プロファイリング結果を出力する"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for name, profile in self._profiles.items():
+            profile.dump_stats(self.output_dir / f"{name}.pstats")
+
+        lines = []
+        for name, allocations in self._allocations.items():
+            lines.append(f"[{name}]")
+            lines.extend(allocations)
+            lines.append("")
+            logger.info("top allocations stage=%r\n%s", name, "\n".join(allocations))
+        if tracemalloc.is_tracing():
+            lines.append("[overall]")
+            statistics = tracemalloc.take_snapshot().statistics("lineno")[: self.top_n]
+            lines.extend(str(stat) for stat in statistics)
+        report_path = self.output_dir / "tracemalloc.txt"
+        report_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        logger.info("profile saved to: %s", self.output_dir)
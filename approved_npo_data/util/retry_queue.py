@@ -0,0 +1,198 @@
+"""失敗した処理を後でまとめて再試行するキュー"""
+
+import heapq
+import math
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from logging import getLogger
+from urllib.parse import urlparse
+
+from approved_npo_data.util.metrics import metrics
+
+logger = getLogger(__name__)
+
+
+class HostBackoff:
+    """ホスト毎の指数バックオフ（失敗が続くほど再試行までの待ち時間を長くする）"""
+
+    def __init__(self, base_seconds: float, max_seconds: float, factor: float = 2.0):
+        """
+        コンストラクタ
+
+        Args:
+            base_seconds (float): 1回目の失敗後の待ち時間（秒）
+            max_seconds (float): 待ち時間の上限（秒）
+            factor (float): 失敗する毎に待ち時間に掛ける値
+        """
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.factor = factor
+        self._failures: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def failure(self, host: str) -> float:
+        """失敗を記録し、再試行までの待ち時間（秒）を返す"""
+        with self._lock:
+            count = self._failures[host] = self._failures.get(host, 0) + 1
+        return min(self.base_seconds * self.factor ** (count - 1), self.max_seconds)
+
+    def success(self, host: str) -> None:
+        """成功を記録する（待ち時間を元に戻す）"""
+        with self._lock:
+            self._failures.pop(host, None)
+
+
+@dataclass(order=True)
+class RetryItem:
+    """再試行する処理"""
+
+    not_before: float
+    """再試行できる時刻（RetryQueueのclockの値）"""
+
+    key: int = field(compare=False)
+    """処理を識別する番号（sweepのtaskに渡す）"""
+
+    url: str = field(compare=False)
+    """失敗したURL（ホスト毎のバックオフに使用する）"""
+
+    error: Exception = field(compare=False)
+    """最後の失敗の例外"""
+
+    attempts: int = field(default=1, compare=False)
+    """試行回数（最初の失敗を含む）"""
+
+    @property
+    def host(self) -> str:
+        """失敗したURLのホスト"""
+        return urlparse(self.url).netloc
+
+
+class RetryQueue:
+    """
+    失敗した処理を後でまとめて再試行するキュー
+
+    処理中に失敗した場合はその場でリトライせずにdefer()でキューに追加し、最後にsweep()で再試行する
+    ※再試行できない失敗（is_retryableがFalse）と、max_attempts回試行しても失敗した処理はfailedに追加する
+    """
+
+    def __init__(
+        self,
+        backoff: HostBackoff,
+        max_attempts: int,
+        get_url: Callable[[Exception], str],
+        is_retryable: Callable[[Exception], bool] = lambda e: True,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        コンストラクタ
+
+        Args:
+            backoff (HostBackoff): ホスト毎のバックオフ
+            max_attempts (int): 最大の試行回数（最初の失敗を含む）
+            get_url (Callable[[Exception], str]): 例外から失敗したURLを取得する関数
+            is_retryable (Callable[[Exception], bool]): 再試行する失敗かを判定する関数
+            clock (Callable[[], float]): 現在時刻（秒）を返す関数
+            sleep (Callable[[float], None]): 指定した秒数待つ関数
+        """
+        self.backoff = backoff
+        self.max_attempts = max_attempts
+        self.get_url = get_url
+        self.is_retryable = is_retryable
+        self.clock = clock
+        self.sleep = sleep
+        self.failed: list[RetryItem] = []
+        self._items: list[RetryItem] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """再試行を待っている処理の件数"""
+        with self._lock:
+            return len(self._items)
+
+    def defer(self, key: int, error: Exception) -> None:
+        """失敗した処理をキューに追加する（スレッドセーフ）"""
+        self._push(RetryItem(0, key, self.get_url(error), error))
+
+    def record_success(self, url: str) -> None:
+        """
+        処理の成功を記録する（ホストのバックオフを元に戻す）
+
+        ※ホストへのリクエストが成功している間は、散発的な失敗で待ち時間が長くならないようにする
+        """
+        self.backoff.success(urlparse(url).netloc)
+
+    def is_exhausted(self, item: RetryItem) -> bool:
+        """
+        再試行できない処理か（再試行できない失敗、または最大の試行回数まで試行した）
+
+        ※sweep()を中止したためにfailedに追加した処理はFalse
+        """
+        return item.attempts >= self.max_attempts or not self.is_retryable(item.error)
+
+    def _push(self, item: RetryItem) -> None:
+        if self.is_exhausted(item):
+            self._give_up(item)
+            return
+        item.not_before = self.clock() + self.backoff.failure(item.host)
+        metrics.inc("deferred_retries_total", host=item.host)
+        logger.info(
+            "再試行を予約しました。 key=%r, url=%r, attempts=%r, e=%r",
+            item.key,
+            item.url,
+            item.attempts,
+            item.error,
+        )
+        with self._lock:
+            heapq.heappush(self._items, item)
+
+    def _give_up(self, item: RetryItem) -> None:
+        metrics.inc("retry_failures_total", host=item.host)
+        logger.error(
+            "再試行を中止しました。 key=%r, url=%r, attempts=%r, e=%r",
+            item.key,
+            item.url,
+            item.attempts,
+            item.error,
+        )
+        with self._lock:
+            self.failed.append(item)
+
+    def sweep(
+        self,
+        task: Callable[[int], None],
+        should_stop: Callable[[], bool] = lambda: False,
+        max_wait: Callable[[], float] = lambda: math.inf,
+    ) -> list[RetryItem]:
+        """
+        キューの処理を再試行できる時刻の順に再試行する
+
+        Args:
+            task (Callable[[int], None]): 処理（キーを受け取り、失敗した場合は例外を送出する）
+            should_stop (Callable[[], bool]): Trueを返した場合は残りの処理を再試行せずに中止する
+            max_wait (Callable[[], float]): 待つ秒数の上限を返す関数（期限までの残り秒数等）
+                ※再試行できる時刻まで上限より長く待つ必要がある処理は、待たずに中止する
+
+        Returns:
+            list[RetryItem]: 最終的に失敗した処理（failed）
+        """
+        while True:
+            with self._lock:
+                if not self._items:
+                    break
+                item = heapq.heappop(self._items)
+            wait = item.not_before - self.clock()
+            if should_stop() or wait > max_wait():
+                self._give_up(item)
+                continue
+            if wait > 0:
+                self.sleep(wait)
+            try:
+                task(item.key)
+            except Exception as e:
+                self._push(RetryItem(0, item.key, self.get_url(e), e, item.attempts + 1))
+                continue
+            self.backoff.success(item.host)
+        return self.failed
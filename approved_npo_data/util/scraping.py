@@ -1,19 +1,88 @@
 """スクレイピング関連のユーティリティ"""
 
+from urllib.parse import urlparse
+
 import requests
 from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_random
+from tenacity import RetryCallState, retry, stop_after_attempt, wait_random
 
+from approved_npo_data.util.cassette import CassetteMissError
+from approved_npo_data.util.http_client import http_get, is_replaying
+from approved_npo_data.util.metrics import metrics
 
-# リトライ設定
-@retry(stop=stop_after_attempt(3), wait=wait_random(min=1, max=10))
-def scrape(url: str):
-    """渡されたURLからスクレイピングする"""
+
+class FetchError(ValueError):
+    """URLの取得に失敗した"""
+
+    def __init__(self, url: str, error: requests.RequestException):
+        """
+        コンストラクタ
+
+        Args:
+            url (str): 取得に失敗したURL
+            error (requests.RequestException): 失敗の原因の例外
+        """
+        super().__init__(f"URLの取得に失敗しました: {url}. エラー: {error}")
+        self.url = url
+        self.error = error
+        """失敗の原因の例外"""
+        response = getattr(error, "response", None)
+        self.status_code: int | None = response.status_code if response is not None else None
+        """ステータスコード（レスポンスがない場合はNone）"""
+
+    @property
+    def is_retryable(self) -> bool:
+        """
+        再試行で成功する可能性がある失敗か（接続エラー、タイムアウト、429、5xx）
+
+        ※記録したレスポンスの再生時に記録が存在しない場合は、何度再試行しても同じ結果になるため除く
+        """
+        if isinstance(self.error, CassetteMissError):
+            return False
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def count_retry(retry_state: RetryCallState) -> None:
+    """リトライ回数を計測する"""
+    url = retry_state.args[0] if retry_state.args else ""
+    metrics.inc("http_retries_total", host=urlparse(url).netloc)
+
+
+_wait_random = wait_random(min=1, max=10)
+
+
+def wait_for_retry(retry_state: RetryCallState) -> float:
+    """リトライまでの待ち時間（秒）。記録したレスポンスを再生している場合は待たない"""
+    return 0 if is_replaying() else _wait_random(retry_state)
+
+
+def fetch_html_once(url: str) -> bytes:
+    """
+    渡されたURLのHTMLを取得する（リトライしない）
+
+    ※失敗した場合はFetchErrorを送出する。呼び出し元で後から再試行する場合に使用する
+    """
     try:
-        response = requests.get(url, timeout=10)
+        response = http_get(url, timeout=10)
         response.raise_for_status()
     except requests.RequestException as e:
-        raise ValueError(f"URLの取得に失敗しました: {url}. エラー: {e}") from e
+        raise FetchError(url, e) from e
+    return response.content
+
 
+# リトライ設定
+@retry(stop=stop_after_attempt(3), wait=wait_for_retry, before_sleep=count_retry)
+def fetch_html(url: str) -> bytes:
+    """渡されたURLのHTMLを取得する"""
+    return fetch_html_once(url)
+
+
+def parse_html(content: bytes) -> BeautifulSoup:
+    """HTMLを解析する"""
+    return BeautifulSoup(content, "html.parser")
+
+
+def scrape(url: str):
+    """渡されたURLからスクレイピングする"""
     # BeautifulSoupでHTMLを解析
-    return BeautifulSoup(response.content, "html.parser")
+    return parse_html(fetch_html(url))
@@ -1,18 +1,67 @@
 """テキストフォーマットを扱う関数群"""
 
-import re
 import unicodedata
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
 
-# 正規表現のパターンを事前にコンパイル
-whitespace_pattern = re.compile(r"[\u3000\s\t]+")
+# 標準化した結果をキャッシュする件数
+# NOTE: 表の項目名、所轄庁等、繰り返し出現する短い文字列を想定している
+STANDARDIZE_CACHE_SIZE = 4096
+
+# キャッシュする文字列の最大長（長い文章は繰り返し出現することがほとんどないため、キャッシュしない）
+STANDARDIZE_CACHE_MAX_LENGTH = 64
+
+
+def _standardize_text_for_key(text: str) -> str:
+    # ASCIIのみの文字列はNFKCで変化しないため、正規化を省略する
+    if not text.isascii():
+        # 全角英数字を半角英数字に変換
+        text = unicodedata.normalize("NFKC", text)
+
+    # 全角スペース、半角スペース、タブ等の空白文字を除去
+    # NOTE: str.split()の空白文字は正規表現の\sと同じ（全角スペースも含む）で、正規表現より速い
+    return "".join(text.split())
+
+
+_standardize_text_for_key_cached = lru_cache(maxsize=STANDARDIZE_CACHE_SIZE)(
+    _standardize_text_for_key
+)
 
 
 def standardize_text_for_key(text: str) -> str:
     """Keyとして使用できるように文字列を標準化する"""
-    # 全角英数字を半角英数字に変換
-    text = unicodedata.normalize("NFKC", text)
+    if len(text) > STANDARDIZE_CACHE_MAX_LENGTH:
+        return _standardize_text_for_key(text)
+    return _standardize_text_for_key_cached(text)
+
+
+def standardize_texts(texts: Iterable[str]) -> list[str]:
+    """
+    複数の文字列をまとめて標準化する
+
+    CSVの列等、同じ値が繰り返し出現する場合に、同じ値は1回だけ標準化する
+    （共有のキャッシュは使用しないため、大量の値でキャッシュが入れ替わることはない）
+    """
+    standardized: dict[str, str] = {}
+    result = []
+    for text in texts:
+        value = standardized.get(text)
+        if value is None:
+            value = standardized[text] = _standardize_text_for_key(text)
+        result.append(value)
+    return result
+
+
+def standardize_keys(table: Mapping[str, str]) -> dict[str, str]:
+    """スクレイピングした表（項目名 → 値）の項目名を標準化する"""
+    return {standardize_text_for_key(key): value for key, value in table.items()}
+
 
-    # 全角スペース、半角スペース、タブを除去
-    text = whitespace_pattern.sub("", text)
+def to_ngrams(text: str, n: int = 2) -> list[str]:
+    """
+    文字列を標準化し、1文字ずつずらしながら文字単位のN-gramに分割する
 
-    return text
+    ※末尾のN文字未満の部分も含める（N文字未満の語でも前方一致で検索できるようにするため）
+    """
+    text = standardize_text_for_key(text)
+    return [text[i : i + n] for i in range(len(text))]
@@ -0,0 +1,97 @@
+"""処理時間の制限に関するユーティリティ"""
+
+import signal
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+
+def can_use_time_limit() -> bool:
+    """time_limitで処理時間を制限できる環境かを判定する"""
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def time_limit(seconds: float | None) -> Iterator[None]:
+    """
+    ブロック内の処理時間を制限する。制限を超えた場合はTimeoutErrorを送出する
+
+    ※SIGALRMを使用するため、メインスレッド以外やWindowsでは制限されない
+    """
+    if not seconds or not can_use_time_limit():
+        yield
+        return
+
+    def handler(signum, frame):
+        raise TimeoutError(f"{seconds}秒以内に処理が終わりませんでした")
+
+    previous_handler = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def to_local_naive(at: datetime) -> datetime:
+    """タイムゾーン付きの日時をローカル時刻（タイムゾーンなし）に変換する"""
+    if at.tzinfo is None:
+        return at
+    return at.astimezone().replace(tzinfo=None)
+
+
+class Deadline:
+    """処理の期限"""
+
+    def __init__(self, at: datetime):
+        """
+        コンストラクタ
+
+        Args:
+            at (datetime): 期限の日時
+        """
+        self.at = at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        """現在から指定した秒数後を期限とする"""
+        return cls(datetime.now() + timedelta(seconds=seconds))
+
+    @classmethod
+    def parse(cls, text: str, now: datetime | None = None) -> "Deadline":
+        """
+        日時（例: 2025-04-01T06:00）または時刻（例: 06:00）を期限とする
+
+        ※時刻のみの場合、今日のその時刻を過ぎていれば翌日のその時刻とする
+        ※タイムゾーンを指定した場合（例: 06:00+09:00）は、ローカル時刻に変換する
+        """
+        now = now or datetime.now()
+        try:
+            at_time = time.fromisoformat(text)
+        except ValueError:
+            return cls(to_local_naive(datetime.fromisoformat(text)))
+        at = datetime.combine(now.date(), at_time)
+        if to_local_naive(at) <= now:
+            at += timedelta(days=1)
+        return cls(to_local_naive(at))
+
+    def remaining(self) -> float:
+        """期限までの残り秒数（期限を過ぎている場合は負の値）"""
+        return (self.at - datetime.now()).total_seconds()
+
+    def is_expired(self, margin: float = 0) -> bool:
+        """期限のmargin秒前を過ぎているか"""
+        return self.remaining() <= margin
+
+    def call_before(self, margin: float, callback: Callable[[], None]) -> threading.Timer:
+        """
+        期限のmargin秒前にcallbackを別スレッドで呼び出す（既に過ぎている場合はすぐに呼び出す）
+
+        ※呼び出す前に止める場合は、返されたTimerのcancel()を呼び出す
+        """
+        timer = threading.Timer(max(self.remaining() - margin, 0), callback)
+        timer.daemon = True
+        timer.start()
+        return timer
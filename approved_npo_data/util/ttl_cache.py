@@ -0,0 +1,135 @@
+"""有効期限付きのキャッシュ"""
+
+import json
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from logging import getLogger
+from pathlib import Path
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """キャッシュのエントリ"""
+
+    value: str
+    """キャッシュした値"""
+
+    stored_at: float
+    """保存日時（UNIX時間）"""
+
+    def is_fresh(self, ttl_seconds: float, now: float | None = None) -> bool:
+        """有効期限内かを判定する"""
+        if now is None:
+            now = time.time()
+        return now - self.stored_at < ttl_seconds
+
+
+class TtlCache:
+    """
+    JSONファイルに永続化する有効期限付きのキャッシュ
+
+    実行をまたいで値を再利用するためのもので、ダウンロードURLなどの小さな値を保持する想定
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        """
+        コンストラクタ
+
+        Args:
+            path (Path): キャッシュを保存するJSONファイルのパス
+            ttl_seconds (float): 有効期間（秒）
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, CacheEntry]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                raw = json.load(file)
+            return {key: CacheEntry(**value) for key, value in raw.items()}
+        except (OSError, ValueError, TypeError) as e:
+            # 壊れたキャッシュは使わずに作り直す
+            logger.warning(
+                "キャッシュファイルを読み込めませんでした。 self.path=%r, e=%r", self.path, e
+            )
+            return {}
+
+    def _dump(self, entries: dict[str, CacheEntry]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, mode="w", encoding="utf-8") as file:
+            json.dump(
+                {key: asdict(entry) for key, entry in entries.items()},
+                file,
+                ensure_ascii=False,
+                indent=2,
+            )
+        tmp_path.replace(self.path)
+
+    def get_entry(self, key: str) -> CacheEntry | None:
+        """有効期限に関わらずエントリを取得する"""
+        with self._lock:
+            return self._load().get(key)
+
+    def get(self, key: str) -> str | None:
+        """有効期限内の値を取得する"""
+        entry = self.get_entry(key)
+        if entry is None or not entry.is_fresh(self.ttl_seconds):
+            return None
+        return entry.value
+
+    def set(self, key: str, value: str) -> None:
+        """値を保存する"""
+        with self._lock:
+            entries = self._load()
+            entries[key] = CacheEntry(value=value, stored_at=time.time())
+            self._dump(entries)
+
+    def delete(self, key: str) -> None:
+        """値を削除する"""
+        with self._lock:
+            entries = self._load()
+            if entries.pop(key, None) is not None:
+                self._dump(entries)
+
+    def refresh(self, key: str, loader: Callable[[], str]) -> str:
+        """loaderで値を取得し直して保存する"""
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def refresh_in_background(self, key: str, loader: Callable[[], str]) -> threading.Thread:
+        """バックグラウンドで値を取得し直して保存する"""
+
+        def target():
+            try:
+                self.refresh(key, loader)
+            except Exception as e:
+                # 再検証に失敗しても古い値で処理を継続できるため、ログのみ出力する
+                logger.warning("キャッシュの再検証に失敗しました。 key=%r, e=%r", key, e)
+
+        thread = threading.Thread(target=target, name=f"ttl-cache-refresh-{key}", daemon=True)
+        thread.start()
+        return thread
+
+    def get_or_load(self, key: str, loader: Callable[[], str]) -> str:
+        """
+        キャッシュを利用して値を取得する
+
+        - 有効期限内の場合はキャッシュした値を返す
+        - 有効期限切れの場合はキャッシュした値を返し、バックグラウンドで再検証する
+        - キャッシュが存在しない場合はloaderで取得して保存する
+        """
+        entry = self.get_entry(key)
+        if entry is None:
+            return self.refresh(key, loader)
+        if not entry.is_fresh(self.ttl_seconds):
+            self.refresh_in_background(key, loader)
+        return entry.value
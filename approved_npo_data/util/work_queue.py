@@ -0,0 +1,296 @@
+"""
+SQLiteファイルを使ったタスクのキュー
+
+複数のプロセス（ホスト）のワーカーが同じキューからタスクを借り受け（リース）、処理した結果を書き込む。
+リースには期限があり、期限までに完了しなかったタスク（ワーカーが停止した場合等）は別のワーカーが借り受ける。
+
+- pending: 未処理（またはリースの期限切れ、再試行待ち）
+- leased: ワーカーが処理中
+- done: 完了（結果を保存済み）
+- failed: 再試行できない失敗、または最大の試行回数まで失敗した（リースの期限切れを含む）
+
+キューには最初にタスクを追加した実行のID（run_id）を記録し、別の実行のタスクは追加しない
+（前回の実行の結果を今回の結果として扱わないようにする）。
+
+※複数のホストで共有する場合は、ロックが正しく動作するファイルシステム上に置く必要がある
+"""
+
+import sqlite3
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+
+logger = getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_priority ON tasks (status, priority);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# リースの期限が切れた（ワーカーが停止した可能性がある）タスクのエラー
+LEASE_EXPIRED_ERROR = "リースの期限が切れました"
+
+
+@dataclass(frozen=True)
+class Task:
+    """キューのタスク"""
+
+    key: str
+    """タスクを識別する値"""
+
+    payload: str
+    """タスクの内容"""
+
+    status: str
+    """状態（pending、leased、done、failed）"""
+
+    attempts: int
+    """試行回数（リースした回数）"""
+
+    result: str | None = None
+    """処理結果（doneの場合。failedの場合も途中までの結果を保存している場合がある）"""
+
+    error: str | None = None
+    """最後の失敗のエラー内容"""
+
+
+class WorkQueue:
+    """SQLiteファイルを使ったリース付きのタスクのキュー"""
+
+    def __init__(self, path: Path, max_attempts: int = 3, clock: Callable[[], float] = time.time):
+        """
+        コンストラクタ
+
+        Args:
+            path (Path): キューのSQLiteファイルのパス（存在しない場合は作成する）
+            max_attempts (int): 最大の試行回数（リースの期限切れを含む）
+            clock (Callable[[], float]): 現在時刻（UNIX時間）を返す関数
+                ※リースの期限をホスト間で比較するため、単調時計ではなくUNIX時間を使用する
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.clock = clock
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            # 読み込みと書き込みを並行して行えるようにする
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # NOTE: 接続はスレッド間で共有せず、操作毎に接続する
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """書き込みのロックを取得してからトランザクションを開始する"""
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    @property
+    def run_id(self) -> str | None:
+        """最初にタスクを追加した実行のID（タスクがない場合はNone）"""
+        with closing(self._connect()) as connection:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'run_id'").fetchone()
+        return row[0] if row else None
+
+    def enqueue(self, tasks: Iterable[tuple[str, str, float]], run_id: str) -> int:
+        """
+        タスクを追加する（同じキーのタスクが既にある場合は追加しない）
+
+        Args:
+            tasks (Iterable[tuple[str, str, float]]): キー、内容、優先度（小さいほど先にリースする）
+            run_id (str): 実行のID
+                ※キューに別の実行のタスクがある場合はValueErrorを送出する
+
+        Returns:
+            int: 追加したタスクの件数
+        """
+        with self._transaction() as connection:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'run_id'").fetchone()
+            if row is None and connection.execute("SELECT 1 FROM tasks LIMIT 1").fetchone():
+                raise ValueError(f"キューに実行のIDが記録されていないタスクがあります: {self.path}")
+            if row is not None and row[0] != run_id:
+                raise ValueError(
+                    f"キューに別の実行（run_id={row[0]}）のタスクがあります: {self.path}"
+                )
+            connection.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('run_id', ?)", (run_id,)
+            )
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO tasks (key, payload, priority) VALUES (?, ?, ?)", tasks
+            )
+            return connection.total_changes - before
+
+    def lease(self, owner: str, lease_seconds: float) -> Task | None:
+        """
+        優先度の高い未処理のタスクを1件借り受ける
+
+        リースの期限が切れたタスクは未処理に戻してから借り受ける
+        ※最大の試行回数まで試行したタスクは未処理に戻さずに失敗にする（処理するとワーカーが
+        停止するタスクを繰り返し借り受けないようにする）
+
+        Args:
+            owner (str): ワーカーを識別する値
+            lease_seconds (float): リースの期間（秒）
+
+        Returns:
+            Task | None: 借り受けたタスク（未処理のタスクがない場合はNone）
+        """
+        now = self.clock()
+        with self._transaction() as connection:
+            expired = connection.execute(
+                "UPDATE tasks SET status = ?, error = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL "
+                "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+                (FAILED, LEASE_EXPIRED_ERROR, LEASED, now, self.max_attempts),
+            ).rowcount
+            if expired:
+                logger.error(
+                    "リースの期限が切れたタスクを失敗にしました。 expired=%r, max_attempts=%r",
+                    expired,
+                    self.max_attempts,
+                )
+            requeued = connection.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires_at = NULL "
+                "WHERE status = ? AND lease_expires_at < ?",
+                (PENDING, LEASED, now),
+            ).rowcount
+            if requeued:
+                logger.warning(
+                    "リースの期限が切れたタスクを未処理に戻しました。 requeued=%r", requeued
+                )
+            row = connection.execute(
+                "SELECT key, payload, attempts FROM tasks WHERE status = ? AND available_at <= ? "
+                "ORDER BY priority, rowid LIMIT 1",
+                (PENDING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            key, payload, attempts = row
+            connection.execute(
+                "UPDATE tasks SET status = ?, attempts = ?, lease_owner = ?, lease_expires_at = ? "
+                "WHERE key = ?",
+                (LEASED, attempts + 1, owner, now + lease_seconds, key),
+            )
+        return Task(key, payload, LEASED, attempts + 1)
+
+    def complete(self, key: str, owner: str, result: str, error: str | None = None) -> bool:
+        """
+        タスクの処理結果を保存して完了にする
+
+        Args:
+            key (str): タスクのキー
+            owner (str): ワーカーを識別する値
+            result (str): 処理結果
+            error (str | None): 一部の処理に失敗した場合のエラー内容
+
+        Returns:
+            bool: 完了にしたか（リースの期限が切れて別のワーカーが借り受けていた場合はFalse）
+        """
+        with self._transaction() as connection:
+            updated = connection.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL WHERE key = ? AND status = ? AND lease_owner = ?",
+                (DONE, result, error, key, LEASED, owner),
+            ).rowcount
+        if not updated:
+            logger.warning(
+                "リースを失ったタスクの結果を破棄しました。 key=%r, owner=%r", key, owner
+            )
+        return bool(updated)
+
+    def fail(
+        self,
+        key: str,
+        owner: str,
+        error: str,
+        retry_delay: float,
+        retryable: bool = True,
+        result: str | None = None,
+    ) -> bool:
+        """
+        タスクの失敗を記録する
+
+        再試行できる失敗で、試行回数がmax_attempts未満の場合はretry_delay秒後に再試行できるように
+        未処理に戻す
+
+        Args:
+            key (str): タスクのキー
+            owner (str): ワーカーを識別する値
+            error (str): エラー内容
+            retry_delay (float): 再試行までの待ち時間（秒）
+            retryable (bool): 再試行で成功する可能性がある失敗か
+            result (str | None): 途中までの処理結果（最後まで失敗した場合に使用する）
+                ※Noneの場合は前回までに保存した結果を維持する
+
+        Returns:
+            bool: 失敗を記録したか（リースを失っていた場合はFalse）
+        """
+        with self._transaction() as connection:
+            updated = connection.execute(
+                "UPDATE tasks SET status = CASE WHEN ? AND attempts < ? THEN ? ELSE ? END, "
+                "available_at = ?, error = ?, result = COALESCE(?, result), lease_owner = NULL, "
+                "lease_expires_at = NULL WHERE key = ? AND status = ? AND lease_owner = ?",
+                (
+                    retryable,
+                    self.max_attempts,
+                    PENDING,
+                    FAILED,
+                    self.clock() + retry_delay,
+                    error,
+                    result,
+                    key,
+                    LEASED,
+                    owner,
+                ),
+            ).rowcount
+        return bool(updated)
+
+    def counts(self) -> dict[str, int]:
+        """状態毎のタスクの件数"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+            return {status: 0 for status in (PENDING, LEASED, DONE, FAILED)} | dict(rows)
+
+    def is_finished(self) -> bool:
+        """すべてのタスクが完了（または失敗）したか"""
+        counts = self.counts()
+        return counts[PENDING] == 0 and counts[LEASED] == 0
+
+    def tasks(self) -> list[Task]:
+        """すべてのタスク（追加した順）"""
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT key, payload, status, attempts, result, error FROM tasks ORDER BY rowid"
+            ).fetchall()
+        return [Task(*row) for row in rows]
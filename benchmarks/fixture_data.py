@@ -0,0 +1,344 @@
+"""
+ベンチマーク用のデータを生成する
+
+名簿PDF、全NPO法人情報のCSV、NPOポータルの詳細ページ、東京都の法人・団体情報詳細ページを
+csv_row.py等のフィールド定義に合わせて生成する。乱数のシードを固定しているため、同じ引数であれば
+同じデータが生成される。
+"""
+
+import csv
+import random
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import fields
+from html import escape
+from pathlib import Path
+from urllib.parse import quote
+
+from approved_npo_data.csv.csv_row import AllNpoDataRow, ApprovedNpoRow
+from approved_npo_data.scraping.npoportal_detail.Information_model import Information
+from approved_npo_data.scraping.tokyo_detail.information_model import BasicInformation
+from benchmarks.pdf_writer import write_table_pdf
+
+NPOPORTAL_BASE_URL = "https://www.npo-homepage.go.jp"
+TOKYO_BASE_URL = "https://www.seikatubunka.metro.tokyo.lg.jp"
+
+# 名簿PDFの列幅（ApprovedNpoRowのフィールド順）
+ROSTER_COLUMN_WIDTHS = (36, 40, 50, 20, 20, 25, 90, 100, 50, 30, 30, 30, 55, 45, 45, 45, 45)
+
+PREFECTURES = (
+    ("01", "北海道"),
+    ("04", "宮城県"),
+    ("13", "東京都"),
+    ("14", "神奈川県"),
+    ("23", "愛知県"),
+    ("27", "大阪府"),
+    ("40", "福岡県"),
+    ("47", "沖縄県"),
+)
+NAME_WORDS = (
+    "みどり",
+    "ひだまり",
+    "子ども",
+    "地域",
+    "福祉",
+    "環境",
+    "まちづくり",
+    "国際協力",
+    "文化",
+    "スポーツ",
+    "支援",
+    "ネットワーク",
+    "センター",
+    "の会",
+    "フォーラム",
+)
+SURNAMES = ("佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤")
+GIVEN_NAMES = ("太郎", "花子", "一郎", "恵子", "健", "由美", "誠", "陽子")
+ACTIVITY_AREAS = (
+    "保健、医療又は福祉の増進を図る活動",
+    "社会教育の推進を図る活動",
+    "まちづくりの推進を図る活動",
+    "環境の保全を図る活動",
+    "国際協力の活動",
+    "子どもの健全育成を図る活動",
+)
+PURPOSE_PHRASES = (
+    "この法人は、地域住民に対して、",
+    "高齢者及び障害者の生活支援に関する事業を行い、",
+    "子どもの健全な育成に寄与することを目的とする。",
+    "環境の保全に関する普及啓発を行い、",
+    "国際交流及び国際協力の推進に関する事業を行い、",
+    "もって公益の増進に寄与することを目的とする。",
+)
+
+
+class FixtureGenerator:
+    """ベンチマーク用のデータを生成する"""
+
+    def __init__(self, seed: int = 0, base_url: str = NPOPORTAL_BASE_URL):
+        """
+        コンストラクタ
+
+        Args:
+            seed (int): 乱数のシード
+            base_url (str): 詳細ページのURLのベース（モックサーバーを使う場合に変更する）
+        """
+        self.random = random.Random(seed)
+        self.base_url = base_url.rstrip("/")
+
+    def corporate_number(self, index: int) -> str:
+        """法人番号（13桁）を生成する"""
+        return f"{5011005000000 + index * 7:013d}"
+
+    def corporation_name(self) -> str:
+        """法人名を生成する"""
+        words = self.random.sample(NAME_WORDS, k=self.random.randint(2, 3))
+        return "特定非営利活動法人" + "".join(words)
+
+    def person_name(self) -> str:
+        """氏名を生成する"""
+        return f"{self.random.choice(SURNAMES)}　{self.random.choice(GIVEN_NAMES)}"
+
+    def address(self, prefecture: str) -> str:
+        """住所を生成する"""
+        chome, ban, go = (self.random.randint(1, n) for n in (9, 30, 20))
+        return f"{prefecture}中央区{chome}丁目{ban}番{go}号"
+
+    def postal_code(self) -> str:
+        """郵便番号を生成する"""
+        return f"{self.random.randint(100, 999)}-{self.random.randint(0, 9999):04d}"
+
+    def purpose(self) -> str:
+        """定款に記載された目的を生成する"""
+        phrases = self.random.choices(PURPOSE_PHRASES, k=self.random.randint(3, 6))
+        return "".join(phrases)
+
+    def date(self, start_year: int, end_year: int) -> str:
+        """日付を生成する"""
+        year = self.random.randint(start_year, end_year)
+        return f"{year}/{self.random.randint(1, 12):02d}/{self.random.randint(1, 28):02d}"
+
+    def detail_url(self, index: int) -> str:
+        """NPOポータルの詳細ページのURLを生成する"""
+        return f"{self.base_url}/npoportal/detail/{index:08d}"
+
+    def roster_rows(self, size: int) -> list[ApprovedNpoRow]:
+        """名簿の行データを生成する"""
+        rows = []
+        for index in range(size):
+            control_code, control_office = self.random.choice(PREFECTURES)
+            special = self.random.random() < 0.1
+            validity_from = self.date(2018, 2024)
+            validity_to = f"{int(validity_from[:4]) + 5}{validity_from[4:]}"
+            rows.append(
+                ApprovedNpoRow(
+                    control_code=control_code,
+                    control_office=control_office,
+                    corporate_number=self.corporate_number(index),
+                    approved="" if special else "○",
+                    special_approved="○" if special else "",
+                    update_application="○" if self.random.random() < 0.1 else "",
+                    corporation_name=self.corporation_name(),
+                    head_office_address=self.address(control_office),
+                    representative_name=self.person_name(),
+                    pst_relative_value="○" if self.random.random() < 0.7 else "",
+                    pst_absolute_value="○" if self.random.random() < 0.3 else "",
+                    approved_validity_period_from="" if special else validity_from,
+                    approved_validity_period_to="" if special else validity_to,
+                    special_approved_validity_period_from=validity_from if special else "",
+                    special_approved_validity_period_to=validity_to if special else "",
+                )
+            )
+        return rows
+
+    def all_npo_row(self, index: int, roster_row: ApprovedNpoRow | None = None) -> AllNpoDataRow:
+        """全NPO法人情報の行データを生成する"""
+        if roster_row is None:
+            _, control_office = self.random.choice(PREFECTURES)
+            name = self.corporation_name()
+            representative = self.person_name()
+            address = self.address(control_office)
+        else:
+            control_office = roster_row.control_office
+            name = roster_row.corporation_name
+            representative = roster_row.representative_name
+            address = roster_row.head_office_address
+        areas = self.random.sample(ACTIVITY_AREAS, k=self.random.randint(1, 4))
+        values = {
+            "corporation_name": name,
+            "corporation_name_kana": "トクテイヒエイリカツドウホウジン",
+            "control_office": control_office,
+            "head_office_address": address,
+            "head_office_postal_code": self.postal_code(),
+            "representative_name": representative,
+            "corporate_establishment_certification_date": self.date(1999, 2020),
+            "establishment_date": self.date(1999, 2020),
+            "purpose_described_in_the_articles": self.purpose(),
+            "corporate_information_url": self.detail_url(index),
+            "corporate_number": (
+                roster_row.corporate_number if roster_row else self.corporate_number(index)
+            ),
+            "specific_non_profit_activities": "、".join(areas),
+            "business_year_start_date": "4月1日",
+            "business_year_end_date": "3月31日",
+        }
+        for i, area in enumerate(areas, start=1):
+            values[f"activity_area_{i}"] = area
+        return AllNpoDataRow(**values)
+
+    def all_npo_rows(self, roster: Sequence[ApprovedNpoRow], size: int) -> list[AllNpoDataRow]:
+        """名簿の法人を含む全NPO法人情報の行データを生成する"""
+        rows = [self.all_npo_row(index, row) for index, row in enumerate(roster)]
+        rows.extend(self.all_npo_row(index) for index in range(len(roster), size))
+        self.random.shuffle(rows)
+        return rows
+
+    def iter_all_npo_rows(
+        self, roster: Sequence[ApprovedNpoRow], size: int
+    ) -> Iterator[AllNpoDataRow]:
+        """
+        名簿の法人を含む全NPO法人情報の行データを順に生成する
+
+        all_npo_rows()と異なり全件をメモリに保持しないため、大規模なデータの生成に使用する
+        """
+        positions = dict(zip(self.random.sample(range(size), len(roster)), roster, strict=True))
+        for index in range(size):
+            roster_row = positions.get(index)
+            # 名簿に無い法人は法人番号と詳細ページのURLが名簿の法人と重複しないようにずらす
+            yield self.all_npo_row(index if roster_row else size + index, roster_row)
+
+    def information(self, row: AllNpoDataRow, tokyo_url: str = "") -> Information:
+        """NPOポータルの詳細ページの基本情報を生成する"""
+        return Information(
+            jurisdiction=row.control_office,
+            corporate_name=row.corporation_name,
+            corporate_name_kana=row.corporation_name_kana,
+            main_office_postal_code=row.head_office_postal_code,
+            main_office_address=row.head_office_address,
+            representative_name=row.representative_name,
+            establishment_approval_date=row.corporate_establishment_certification_date,
+            establishment_date=row.establishment_date,
+            articles_of_incorporation_purpose=row.purpose_described_in_the_articles,
+            activity_fields=row.specific_non_profit_activities,
+            specified_nonprofit_activities=row.specific_non_profit_activities,
+            fiscal_year_start=row.business_year_start_date,
+            fiscal_year_end=row.business_year_end_date,
+            corporate_number=row.corporate_number,
+            approval_status="認定",
+            jurisdiction_public_site=tokyo_url,
+        )
+
+    def basic_information(self, row: AllNpoDataRow) -> BasicInformation:
+        """東京都の法人・団体情報を生成する"""
+        return BasicInformation(
+            corporate_number=row.corporate_number,
+            approval_date=row.corporate_establishment_certification_date,
+            corporate_name=row.corporation_name,
+            corporate_name_kana=row.corporation_name_kana,
+            main_office_address=row.head_office_address,
+            representative_name=row.representative_name,
+            articles_of_incorporation_purpose=row.purpose_described_in_the_articles,
+            activity_fields=row.specific_non_profit_activities,
+            phone_number=f"03-{self.random.randint(1000, 9999)}-{self.random.randint(1000, 9999)}",
+            fiscal_year="4月1日～3月31日",
+            approval_status="認定",
+            validity_period="2021年4月1日～2026年3月31日",
+        )
+
+
+def render_npoportal_detail_html(
+    information: Information, report_years: Sequence[int] = (2021, 2022, 2023)
+) -> str:
+    """NPOポータルの詳細ページのHTMLを生成する"""
+    field_mapping = {value: key for key, value in Information.get_field_mapping().items()}
+    basic_rows = []
+    for field_ in fields(Information):
+        value = getattr(information, field_.name)
+        if field_.metadata.get("optional") and not value:
+            continue
+        key = field_mapping[field_.name]
+        if field_.name == "jurisdiction_public_site":
+            href = f"/npoportal/external/?url={quote(value, safe='')}"
+            cell = f'<a href="{escape(href)}">{escape(value)}</a>'
+        else:
+            cell = escape(value)
+        basic_rows.append(f"<tr><th>{escape(key)}</th><td>{cell}</td></tr>")
+
+    number = information.corporate_number
+    document_rows = []
+    for year in report_years:
+        links = "".join(
+            f'<a href="/npoportal/document/{number}/{year}/{i}.pdf">{title}</a><br>'
+            for i, title in enumerate(("事業報告書", "活動計算書", "貸借対照表", "財産目録"))
+        )
+        document_rows.append(f"<tr><th>{year}年度</th><td>{links}</td></tr>")
+    document_rows.append(
+        f'<tr><th>定款</th><td><a href="/npoportal/document/{number}/teikan.pdf">定款</a></td></tr>'
+    )
+    document_rows.append("<tr><th>役員名簿</th><td>閲覧可</td></tr>")
+
+    return f"""<!DOCTYPE html>
+<html lang="ja">
+<head><meta charset="utf-8"><title>{escape(information.corporate_name)}</title></head>
+<body>
+<div class="header"><ul>{"".join(f"<li>メニュー{i}</li>" for i in range(20))}</ul></div>
+<h2>基本情報</h2>
+<table summary="基本情報">
+{chr(10).join(basic_rows)}
+</table>
+<h2>閲覧書類等</h2>
+<table summary="閲覧書類">
+{chr(10).join(document_rows)}
+</table>
+<div class="footer"><p>内閣府NPOホームページ</p></div>
+</body>
+</html>
+"""
+
+
+def render_tokyo_detail_html(basic_information: BasicInformation, documents: int = 6) -> str:
+    """東京都の法人・団体情報詳細ページのHTMLを生成する"""
+    field_mapping = {value: key for key, value in BasicInformation.get_field_mapping().items()}
+    items = []
+    for field_ in fields(BasicInformation):
+        if field_.name == "documents":
+            continue
+        value = getattr(basic_information, field_.name)
+        if field_.metadata.get("optional") and not value:
+            continue
+        items.append(f"<dt>{escape(field_mapping[field_.name])}</dt><dd>{escape(value)}</dd>")
+    number = basic_information.corporate_number
+    links = "".join(
+        f'<li><a href="/houjin/npo_houjin/list/ledger/files/{number}_{i}.pdf">'
+        f"{2018 + i}年度 事業報告書等</a></li>"
+        for i in range(documents)
+    )
+    items.append(f"<dt>閲覧書類</dt><dd><ul>{links}</ul></dd>")
+    return f"""<!DOCTYPE html>
+<html lang="ja">
+<head><meta charset="utf-8"><title>法人・団体情報詳細</title></head>
+<body>
+<div id="main">
+<h1>{escape(basic_information.corporate_name)}</h1>
+<dl class="Corp_detail_dl">
+{chr(10).join(items)}
+</dl>
+</div>
+</body>
+</html>
+"""
+
+
+def write_roster_pdf(path: Path, rows: Sequence[ApprovedNpoRow]) -> Path:
+    """名簿PDFを出力する"""
+    table = [ApprovedNpoRow.get_csv_header(), *(row.to_csv_row() for row in rows)]
+    return write_table_pdf(path, table, ROSTER_COLUMN_WIDTHS)
+
+
+def write_all_npo_csv(path: Path, rows: Iterable[AllNpoDataRow]) -> Path:
+    """全NPO法人情報のCSV（cp932）を出力する"""
+    with open(path, mode="w", encoding="cp932", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(AllNpoDataRow.get_csv_header())
+        writer.writerows(row.to_csv_row() for row in rows)
+    return path
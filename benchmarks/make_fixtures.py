@@ -0,0 +1,60 @@
+"""
+ベンチマーク用のフィクスチャを生成する
+
+`python -m benchmarks.make_fixtures`で`benchmarks/fixtures`配下のファイルを作り直す
+"""
+
+import argparse
+from pathlib import Path
+
+from benchmarks.fixture_data import (
+    TOKYO_BASE_URL,
+    FixtureGenerator,
+    render_npoportal_detail_html,
+    render_tokyo_detail_html,
+    write_all_npo_csv,
+    write_roster_pdf,
+)
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures"
+
+ROSTER_PDF = "roster.pdf"
+ALL_NPO_CSV = "all_npo_data.csv"
+NPOPORTAL_DETAIL_HTML = "npoportal_detail.html"
+TOKYO_DETAIL_HTML = "tokyo_detail.html"
+TOKYO_DETAIL_URL = f"{TOKYO_BASE_URL}/houjin/npo_houjin/list/ledger/0000001.html"
+
+
+def make_fixtures(output_dir: Path, roster_size: int, all_npo_size: int) -> None:
+    """フィクスチャを生成する"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    generator = FixtureGenerator(seed=0)
+
+    roster = generator.roster_rows(roster_size)
+    write_roster_pdf(output_dir / ROSTER_PDF, roster)
+
+    all_npo = generator.all_npo_rows(roster, all_npo_size)
+    write_all_npo_csv(output_dir / ALL_NPO_CSV, all_npo)
+
+    row = all_npo[0]
+    information = generator.information(row, tokyo_url=TOKYO_DETAIL_URL)
+    (output_dir / NPOPORTAL_DETAIL_HTML).write_text(
+        render_npoportal_detail_html(information), encoding="utf-8"
+    )
+    (output_dir / TOKYO_DETAIL_HTML).write_text(
+        render_tokyo_detail_html(generator.basic_information(row)), encoding="utf-8"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """main"""
+    parser = argparse.ArgumentParser(description="ベンチマーク用のフィクスチャを生成する")
+    parser.add_argument("--output-dir", type=Path, default=FIXTURES_PATH)
+    parser.add_argument("--roster-size", type=int, default=100)
+    parser.add_argument("--all-npo-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    make_fixtures(args.output_dir, args.roster_size, args.all_npo_size)
+
+
+if __name__ == "__main__":
+    main()
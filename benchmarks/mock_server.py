@@ -0,0 +1,308 @@
+"""
+スクレイピング対象のサイトを模したローカルのHTTPサーバー
+
+NPOポータルの認定NPO法人一覧ページ、名簿PDF、全NPO法人情報のZIP、NPOポータルの詳細ページ、
+東京都の法人・団体情報詳細ページをフィクスチャ生成処理のデータから返す。
+詳細ページにはレイテンシ、エラー（503）、レート制限（429）を注入できる。
+
+- 単体で起動: `python -m benchmarks.mock_server --size 100 --latency uniform:0.01:0.05`
+"""
+
+import argparse
+import io
+import random
+import re
+import tempfile
+import threading
+import zipfile
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from pathlib import Path
+from time import sleep
+
+from approved_npo_data.csv.csv_row import AllNpoDataRow
+from approved_npo_data.scraping.npoportal_approved_npo_list.all_approved_npo_list_url import (
+    APPROVED_NPO_DATA_URL_PATTERN,
+)
+from benchmarks.fixture_data import (
+    FixtureGenerator,
+    render_npoportal_detail_html,
+    render_tokyo_detail_html,
+    write_all_npo_csv,
+    write_roster_pdf,
+)
+
+logger = getLogger(__name__)
+
+CERTIFICATION_PATH = "/npoportal/certification"
+ROSTER_PDF_PATH = "/npoportal/download/roster.pdf"
+ALL_NPO_ZIP_PATH = "/npoportal/download/zip/gyousei_000.zip"
+DETAIL_PATH_PATTERN = re.compile(r"^/npoportal/detail/(\d+)$")
+TOKYO_DETAIL_PATH_PATTERN = re.compile(r"^/houjin/npo_houjin/list/ledger/(\d+)\.html$")
+TOKYO_DETAIL_PATH_PREFIX = "/houjin/npo_houjin/list/ledger/"
+
+
+@dataclass(frozen=True)
+class Latency:
+    """
+    レイテンシの分布
+
+    - fixed: a秒
+    - uniform: a秒からb秒の一様分布
+    - lognormal: 中央値a秒、対数の標準偏差bの対数正規分布
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """レイテンシ（秒）を取得する"""
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return self.a * rng.lognormvariate(0, self.b)
+        raise ValueError(f"不明なレイテンシの分布です: {self.kind}")
+
+    @classmethod
+    def parse(cls, text: str) -> "Latency":
+        """`kind:a:b`形式の文字列から生成する（例: `uniform:0.01:0.05`）"""
+        kind, *params = text.split(":")
+        values = [float(p) for p in params] + [0.0, 0.0]
+        latency = cls(kind, values[0], values[1])
+        latency.sample(random.Random(0))
+        return latency
+
+
+@dataclass(frozen=True)
+class FaultConfig:
+    """詳細ページへの障害注入の設定"""
+
+    latency: Latency = field(default_factory=Latency)
+    # 503を返す割合
+    error_rate: float = 0.0
+    # 429を返す割合
+    too_many_requests_rate: float = 0.0
+    # 429のRetry-Afterヘッダ（秒）
+    retry_after_seconds: int = 1
+
+
+class MockSite:
+    """モックサーバーが返すデータ"""
+
+    def __init__(self, base_url: str, size: int, tokyo_rate: float = 0.2, seed: int = 0):
+        """
+        コンストラクタ
+
+        Args:
+            base_url (str): モックサーバーのURL
+            size (int): 名簿の件数
+            tokyo_rate (float): 東京都の法人・団体情報詳細ページを持つ法人の割合
+            seed (int): 乱数のシード
+        """
+        self.base_url = base_url
+        generator = FixtureGenerator(seed=seed, base_url=base_url)
+        roster = generator.roster_rows(size)
+        # 名簿の法人に加え、名簿に無い法人も含める
+        all_npo = generator.all_npo_rows(roster, size * 2)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.roster_pdf = write_roster_pdf(Path(temp_dir) / "roster.pdf", roster).read_bytes()
+            csv_path = write_all_npo_csv(Path(temp_dir) / "gyousei_000.csv", all_npo)
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                zip_file.write(csv_path, csv_path.name)
+            self.all_npo_zip = buffer.getvalue()
+
+        self.certification_html = (
+            '<html><body><a href="/npoportal/download/old.pdf">過去の名簿</a>'
+            f'<a href="{base_url}{ROSTER_PDF_PATH}">{APPROVED_NPO_DATA_URL_PATTERN.pattern}</a>'
+            "</body></html>"
+        ).encode()
+
+        rng = random.Random(seed)
+        self.detail_html: dict[int, bytes] = {}
+        self.tokyo_detail_html: dict[str, bytes] = {}
+        for row in all_npo:
+            index = int(row.corporate_information_url.rsplit("/", 1)[1])
+            tokyo_url = ""
+            if rng.random() < tokyo_rate:
+                tokyo_url = f"{base_url}{TOKYO_DETAIL_PATH_PREFIX}{row.corporate_number}.html"
+                self.tokyo_detail_html[row.corporate_number] = render_tokyo_detail_html(
+                    generator.basic_information(row)
+                ).encode()
+            information = generator.information(row, tokyo_url=tokyo_url)
+            self.detail_html[index] = render_npoportal_detail_html(information).encode()
+        self.all_npo: list[AllNpoDataRow] = all_npo
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """モックサーバーのリクエストハンドラ"""
+
+    server: "MockServer"
+
+    def do_GET(self):  # noqa: N802
+        """GETリクエストを処理する"""
+        site = self.server.site
+        if self.path == CERTIFICATION_PATH:
+            return self.send_body(site.certification_html, "text/html; charset=utf-8")
+        if self.path == ROSTER_PDF_PATH:
+            return self.send_body(site.roster_pdf, "application/pdf")
+        if self.path == ALL_NPO_ZIP_PATH:
+            return self.send_body(site.all_npo_zip, "application/zip")
+
+        if match := DETAIL_PATH_PATTERN.match(self.path):
+            body = site.detail_html.get(int(match.group(1)))
+        elif match := TOKYO_DETAIL_PATH_PATTERN.match(self.path):
+            body = site.tokyo_detail_html.get(match.group(1))
+        else:
+            body = None
+        if body is None:
+            return self.send_status(HTTPStatus.NOT_FOUND)
+
+        # 詳細ページのみ障害を注入する
+        if self.server.inject_fault(self):
+            return None
+        return self.send_body(body, "text/html; charset=utf-8")
+
+    def send_body(self, body: bytes, content_type: str) -> None:
+        """レスポンスを返す"""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_status(self, status: HTTPStatus, headers: dict[str, str] | None = None) -> None:
+        """本文の無いレスポンスを返す"""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):  # noqa: A002
+        """アクセスログはデバッグレベルで出力する"""
+        logger.debug(format, *args)
+
+
+class MockServer(ThreadingHTTPServer):
+    """スクレイピング対象のサイトを模したHTTPサーバー"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        size: int,
+        fault: FaultConfig | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ):
+        """
+        コンストラクタ
+
+        Args:
+            size (int): 名簿の件数
+            fault (FaultConfig | None): 詳細ページへの障害注入の設定
+            host (str): 待ち受けるホスト
+            port (int): 待ち受けるポート（0の場合は空いているポート）
+            seed (int): 乱数のシード
+        """
+        super().__init__((host, port), MockRequestHandler)
+        self.fault = fault or FaultConfig()
+        self.url = f"http://{host}:{self.server_address[1]}"
+        self.site = MockSite(self.url, size, seed=seed)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def inject_fault(self, handler: MockRequestHandler) -> bool:
+        """設定に従ってレイテンシとエラーを注入する。エラーを返した場合はTrueを返す"""
+        with self._lock:
+            latency = self.fault.latency.sample(self._random)
+            roll = self._random.random()
+        sleep(latency)
+        if roll < self.fault.too_many_requests_rate:
+            handler.send_status(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                {"Retry-After": str(self.fault.retry_after_seconds)},
+            )
+            return True
+        if roll < self.fault.too_many_requests_rate + self.fault.error_rate:
+            handler.send_status(HTTPStatus.SERVICE_UNAVAILABLE)
+            return True
+        return False
+
+    def start(self) -> "MockServer":
+        """バックグラウンドのスレッドでリクエストの受付を開始する"""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """リクエストの受付を停止する"""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "MockServer":
+        """リクエストの受付を開始する"""
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        """リクエストの受付を停止する"""
+        self.stop()
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    """障害注入の設定のコマンドライン引数を追加する"""
+    parser.add_argument(
+        "--latency",
+        type=Latency.parse,
+        default=Latency(),
+        help="詳細ページのレイテンシ（例: fixed:0.05, uniform:0.01:0.1, lognormal:0.05:0.5）",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503を返す割合")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429を返す割合")
+    parser.add_argument("--retry-after", type=int, default=1, help="429のRetry-After（秒）")
+
+
+def fault_config_from_args(args: argparse.Namespace) -> FaultConfig:
+    """コマンドライン引数から障害注入の設定を作成する"""
+    return FaultConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        too_many_requests_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """main"""
+    parser = argparse.ArgumentParser(description="スクレイピング対象のサイトを模したHTTPサーバー")
+    parser.add_argument("--size", type=int, default=100, help="名簿の件数")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = MockServer(args.size, fault_config_from_args(args), args.host, args.port)
+    print(f"serving on {server.url}{CERTIFICATION_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+詳細ページのパーサーのスケーリング計測
+
+項目数（dt/dd、表の行、閲覧書類のリンク）を変えたセクションを生成し、1項目あたりの処理時間を出力する。
+処理時間が項目数に比例する（1項目あたりの処理時間がほぼ一定になる）ことを確認するために使用する。
+
+- 実行: `python -m benchmarks.parse_scaling --sizes 10 100 1000 10000`
+"""
+
+import argparse
+import json
+import timeit
+from collections.abc import Callable
+from html import escape
+from pathlib import Path
+from typing import Any
+
+from bs4 import BeautifulSoup, Tag
+
+from approved_npo_data.scraping.npoportal_detail.detail_tables import extract_tables
+from approved_npo_data.scraping.tokyo_detail.tokyo_detail import parse_details_section
+from benchmarks.make_fixtures import TOKYO_DETAIL_URL
+
+RESULT_PATH = Path(__file__).parent / "results" / "parse_scaling.json"
+
+
+def tokyo_section(size: int) -> Tag:
+    """項目（dt/dd）と閲覧書類のリンクをsize件ずつ含む東京都の法人・団体情報詳細セクションを生成する"""
+    items = "".join(f"<dt>項目{i}</dt><dd>{escape(f'値{i}')}</dd>" for i in range(size))
+    links = "".join(
+        f'<li><a href="files/{i}.pdf">{i}年度 事業報告書等</a></li>' for i in range(size)
+    )
+    html = f'<dl class="Corp_detail_dl">{items}<dt>閲覧書類</dt><dd><ul>{links}</ul></dd></dl>'
+    section = BeautifulSoup(html, "html.parser").find("dl")
+    assert isinstance(section, Tag)
+    return section
+
+
+def npoportal_page(size: int) -> BeautifulSoup:
+    """基本情報と閲覧書類等の表の行をsize件ずつ含むNPO法人ポータルの詳細ページを生成する"""
+    information = "".join(
+        f"<tr><th>項目{i}</th><td>{escape(f'値{i}')}</td></tr>" for i in range(size)
+    )
+    documents = "".join(
+        f'<tr><th>{i}年度</th><td><a href="{i}/0.pdf">事業報告書</a><br/></td></tr>'
+        for i in range(size)
+    )
+    html = (
+        f'<div><table summary="基本情報">{information}</table>'
+        f'<table summary="閲覧書類">{documents}</table></div>'
+    )
+    return BeautifulSoup(html, "html.parser")
+
+
+# 計測対象: 名前 → (項目数からセクションを生成する関数, セクションを解析する関数)
+CASES: dict[str, tuple[Callable[[int], Any], Callable[[Any], Any]]] = {
+    "tokyo": (tokyo_section, lambda section: parse_details_section(section, TOKYO_DETAIL_URL)),
+    "npoportal": (npoportal_page, extract_tables),
+}
+
+
+def measure(name: str, size: int) -> dict[str, float]:
+    """1回あたりと1項目あたりの処理時間を計測する"""
+    create, parse = CASES[name]
+    section = create(size)
+    timer = timeit.Timer(lambda: parse(section))
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=3, number=number)) / number
+    return {"size": size, "seconds": seconds, "us_per_item": seconds / size * 1e6}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """main"""
+    parser = argparse.ArgumentParser(description="詳細ページのパーサーのスケーリング計測")
+    parser.add_argument("names", nargs="*", help=f"計測対象（{', '.join(CASES)}。省略時はすべて）")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--output", type=Path, default=RESULT_PATH)
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(CASES)
+    if unknown:
+        parser.error(f"不明な計測対象です: {', '.join(sorted(unknown))}")
+
+    results = {}
+    print(f"{'name':<12}{'size':>8}{'total [ms]':>14}{'per item [us]':>16}")
+    for name in args.names or CASES:
+        results[name] = []
+        for size in args.sizes:
+            result = measure(name, size)
+            results[name].append(result)
+            print(
+                f"{name:<12}{size:>8}{result['seconds'] * 1000:>14.3f}"
+                f"{result['us_per_item']:>16.2f}"
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, mode="w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""表形式のPDFファイルを作成する（ベンチマーク用の名簿PDFの作成に使用する）"""
+
+from collections.abc import Sequence
+from pathlib import Path
+
+# A4横（pt）
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+MARGIN = 20
+FONT_SIZE = 5
+LINE_HEIGHT = FONT_SIZE + 1
+CELL_PADDING = 1
+
+
+def wrap_text(text: str, width: float) -> list[str]:
+    """セルの幅に収まるように文字列を折り返す（全角・半角とも1文字=1emとして扱う）"""
+    chars_per_line = max(int((width - CELL_PADDING * 2) / FONT_SIZE), 1)
+    return [text[i : i + chars_per_line] for i in range(0, len(text), chars_per_line)] or [""]
+
+
+def encode_text(text: str) -> str:
+    """UniJIS-UCS2-Hで表示するための16進数文字列に変換する"""
+    return text.encode("utf-16-be").hex().upper()
+
+
+def render_page(rows: Sequence[Sequence[str]], column_widths: Sequence[float]) -> bytes:
+    """1ページ分のコンテンツストリームを作成する"""
+    commands = ["0.5 w"]
+    y = PAGE_HEIGHT - MARGIN
+    table_width = sum(column_widths)
+    commands.append(f"{MARGIN} {y} m {MARGIN + table_width} {y} l S")
+    for row in rows:
+        wrapped = [wrap_text(cell, width) for cell, width in zip(row, column_widths, strict=True)]
+        height = max(len(lines) for lines in wrapped) * LINE_HEIGHT + CELL_PADDING * 2
+        x = MARGIN
+        for lines, width in zip(wrapped, column_widths, strict=True):
+            for i, line in enumerate(lines):
+                if not line:
+                    continue
+                text_x = x + CELL_PADDING
+                text_y = y - CELL_PADDING - (i + 1) * LINE_HEIGHT + 1
+                commands.append(
+                    f"BT /F1 {FONT_SIZE} Tf {text_x} {text_y} Td <{encode_text(line)}> Tj ET"
+                )
+            x += width
+        y -= height
+        commands.append(f"{MARGIN} {y} m {MARGIN + table_width} {y} l S")
+    top = PAGE_HEIGHT - MARGIN
+    x = MARGIN
+    for width in [0, *column_widths]:
+        x += width
+        commands.append(f"{x} {top} m {x} {y} l S")
+    return "\n".join(commands).encode("ascii")
+
+
+def paginate(
+    rows: Sequence[Sequence[str]], column_widths: Sequence[float]
+) -> list[list[Sequence[str]]]:
+    """行をページに振り分ける（各ページの先頭にはヘッダ行を入れる）"""
+    header, *body = rows
+    available = PAGE_HEIGHT - MARGIN * 2
+
+    def row_height(row):
+        lines = max(len(wrap_text(c, w)) for c, w in zip(row, column_widths, strict=True))
+        return lines * LINE_HEIGHT + CELL_PADDING * 2
+
+    pages: list[list[Sequence[str]]] = []
+    page: list[Sequence[str]] = [header]
+    used = row_height(header)
+    for row in body:
+        height = row_height(row)
+        if used + height > available and len(page) > 1:
+            pages.append(page)
+            page, used = [header], row_height(header)
+        page.append(row)
+        used += height
+    pages.append(page)
+    return pages
+
+
+def write_table_pdf(
+    path: Path, rows: Sequence[Sequence[str]], column_widths: Sequence[float]
+) -> Path:
+    """
+    罫線付きの表を含むPDFファイルを作成する
+
+    rowsの先頭はヘッダ行として各ページの先頭に出力する。
+    日本語を表示するため、フォントは埋め込まずにHeiseiKakuGo-W5（Adobe-Japan1）を参照する。
+    """
+    pages = [render_page(page, column_widths) for page in paginate(rows, column_widths)]
+
+    # 1: Catalog, 2: Pages, 3: Font, 4: CIDFont, 5: FontDescriptor, 6以降: Page, Contents
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type0 /BaseFont /HeiseiKakuGo-W5 "
+        b"/Encoding /UniJIS-UCS2-H /DescendantFonts [4 0 R] >>",
+        b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /HeiseiKakuGo-W5 "
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Japan1) /Supplement 2 >> "
+        b"/FontDescriptor 5 0 R /DW 1000 >>",
+        b"<< /Type /FontDescriptor /FontName /HeiseiKakuGo-W5 /Flags 4 "
+        b"/FontBBox [0 -120 1000 880] /ItalicAngle 0 /Ascent 880 /Descent -120 "
+        b"/CapHeight 700 /StemV 80 >>",
+    ]
+    page_ids = []
+    for content in pages:
+        page_id = len(objects) + 1
+        page_ids.append(page_id)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream"
+        )
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+    path.write_bytes(bytes(output))
+    return path
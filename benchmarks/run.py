@@ -0,0 +1,276 @@
+"""
+パーサーとシリアライザのベンチマーク
+
+`benchmarks/fixtures`配下のフィクスチャを使用するため、ネットワークには接続しない。
+
+- 実行: `python -m benchmarks.run`
+- ベースラインの更新: `python -m benchmarks.run --update-baseline`
+
+結果は`benchmarks/results/latest.json`に出力し、`benchmarks/baseline.json`が存在する場合は
+ベースラインと比較する。処理時間は実行環境に依存するため、ベースラインはリポジトリに含めず、
+比較する環境で作成する。環境の差を補正するため、各ベンチマークの処理時間はこのリポジトリのコードを
+使用しない較正用のベンチマーク（calibration）の処理時間との比で比較する。
+"""
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import timeit
+import unicodedata
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from bs4 import BeautifulSoup
+
+from approved_npo_data.all_npo_data import read_csv
+from approved_npo_data.approved_npo_data import extract_tables_from_pdf
+from approved_npo_data.csv.csv_row import ApprovedNpoRow, OutputApprovedNpoRow
+from approved_npo_data.scraping.npoportal_detail.detail_tables import extract_tables
+from approved_npo_data.scraping.npoportal_detail.information import (
+    extract_table_data,
+    scrape_npo_information,
+)
+from approved_npo_data.scraping.npoportal_detail.Information_model import Information
+from approved_npo_data.scraping.npoportal_detail.viewing_documents import scrape_viewing_documents
+from approved_npo_data.scraping.tokyo_detail.information_model import BasicInformation
+from approved_npo_data.scraping.tokyo_detail.tokyo_detail import create_basic_information
+from approved_npo_data.util.file_operations import save_csv
+from approved_npo_data.util.text_format import standardize_text_for_key, standardize_texts
+from benchmarks.make_fixtures import (
+    ALL_NPO_CSV,
+    FIXTURES_PATH,
+    NPOPORTAL_DETAIL_HTML,
+    ROSTER_PDF,
+    TOKYO_DETAIL_HTML,
+    TOKYO_DETAIL_URL,
+)
+
+BENCHMARKS_PATH = Path(__file__).parent
+BASELINE_PATH = BENCHMARKS_PATH / "baseline.json"
+RESULT_PATH = BENCHMARKS_PATH / "results" / "latest.json"
+
+# 結果を比較する際に許容する遅延の割合（0.2の場合は20%まで）
+DEFAULT_THRESHOLD = 0.2
+
+# 実行環境の速度の差を補正するための較正用のベンチマークの名前
+CALIBRATION = "calibration"
+
+# 文字列の標準化のベンチマークで対象とする全NPO法人情報の列
+STANDARDIZE_COLUMNS = (
+    "corporate_number",
+    "corporation_name",
+    "control_office",
+    "head_office_address",
+)
+
+reference_whitespace_pattern = re.compile(r"[\u3000\s\t]+")
+
+
+def reference_standardize_text_for_key(text: str) -> str:
+    """比較用のキャッシュ等の最適化をしていない文字列の標準化"""
+    return reference_whitespace_pattern.sub("", unicodedata.normalize("NFKC", text))
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """ベンチマークの定義"""
+
+    name: str
+    func: Callable[[], Any]
+
+
+def calibrate(size: int = 10000) -> int:
+    """較正用の処理（文字列の生成、ソート、辞書の操作）"""
+    values = sorted(f"{i * 7919 % size:08d}" for i in range(size))
+    counts: dict[str, int] = {}
+    for value in values:
+        counts[value[:4]] = counts.get(value[:4], 0) + 1
+    return len(counts)
+
+
+def load_soup(file_name: str) -> BeautifulSoup:
+    """フィクスチャのHTMLを解析する"""
+    return BeautifulSoup((FIXTURES_PATH / file_name).read_bytes(), "html.parser")
+
+
+def create_output_rows(size: int) -> list[OutputApprovedNpoRow]:
+    """出力データを作成する"""
+    all_npo = list(read_csv(FIXTURES_PATH / ALL_NPO_CSV).values())
+    empty_approved_npo = [""] * len(ApprovedNpoRow.get_csv_header())
+    # NPOポータルの詳細ページの情報 + 年度 + 閲覧書類のURL
+    empty_detail = [""] * (len(Information.get_csv_header()) + 2)
+    empty_tokyo = [""] * len(BasicInformation.get_csv_header())
+    return [
+        OutputApprovedNpoRow(
+            *empty_approved_npo,
+            *all_npo[i % len(all_npo)].to_csv_row(),
+            *empty_detail,
+            *empty_tokyo,
+        )
+        for i in range(size)
+    ]
+
+
+def create_benchmarks(output_dir: Path) -> list[Benchmark]:
+    """ベンチマークを作成する"""
+    npoportal_soup = load_soup(NPOPORTAL_DETAIL_HTML)
+    tokyo_section = load_soup(TOKYO_DETAIL_HTML).find("dl", class_="Corp_detail_dl")
+    information_dict = extract_table_data(npoportal_soup)
+    output_rows = create_output_rows(1000)
+    output_row = output_rows[0]
+    all_npo_rows = list(read_csv(FIXTURES_PATH / ALL_NPO_CSV).values())
+    all_npo_values = [
+        getattr(row, column) for row in all_npo_rows for column in STANDARDIZE_COLUMNS
+    ]
+
+    return [
+        Benchmark(CALIBRATION, calibrate),
+        Benchmark(
+            "extract_tables_from_pdf", lambda: extract_tables_from_pdf(FIXTURES_PATH / ROSTER_PDF)
+        ),
+        Benchmark("read_csv", lambda: read_csv(FIXTURES_PATH / ALL_NPO_CSV)),
+        Benchmark("scrape_viewing_documents", lambda: scrape_viewing_documents(npoportal_soup)),
+        Benchmark("scrape_npo_information", lambda: scrape_npo_information(npoportal_soup)),
+        Benchmark("extract_tables", lambda: extract_tables(npoportal_soup)),
+        Benchmark(
+            "create_basic_information",
+            lambda: create_basic_information(tokyo_section, TOKYO_DETAIL_URL),  # type: ignore
+        ),
+        Benchmark("from_dict", lambda: Information.from_dict(information_dict)),
+        Benchmark("to_csv_row", lambda: output_row.to_csv_row()),
+        Benchmark("save_csv", lambda: save_csv(output_rows, output_dir / "output.csv")),
+        Benchmark(
+            "standardize_reference",
+            lambda: [reference_standardize_text_for_key(value) for value in all_npo_values],
+        ),
+        Benchmark(
+            "standardize_text_for_key",
+            lambda: [standardize_text_for_key(value) for value in all_npo_values],
+        ),
+        Benchmark(
+            "standardize_texts",
+            lambda: [
+                standardize_texts(getattr(row, column) for row in all_npo_rows)
+                for column in STANDARDIZE_COLUMNS
+            ],
+        ),
+    ]
+
+
+def measure(benchmark: Benchmark, repeat: int) -> dict[str, float]:
+    """ベンチマークを実行し、1回あたりの処理時間（秒）を返す"""
+    timer = timeit.Timer(benchmark.func)
+    number, _ = timer.autorange()
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "number": number,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+    }
+
+
+def get_scale(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]) -> float:
+    """ベースラインを作成した環境に対する実行環境の処理時間の比（較正用のベンチマークの比）"""
+    if CALIBRATION not in results or CALIBRATION not in baseline:
+        print("較正用のベンチマークがないため、処理時間を補正せずに比較します", file=sys.stderr)
+        return 1.0
+    return results[CALIBRATION]["median"] / baseline[CALIBRATION]["median"]
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float
+) -> list[str]:
+    """
+    ベースラインと比較し、遅くなったベンチマークの名前を返す
+
+    ※ベースラインの処理時間は、較正用のベンチマークの比で実行環境の処理時間に換算して比較する
+    """
+    regressions = []
+    scale = get_scale(results, baseline) if baseline else 1.0
+    print(f"scale: {scale:.2f}")
+    print(f"{'name':<28}{'median [ms]':>14}{'baseline [ms]':>16}{'ratio':>8}")
+    for name, result in results.items():
+        median = result["median"] * 1000
+        if name not in baseline:
+            print(f"{name:<28}{median:>14.3f}{'-':>16}{'-':>8}")
+            continue
+        base = baseline[name]["median"] * 1000 * scale
+        ratio = median / base if base else float("inf")
+        mark = ""
+        if name != CALIBRATION and ratio > 1 + threshold:
+            regressions.append(name)
+            mark = " !"
+        print(f"{name:<28}{median:>14.3f}{base:>16.3f}{ratio:>8.2f}{mark}")
+    return regressions
+
+
+def run(names: list[str] | None, repeat: int) -> dict[str, dict[str, float]]:
+    """ベンチマークを実行する（較正用のベンチマークは常に実行する）"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        benchmarks = create_benchmarks(Path(temp_dir))
+        return {
+            benchmark.name: measure(benchmark, repeat)
+            for benchmark in benchmarks
+            if not names or benchmark.name in names or benchmark.name == CALIBRATION
+        }
+
+
+def write_json(path: Path, results: dict[str, dict[str, float]]) -> None:
+    """結果をJSONファイルに出力する"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, mode="w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """main"""
+    parser = argparse.ArgumentParser(description="パーサーとシリアライザのベンチマーク")
+    parser.add_argument("names", nargs="*", help="実行するベンチマーク（省略時はすべて）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=RESULT_PATH)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.names, args.repeat)
+    write_json(args.output, results)
+
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline_data = json.load(file)
+        baseline = baseline_data["results"]
+        if baseline_data.get("python") != platform.python_version():
+            print(
+                f"ベースラインのPython（{baseline_data.get('python')}）が実行環境"
+                f"（{platform.python_version()}）と異なります",
+                file=sys.stderr,
+            )
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.update_baseline:
+        write_json(args.baseline, {**baseline, **results})
+        print(f"baseline updated: {args.baseline}")
+    elif regressions:
+        print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
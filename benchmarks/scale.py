@@ -0,0 +1,227 @@
+"""
+大規模データでの性能計測
+
+全国の件数（全NPO法人情報 約5万件、認定・特例認定NPO法人 約1,300件）の任意の倍率のデータを生成し、
+全NPO法人情報の読み込み、出力データの作成、CSVの保存の処理時間とピークRSSを計測する。
+計測はデータ量毎に別プロセスで実行するため、ピークRSSは他のデータ量の影響を受けない。
+
+- データの生成: `python -m benchmarks.scale generate --scale 10 --output-dir /tmp/x10`
+- 計測: `python -m benchmarks.scale report --scales 0.1 1 10 100`
+"""
+
+import argparse
+import csv
+import json
+import resource
+import subprocess
+import sys
+import zipfile
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from time import perf_counter
+from typing import Any, TypeVar
+
+from approved_npo_data.all_npo_data import read_csv
+from approved_npo_data.approved_npo_data import extract_tables_from_pdf
+from approved_npo_data.csv.csv_row import AllNpoDataRow, ApprovedNpoRow, OutputApprovedNpoRow
+from approved_npo_data.scraping.npoportal_detail.Information_model import Information
+from approved_npo_data.scraping.tokyo_detail.information_model import BasicInformation
+from approved_npo_data.util.file_operations import save_csv
+from benchmarks.fixture_data import (
+    FixtureGenerator,
+    render_npoportal_detail_html,
+    write_all_npo_csv,
+    write_roster_pdf,
+)
+
+BENCHMARKS_PATH = Path(__file__).parent
+DATA_ROOT_PATH = BENCHMARKS_PATH / "scale_data"
+RESULT_PATH = BENCHMARKS_PATH / "results" / "scaling.json"
+
+# 全国の件数（倍率1の場合の件数）
+NATIONAL_ALL_NPO_ROWS = 50_000
+NATIONAL_APPROVED_ROWS = 1_300
+
+ROSTER_PDF = "roster.pdf"
+ROSTER_CSV = "roster.csv"
+ALL_NPO_CSV = "all_npo_data.csv"
+ALL_NPO_ZIP = "gyousei_000.zip"
+DETAIL_DIR = "detail"
+
+T = TypeVar("T")
+
+
+def generate(
+    output_dir: Path, scale: float, detail_pages: int | None = None, seed: int = 0
+) -> dict[str, int]:
+    """
+    指定した倍率のデータを生成する
+
+    Args:
+        output_dir (Path): 出力先
+        scale (float): 全国の件数に対する倍率
+        detail_pages (int | None): 生成するNPOポータルの詳細ページの件数（Noneの場合は名簿の全件）
+        seed (int): 乱数のシード
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    generator = FixtureGenerator(seed=seed)
+    roster_size = max(int(NATIONAL_APPROVED_ROWS * scale), 1)
+    all_npo_size = max(int(NATIONAL_ALL_NPO_ROWS * scale), roster_size)
+
+    roster = generator.roster_rows(roster_size)
+    write_roster_pdf(output_dir / ROSTER_PDF, roster)
+    # 名簿PDFの解析を省略して計測する場合に使用する
+    save_csv(roster, output_dir / ROSTER_CSV)
+
+    # 名簿の法人の行データは詳細ページの生成に使用する
+    roster_numbers = {row.corporate_number for row in roster}
+    roster_npo_rows: list[AllNpoDataRow] = []
+
+    def collect(rows: Iterator[AllNpoDataRow]) -> Iterator[AllNpoDataRow]:
+        for row in rows:
+            if row.corporate_number in roster_numbers:
+                roster_npo_rows.append(row)
+            yield row
+
+    csv_path = write_all_npo_csv(
+        output_dir / ALL_NPO_CSV, collect(generator.iter_all_npo_rows(roster, all_npo_size))
+    )
+    with zipfile.ZipFile(output_dir / ALL_NPO_ZIP, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.write(csv_path, csv_path.name)
+
+    detail_dir = output_dir / DETAIL_DIR
+    detail_dir.mkdir(exist_ok=True)
+    for row in roster_npo_rows[:detail_pages]:
+        index = row.corporate_information_url.rsplit("/", 1)[1]
+        (detail_dir / f"{index}.html").write_text(
+            render_npoportal_detail_html(generator.information(row)), encoding="utf-8"
+        )
+    return {"roster_rows": roster_size, "all_npo_rows": all_npo_size}
+
+
+def peak_rss_mb() -> float:
+    """プロセスのピークRSS（MB）を取得する"""
+    # Linuxの場合はKB単位
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def read_roster_csv(path: Path) -> list[ApprovedNpoRow]:
+    """生成時に出力した名簿のCSVを読み込む"""
+    with open(path, encoding="utf-8", newline="") as file:
+        reader = csv.reader(file)
+        next(reader)
+        return [ApprovedNpoRow(*row) for row in reader]
+
+
+def measure(data_dir: Path, skip_pdf: bool = False) -> dict[str, Any]:
+    """処理段階毎の処理時間（秒）とその時点までのピークRSS（MB）を計測する"""
+    stages: dict[str, dict[str, float]] = {}
+
+    def timed(name: str, func: Callable[[], T]) -> T:
+        start = perf_counter()
+        result = func()
+        stages[name] = {"seconds": perf_counter() - start, "peak_rss_mb": peak_rss_mb()}
+        return result
+
+    if skip_pdf:
+        roster = read_roster_csv(data_dir / ROSTER_CSV)
+    else:
+        roster = timed(
+            "extract_tables_from_pdf", lambda: extract_tables_from_pdf(data_dir / ROSTER_PDF)
+        )
+    all_npo_data = timed("read_csv", lambda: read_csv(data_dir / ALL_NPO_CSV))
+
+    # NPOポータルの詳細ページの情報 + 年度 + 閲覧書類のURL
+    empty_detail = [""] * (len(Information.get_csv_header()) + 2)
+    empty_tokyo = BasicInformation.emptyInstance().to_csv_row()
+
+    def build_output_data() -> list[OutputApprovedNpoRow]:
+        empty_npo_data = AllNpoDataRow.emptyInstance()
+        return [
+            OutputApprovedNpoRow(
+                *row.to_csv_row(),
+                *all_npo_data.get(row.corporate_number, empty_npo_data).to_csv_row(),
+                *empty_detail,
+                *empty_tokyo,
+            )
+            for row in roster
+        ]
+
+    output_data = timed("build_output_data", build_output_data)
+    timed("save_csv", lambda: save_csv(output_data, data_dir / "output.csv"))
+    (data_dir / "output.csv").unlink()
+    return {
+        "roster_rows": len(roster),
+        "all_npo_rows": len(all_npo_data),
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def report(
+    scales: list[float], data_root: Path, skip_pdf: bool, detail_pages: int | None
+) -> list[dict[str, Any]]:
+    """倍率毎にデータを生成し、別プロセスで計測する"""
+    results = []
+    for scale in scales:
+        data_dir = data_root / f"x{scale:g}"
+        if not (data_dir / ALL_NPO_CSV).exists():
+            print(f"generate scale={scale:g} data_dir={data_dir}", file=sys.stderr)
+            generate(data_dir, scale, detail_pages)
+        command = [sys.executable, "-m", "benchmarks.scale", "measure", str(data_dir)]
+        if skip_pdf:
+            command.append("--skip-pdf")
+        completed = subprocess.run(command, capture_output=True, text=True, check=True)
+        result = {"scale": scale, **json.loads(completed.stdout)}
+        results.append(result)
+        print_result(result)
+    return results
+
+
+def print_result(result: dict[str, Any]) -> None:
+    """計測結果を出力する"""
+    print(
+        f"scale={result['scale']:g} roster_rows={result['roster_rows']} "
+        f"all_npo_rows={result['all_npo_rows']} peak_rss={result['peak_rss_mb']:.1f}MB"
+    )
+    for name, stage in result["stages"].items():
+        print(f"  {name:<24}{stage['seconds']:>10.3f}s{stage['peak_rss_mb']:>10.1f}MB")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """main"""
+    parser = argparse.ArgumentParser(description="大規模データでの性能計測")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="データを生成する")
+    generate_parser.add_argument(
+        "--scale", type=float, required=True, help="全国の件数に対する倍率"
+    )
+    generate_parser.add_argument("--output-dir", type=Path, required=True)
+    generate_parser.add_argument("--detail-pages", type=int, default=None)
+
+    measure_parser = subparsers.add_parser("measure", help="生成済みのデータで計測する")
+    measure_parser.add_argument("data_dir", type=Path)
+    measure_parser.add_argument("--skip-pdf", action="store_true", help="名簿PDFの解析を省略する")
+
+    report_parser = subparsers.add_parser("report", help="倍率毎に生成と計測を行う")
+    report_parser.add_argument("--scales", type=float, nargs="+", default=[0.1, 1, 10])
+    report_parser.add_argument("--data-root", type=Path, default=DATA_ROOT_PATH)
+    report_parser.add_argument("--skip-pdf", action="store_true", help="名簿PDFの解析を省略する")
+    report_parser.add_argument("--detail-pages", type=int, default=100)
+    report_parser.add_argument("--output", type=Path, default=RESULT_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        print(json.dumps(generate(args.output_dir, args.scale, args.detail_pages)))
+    elif args.command == "measure":
+        print(json.dumps(measure(args.data_dir, args.skip_pdf)))
+    else:
+        results = report(args.scales, args.data_root, args.skip_pdf, args.detail_pages)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, mode="w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
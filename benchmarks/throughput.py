@@ -0,0 +1,144 @@
+"""
+モックサーバーを使ったエンドツーエンドのスループット計測
+
+`benchmarks.mock_server`を起動し、取得先のURLをモックサーバーに向けた状態で`main.main()`を
+ワーカー数を変えながら実行し、1秒あたりの処理件数を出力する。
+
+- 実行: `python -m benchmarks.throughput --size 200 --workers 1 4 8 --latency uniform:0.01:0.05`
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter
+from unittest import mock
+
+from benchmarks.mock_server import (
+    ALL_NPO_ZIP_PATH,
+    CERTIFICATION_PATH,
+    TOKYO_DETAIL_PATH_PREFIX,
+    MockServer,
+    add_fault_arguments,
+    fault_config_from_args,
+)
+
+RESULT_PATH = Path(__file__).parent / "results" / "throughput.json"
+
+
+@dataclass
+class ThroughputResult:
+    """スループットの計測結果"""
+
+    workers: int
+    records: int
+    seconds: float
+    records_per_second: float
+    http_requests: int
+    http_errors: int
+    http_too_many_requests: int
+    http_retries: int
+    deferred_retries: int
+    retry_failures: int
+    parse_failures: int
+
+
+def patch_targets(server: MockServer, work_dir: Path) -> ExitStack:
+    """取得先のURLと出力先をモックサーバーと作業ディレクトリに差し替える"""
+    import main
+    from approved_npo_data import all_npo_data
+    from approved_npo_data.scraping.npoportal_approved_npo_list import all_approved_npo_list_url
+    from approved_npo_data.scraping.tokyo_detail import tokyo_detail
+    from approved_npo_data.util.ttl_cache import TtlCache
+
+    tokyo_prefix = f"{server.url}{TOKYO_DETAIL_PATH_PREFIX}"
+    stack = ExitStack()
+    for target, value in (
+        (all_approved_npo_list_url, ("ALL_APPROVED_NPO_LIST_URL", server.url + CERTIFICATION_PATH)),
+        (all_approved_npo_list_url, ("url_cache", TtlCache(work_dir / "url_cache.json", 0))),
+        (all_npo_data, ("ALL_NPO_DATA_URL", server.url + ALL_NPO_ZIP_PATH)),
+        (tokyo_detail, ("is_tokyo_detail_url", lambda url: url.startswith(tokyo_prefix))),
+        (main, ("BASE_PATH", work_dir)),
+    ):
+        stack.enter_context(mock.patch.object(target, *value))
+    return stack
+
+
+def run(server: MockServer, workers: int, delay: float) -> ThroughputResult:
+    """main.main()を実行し、スループットを計測する"""
+    import main
+    from approved_npo_data.util.metrics import metrics, to_labels
+
+    metrics.reset()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        (work_dir / "output").mkdir()
+        with (
+            patch_targets(server, work_dir),
+            mock.patch.object(main, "SCRAPING_DELAY_SECONDS", delay),
+        ):
+            start = perf_counter()
+            main.main(workers)
+            seconds = perf_counter() - start
+
+    def total(name: str, **labels) -> int:
+        values = metrics.counters().get(name, {})
+        expected = set(to_labels(labels))
+        return int(sum(v for key, v in values.items() if expected <= set(key)))
+
+    records = total("records_processed_total")
+    return ThroughputResult(
+        workers=workers,
+        records=records,
+        seconds=seconds,
+        records_per_second=records / seconds if seconds else 0.0,
+        http_requests=total("http_requests_total"),
+        http_errors=total("http_requests_total", status="503")
+        + total("http_requests_total", status="error"),
+        http_too_many_requests=total("http_requests_total", status="429"),
+        http_retries=total("http_retries_total"),
+        deferred_retries=total("deferred_retries_total"),
+        retry_failures=total("retry_failures_total"),
+        parse_failures=total("parse_failures_total"),
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """main"""
+    parser = argparse.ArgumentParser(description="モックサーバーを使ったスループット計測")
+    parser.add_argument("--size", type=int, default=100, help="名簿の件数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--delay", type=float, default=0.0, help="SCRAPING_DELAY_SECONDSの値")
+    parser.add_argument("--output", type=Path, default=RESULT_PATH)
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    import main as main_module  # noqa: F401  ログの設定を読み込んでから出力レベルを変更する
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = []
+    with MockServer(args.size, fault_config_from_args(args)) as server:
+        for workers in args.workers:
+            result = run(server, workers, args.delay)
+            results.append(result)
+            print(
+                f"workers={result.workers:<4} records={result.records:<6} "
+                f"seconds={result.seconds:8.2f} records/sec={result.records_per_second:8.2f} "
+                f"429={result.http_too_many_requests} errors={result.http_errors} "
+                f"retries={result.http_retries} deferred={result.deferred_retries} "
+                f"failed={result.retry_failures}",
+                file=sys.stderr,
+            )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, mode="w", encoding="utf-8") as file:
+        json.dump([asdict(r) for r in results], file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
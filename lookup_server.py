@@ -0,0 +1,57 @@
+"""最新の出力データを検索するHTTPサービスを起動する"""
+
+import argparse
+from logging import getLogger
+from pathlib import Path
+
+from approved_npo_data.config import (
+    BASE_PATH,
+    LOG_SAMPLING_BURST,
+    LOG_SAMPLING_INTERVAL_SECONDS,
+    LOOKUP_SERVICE_HOST,
+    LOOKUP_SERVICE_PORT,
+    LOOKUP_SERVICE_RELOAD_INTERVAL_SECONDS,
+)
+from approved_npo_data.lookup_service import LookupServer, LookupService
+from approved_npo_data.util.logging_setup import setup_logging
+
+setup_logging("logging.conf", LOG_SAMPLING_INTERVAL_SECONDS, LOG_SAMPLING_BURST)
+logger = getLogger(__name__)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="最新の出力データを検索するHTTPサービス")
+    parser.add_argument(
+        "--base-path",
+        type=Path,
+        default=BASE_PATH,
+        help="出力先のベースパス（`{base_path}/output`フォルダの出力CSVを読み込む）",
+    )
+    parser.add_argument("--host", default=LOOKUP_SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=LOOKUP_SERVICE_PORT)
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=LOOKUP_SERVICE_RELOAD_INTERVAL_SECONDS,
+        help="新しい出力データを確認する間隔（秒）",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    service = LookupService(args.base_path)
+    if not service.reload_if_updated():
+        logger.warning("出力データがありません。 base_path=%r", args.base_path)
+    service.start_watching(args.reload_interval)
+    server = LookupServer(service, args.host, args.port)
+    logger.info("start lookup server http://%s:%s", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop_watching()
+        logger.info("end lookup server")
@@ -1,21 +1,100 @@
 """main"""
 
-from logging import config, getLogger
+import argparse
+import json
+import math
+import os
+import socket
+import sys
+from collections.abc import Callable, Iterator
+from concurrent.futures import CancelledError
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import getLogger
 from pathlib import Path
 from time import perf_counter, sleep
 
 from approved_npo_data.all_npo_data import get_all_npo_data_from_url
 from approved_npo_data.approved_npo_data import get_approved_npo_data
-from approved_npo_data.config import MAX_ITEMS_TO_PROCESS, SCRAPING_DELAY_SECONDS
-from approved_npo_data.csv.csv_row import AllNpoDataRow, ApprovedNpoRow, OutputApprovedNpoRow
+from approved_npo_data.config import (
+    BUILD_SEARCH_INDEX,
+    CIRCUIT_BREAKER_ENABLED,
+    CIRCUIT_BREAKER_FAILURE_RATE,
+    CIRCUIT_BREAKER_MIN_REQUESTS,
+    CIRCUIT_BREAKER_OPEN_SECONDS,
+    CIRCUIT_BREAKER_WINDOW_SIZE,
+    DEADLINE_DRAIN_SECONDS,
+    DETAIL_RETRY_BACKOFF_MAX_SECONDS,
+    DETAIL_RETRY_BACKOFF_SECONDS,
+    DETAIL_RETRY_MAX_ATTEMPTS,
+    DETAIL_SCRAPING_MAX_WORKERS,
+    DOWNLOAD_DOCUMENTS,
+    EXTRACT_FINANCIAL_FIGURES,
+    HTTP_CASSETTE_PATH,
+    LOG_SAMPLING_BURST,
+    LOG_SAMPLING_INTERVAL_SECONDS,
+    MATCH_MISSING_BY_NAME,
+    MAX_ITEMS_TO_PROCESS,
+    METRICS_TEXTFILE_INTERVAL_SECONDS,
+    METRICS_TEXTFILE_PATH,
+    NAME_MATCH_MIN_SIMILARITY,
+    PRIORITY_EXPIRY_HORIZON_DAYS,
+    PRIORITY_HISTORY_FILES,
+    PRIORITY_SCHEDULING,
+    PRIORITY_STALENESS_DAYS,
+    QUEUE_LEASE_SECONDS,
+    QUEUE_POLL_SECONDS,
+    SAVE_SQLITE,
+    SCRAPING_DELAY_SECONDS,
+    SQLITE_BATCH_SIZE,
+)
+from approved_npo_data.csv.csv_row import (
+    AllNpoDataRow,
+    ApprovedNpoRow,
+    FetchErrorRow,
+    OutputApprovedNpoRow,
+)
+from approved_npo_data.document_download import SourcedDocument, download_documents
+from approved_npo_data.financial_report.extraction import extract_financial_figures
+from approved_npo_data.name_matching import AllNpoDataResolver
+from approved_npo_data.output_database import OutputDatabase
+from approved_npo_data.run_progress import (
+    RunProgress,
+    get_progress_path,
+    get_roster_digest,
+    read_status,
+    write_status,
+)
+from approved_npo_data.scheduling import create_default_scorer, prioritize
+from approved_npo_data.scraping.npoportal_detail.Information_model import Information
 from approved_npo_data.scraping.npoportal_detail.npoportal_detail import get_detail_data
 from approved_npo_data.scraping.tokyo_detail.information_model import BasicInformation
 from approved_npo_data.scraping.tokyo_detail.tokyo_detail import scrape_tokyo_detail
+from approved_npo_data.search_index import build_search_index
+from approved_npo_data.sharding import (
+    Shard,
+    find_roster_path,
+    find_shard_outputs,
+    merge_shard_outputs,
+    read_roster,
+)
+from approved_npo_data.util.cassette import Cassette
+from approved_npo_data.util.circuit_breaker import HostCircuitBreakers
 from approved_npo_data.util.date_format import simple_format_time
 from approved_npo_data.util.enumerate import controlled_enumerate
 from approved_npo_data.util.file_operations import get_output_path, save_csv
+from approved_npo_data.util.http_client import is_replaying, set_cassette, set_circuit_breakers
+from approved_npo_data.util.logging_setup import setup_logging
+from approved_npo_data.util.metrics import metrics
+from approved_npo_data.util.metrics_export import MetricsFileWriter
+from approved_npo_data.util.profiling import StageProfiler, create_executor
+from approved_npo_data.util.retry_queue import HostBackoff, RetryItem, RetryQueue
+from approved_npo_data.util.scraping import FetchError
+from approved_npo_data.util.timeout import Deadline
+from approved_npo_data.util.work_queue import DONE, FAILED, Task, WorkQueue
 
-config.fileConfig("logging.conf", disable_existing_loggers=False)
+setup_logging("logging.conf", LOG_SAMPLING_INTERVAL_SECONDS, LOG_SAMPLING_BURST)
 logger = getLogger(__name__)
 
 BASE_PATH = Path(".")
@@ -37,68 +116,1025 @@ def createOutputApprovedNpoRow(
     )
 
 
-def main():
-    """main"""
-    logger.info("start main")
+@dataclass(frozen=True)
+class ProcessedRecord:
+    """1法人分の処理結果"""
+
+    output_row: OutputApprovedNpoRow
+    """出力データ"""
+
+    information: Information
+    """NPOポータルの詳細ページの情報"""
+
+    tokyo_detail: BasicInformation
+    """東京都の法人・団体情報"""
+
+    documents: list[SourcedDocument]
+    """閲覧書類"""
+
+    detail_data: list[str] = field(default_factory=list)
+    """NPOポータルの詳細ページの情報（出力データの列）"""
+
+    tokyo_error: FetchError | None = None
+    """東京都の法人・団体情報の取得に失敗した場合のエラー（東京都の法人・団体情報は空）"""
+
+
+def process_record(
+    approved_npo_row: ApprovedNpoRow,
+    npo_data: AllNpoDataRow,
+    previous: ProcessedRecord | None = None,
+) -> ProcessedRecord:
+    """
+    1法人分の詳細ページをスクレイピングし、出力データを作成する
+
+    ※東京都の法人・団体情報の取得に失敗した場合は、NPOポータルの詳細ページの情報のみで
+    出力データを作成し、エラーをtokyo_errorに格納する
+
+    Args:
+        approved_npo_row (ApprovedNpoRow): 名簿の行
+        npo_data (AllNpoDataRow): 全NPO法人情報の行
+        previous (ProcessedRecord | None): 東京都の法人・団体情報の取得に失敗した前回の処理結果
+            ※指定した場合は、東京都の法人・団体情報のみ取得し直す
+    """
+    associate_name = approved_npo_row.corporation_name
+    corporate_number = approved_npo_row.corporate_number
+    url = npo_data.corporate_information_url
+
+    if previous is None:
+        # 詳細ページからスクレイピング
+        information, detail_data, documents = get_detail_data(url, associate_name)
+        npoportal_documents = [(corporate_number, "npoportal", d) for d in documents]
+    else:
+        information, detail_data = previous.information, previous.detail_data
+        npoportal_documents = previous.documents
+
+    # 所轄庁の情報公開サイトからスクレイピング
+    # 現在は東京のみ
+    tokyo_error = None
+    try:
+        tokyo_detail = scrape_tokyo_detail(information.jurisdiction_public_site, associate_name)
+    except FetchError as e:
+        # 取得済みのNPOポータルの詳細ページの情報は破棄せず、東京都の情報のみ後で再試行する
+        tokyo_detail, tokyo_error = BasicInformation.emptyInstance(), e
+
+    linked_documents: list[SourcedDocument] = [
+        *npoportal_documents,
+        *((corporate_number, "tokyo", d) for d in tokyo_detail.documents),
+    ]
+
+    # スクレイピングの負荷を考慮してスリープを入れる（記録したレスポンスを再生している場合は不要）
+    # NOTE: スリープはワーカー毎のため、全体のリクエスト間隔はワーカー数に応じて短くなる
+    if not is_replaying():
+        sleep(SCRAPING_DELAY_SECONDS)
+    with metrics.stage("serialize"):
+        outputApprovedNpoRow = createOutputApprovedNpoRow(
+            approved_npo_row, npo_data, detail_data, tokyo_detail
+        )
+    metrics.inc("records_processed_total")
+    return ProcessedRecord(
+        outputApprovedNpoRow,
+        information,
+        tokyo_detail,
+        linked_documents,
+        detail_data,
+        tokyo_error,
+    )
+
+
+def get_processing_order(approved_npo_rows: list[ApprovedNpoRow]) -> list[int]:
+    """詳細ページをスクレイピングする順序（名簿の行番号）を返す"""
+    if not PRIORITY_SCHEDULING:
+        return list(range(len(approved_npo_rows)))
+    with metrics.stage("prioritize"):
+        scorer = create_default_scorer(
+            BASE_PATH,
+            datetime.now(),
+            PRIORITY_EXPIRY_HORIZON_DAYS,
+            PRIORITY_STALENESS_DAYS,
+            PRIORITY_HISTORY_FILES,
+        )
+        return prioritize(approved_npo_rows, scorer)
+
+
+def scrape_records(
+    records: list[tuple[ApprovedNpoRow, AllNpoDataRow]],
+    order: list[int],
+    max_workers: int,
+    deadline: Deadline | None,
+    on_record: Callable[[int, ProcessedRecord], None],
+    retry_queue: RetryQueue,
+) -> list[ProcessedRecord | None]:
+    """
+    詳細ページをorderの順にスクレイピングする
+
+    期限が指定された場合は、期限のDEADLINE_DRAIN_SECONDS秒前に未着手のスクレイピングを取り消し、
+    実行中のスクレイピングの完了を待つ
+    詳細ページの取得に失敗した法人はretry_queueに追加する（retry_failed_records()で再試行する）
+    ※東京都の法人・団体情報のみ取得に失敗した法人は、処理結果を格納した上でretry_queueに追加する
+
+    Args:
+        records (list[tuple[ApprovedNpoRow, AllNpoDataRow]]): 名簿の行と全NPO法人情報の行
+        order (list[int]): スクレイピングする順序（recordsの行番号）
+        max_workers (int): 同時実行数
+        deadline (Deadline | None): 期限
+        on_record (Callable[[int, ProcessedRecord], None]): 1法人分の処理が完了した際に呼び出す関数
+            ※retry_queueに追加した法人は、再試行の後に呼び出す
+        retry_queue (RetryQueue): 取得に失敗した法人（recordsの行番号）を追加するキュー
+
+    Returns:
+        list[ProcessedRecord | None]: recordsの行毎の処理結果（スクレイピングしなかった、
+            または詳細ページの取得に失敗した場合はNone）
+    """
+    results: list[ProcessedRecord | None] = [None] * len(records)
+    with create_executor(max_workers) as executor:
+        futures = {i: executor.submit(process_record, *records[i]) for i in order}
+
+        def cancel_pending() -> None:
+            cancelled = sum(future.cancel() for future in futures.values())
+            logger.warning(
+                "期限が近いため、未着手のスクレイピングを取り消しました。 cancelled=%r", cancelled
+            )
+
+        timer = None
+        if deadline is not None:
+            timer = deadline.call_before(DEADLINE_DRAIN_SECONDS, cancel_pending)
+        try:
+            for n, i in controlled_enumerate(order, log_interval=10):
+                metrics.set_gauge("queue_depth", len(order) - n, queue="records")
+                try:
+                    record = results[i] = futures[i].result()
+                except CancelledError:
+                    continue
+                except FetchError as e:
+                    retry_queue.defer(i, e)
+                    continue
+                retry_queue.record_success(records[i][1].corporate_information_url)
+                if record.tokyo_error is not None:
+                    retry_queue.defer(i, record.tokyo_error)
+                    continue
+                on_record(i, record)
+        finally:
+            if timer is not None:
+                timer.cancel()
+    metrics.set_gauge("queue_depth", 0, queue="records")
+    return results
+
+
+def create_retry_queue() -> RetryQueue:
+    """詳細ページの取得に失敗した法人を後でまとめて再試行するキューを作成する"""
+    backoff = HostBackoff(DETAIL_RETRY_BACKOFF_SECONDS, DETAIL_RETRY_BACKOFF_MAX_SECONDS)
+    return RetryQueue(
+        backoff,
+        DETAIL_RETRY_MAX_ATTEMPTS,
+        get_url=lambda e: e.url if isinstance(e, FetchError) else "",
+        is_retryable=is_retryable_error,
+    )
+
+
+def is_retryable_error(e: BaseException) -> bool:
+    """再試行で成功する可能性がある失敗か"""
+    # 記録したレスポンスの再生時は、再試行しても同じ結果になる
+    return isinstance(e, FetchError) and e.is_retryable and not is_replaying()
+
+
+def retry_failed_records(
+    records: list[tuple[ApprovedNpoRow, AllNpoDataRow]],
+    results: list[ProcessedRecord | None],
+    retry_queue: RetryQueue,
+    deadline: Deadline | None,
+    on_record: Callable[[int, ProcessedRecord], None],
+) -> tuple[list[FetchErrorRow], set[int]]:
+    """
+    詳細ページの取得に失敗した法人をまとめて再試行する
+
+    再試行に成功した法人の処理結果はresultsに格納する
+    ※東京都の法人・団体情報のみ取得に失敗した法人は、東京都の法人・団体情報のみ再試行し、
+    最終的に失敗した場合はNPOポータルの詳細ページの情報のみの処理結果とする
+    ※期限が指定された場合は、期限のDEADLINE_DRAIN_SECONDS秒前を過ぎたら再試行を中止する
+
+    Returns:
+        tuple[list[FetchErrorRow], set[int]]: 最終的に取得に失敗した法人のエラーレポートと、
+            詳細ページの取得に失敗した法人（recordsの行番号）
+            ※期限のために再試行を中止した法人は含まない（期限までに処理しなかった法人とする）
+    """
+
+    def retry(i: int) -> None:
+        record = results[i] = process_record(*records[i], results[i])
+        if record.tokyo_error is not None:
+            raise record.tokyo_error
+        on_record(i, record)
+
+    def should_stop() -> bool:
+        return deadline is not None and deadline.is_expired(DEADLINE_DRAIN_SECONDS)
+
+    def max_wait() -> float:
+        # 期限のDEADLINE_DRAIN_SECONDS秒前を過ぎて待たないようにする
+        return math.inf if deadline is None else deadline.remaining() - DEADLINE_DRAIN_SECONDS
+
+    if len(retry_queue):
+        logger.info("start retry failed records len(retry_queue)=%r", len(retry_queue))
+    with metrics.stage("retry_sweep"):
+        failed = retry_queue.sweep(retry, should_stop, max_wait)
+    reported = []
+    for item in failed:
+        record = results[item.key]
+        if record is not None:
+            on_record(item.key, record)
+        elif not retry_queue.is_exhausted(item):
+            continue
+        reported.append(item)
+    error_rows = [create_error_row(*records[item.key], item) for item in reported]
+    return error_rows, {item.key for item in reported if results[item.key] is None}
+
+
+def create_error_row(
+    approved_npo_row: ApprovedNpoRow, npo_data: AllNpoDataRow, item: RetryItem
+) -> FetchErrorRow:
+    """取得に失敗した法人のエラーレポートの行を作成する"""
+    status_code = getattr(item.error, "status_code", None)
+    return FetchErrorRow(
+        corporate_number=approved_npo_row.corporate_number,
+        corporation_name=approved_npo_row.corporation_name,
+        source="npoportal" if item.url == npo_data.corporate_information_url else "tokyo",
+        url=item.url,
+        status_code="" if status_code is None else str(status_code),
+        attempts=str(item.attempts),
+        error=str(item.error),
+    )
+
+
+def save_error_report(error_rows: list[FetchErrorRow]) -> None:
+    """取得に失敗した法人のエラーレポートを保存する（失敗した法人がない場合は保存しない）"""
+    if not error_rows:
+        return
+    error_report_path = get_output_path(BASE_PATH, "errors")
+    save_csv(error_rows, error_report_path)
+    logger.warning(
+        "詳細ページの取得に失敗した法人があります。 len(error_rows)=%r, error_report_path=%r",
+        len(error_rows),
+        error_report_path,
+    )
+
+
+def create_deferred_row(
+    approved_npo_row: ApprovedNpoRow, npo_data: AllNpoDataRow
+) -> OutputApprovedNpoRow:
+    """
+    期限までにスクレイピングしなかった（または取得に失敗した）法人の出力データを作成する
+
+    ※詳細ページの情報は空
+    """
+    # NPOポータルの詳細ページの情報 + 年度 + 閲覧書類のURL
+    detail_page_data = ["" for _ in range(len(Information.get_csv_header()) + 2)]
+    return createOutputApprovedNpoRow(
+        approved_npo_row, npo_data, detail_page_data, BasicInformation.emptyInstance()
+    )
+
+
+def merge_results(
+    records: list[tuple[ApprovedNpoRow, AllNpoDataRow]],
+    results: list[ProcessedRecord | None],
+    resumed_rows: dict[str, OutputApprovedNpoRow],
+    failed: set[int],
+) -> tuple[list[OutputApprovedNpoRow], list[str], int]:
+    """
+    名簿の順序で出力データを作成する
+
+    Args:
+        records (list[tuple[ApprovedNpoRow, AllNpoDataRow]]): 名簿の行と全NPO法人情報の行
+        results (list[ProcessedRecord | None]): recordsの行毎の処理結果
+        resumed_rows (dict[str, OutputApprovedNpoRow]): 前回の出力を再利用する法人の出力データ
+        failed (set[int]): 詳細ページの取得に失敗した法人（recordsの行番号）
+
+    Returns:
+        tuple[list[OutputApprovedNpoRow], list[str], int]: 出力データ、処理済みの法人番号、
+            期限までに処理しなかった法人の件数
+            ※スクレイピングも再利用もしなかった法人は、詳細ページの情報を空にして出力する
+    """
+    output_data = []
+    completed = []
+    deferred = 0
+    for i, ((approved_npo_row, npo_data), record) in enumerate(zip(records, results, strict=True)):
+        corporate_number = approved_npo_row.corporate_number
+        if record is not None:
+            output_data.append(record.output_row)
+        elif corporate_number in resumed_rows:
+            output_data.append(resumed_rows[corporate_number])
+        else:
+            output_data.append(create_deferred_row(approved_npo_row, npo_data))
+            if i not in failed:
+                deferred += 1
+                metrics.inc("records_deferred_total")
+            continue
+        completed.append(corporate_number)
+    return output_data, completed, deferred
+
+
+def load_resumed_rows(resume: bool, roster_digest: str) -> dict[str, OutputApprovedNpoRow]:
+    """
+    前回の途中までの出力から、処理済みの法人の出力データを読み込む（法人番号がキー）
+
+    ※進捗の処理対象が今回の処理対象（roster_digest）と異なる場合は再利用しない
+    """
+    if not resume:
+        return {}
+    progress = RunProgress.load(get_progress_path(BASE_PATH))
+    if progress is None:
+        logger.info("再開する進捗がありません")
+        return {}
+    if progress.roster_digest != roster_digest:
+        logger.warning(
+            "進捗の処理対象が今回の処理対象と異なるため、再利用しません。 output_path=%r",
+            progress.output_path,
+        )
+        return {}
+    try:
+        resumed_rows = progress.load_completed_rows()
+    except OSError as e:
+        logger.warning("途中までの出力の読み込みに失敗しました。 progress=%r, e=%r", progress, e)
+        return {}
+    logger.info(
+        "前回の途中までの出力を再利用します。 output_path=%r, len(resumed_rows)=%r",
+        progress.output_path,
+        len(resumed_rows),
+    )
+    return resumed_rows
+
+
+def save_progress(
+    output_csv_path: Path,
+    completed: list[str],
+    deferred: int,
+    total: int,
+    deadline: Deadline | None,
+    roster_digest: str,
+) -> None:
+    """
+    出力CSVの完全性を出力し、期限までに処理しなかった法人がある場合は進捗を保存する
+
+    ※進捗を保存した場合は、次回`--resume`で残りの法人のみスクレイピングできる
+    ※取得に失敗した法人は、期限までに処理しなかった法人に含めない（完全性に影響しない）
+
+    Args:
+        output_csv_path (Path): 出力CSVのパス
+        completed (list[str]): 処理済み（前回の出力を再利用した場合を含む）の法人番号
+        deferred (int): 期限までに処理しなかった法人の件数
+        total (int): 処理対象の件数
+        deadline (Deadline | None): 期限
+        roster_digest (str): 処理対象の法人番号のハッシュ値
+    """
+    complete = deferred == 0
+    status_path = write_status(
+        output_csv_path,
+        complete,
+        len(completed),
+        total,
+        deadline.at if deadline else None,
+        failed=total - len(completed) - deferred,
+    )
+    progress_path = get_progress_path(BASE_PATH)
+    if complete:
+        progress_path.unlink(missing_ok=True)
+        return
+
+    created_at = datetime.now().isoformat(timespec="seconds")
+    progress = RunProgress(str(output_csv_path), completed, total, created_at, roster_digest)
+    progress.save(progress_path)
+    logger.warning(
+        "期限までにすべての法人を処理できませんでした。 "
+        "deferred=%r, status_path=%r, progress_path=%r",
+        deferred,
+        status_path,
+        progress_path,
+    )
+
+
+def save_documents(linked_documents: list[SourcedDocument], deadline: Deadline | None) -> None:
+    """
+    閲覧書類をダウンロードし、保存した閲覧書類の一覧（と抽出した数値）を保存する
+
+    ※期限を過ぎている場合はダウンロードしない
+    """
+    if deadline is not None and deadline.is_expired():
+        logger.warning(
+            "期限を過ぎたため、閲覧書類をダウンロードしません。 deadline=%r", deadline.at
+        )
+        return
+
+    logger.info("start download documents len(linked_documents)=%r", len(linked_documents))
+    with metrics.stage("document_download"):
+        document_manifest = download_documents(linked_documents)
+    document_manifest_path = get_output_path(BASE_PATH, "documents")
+    save_csv(document_manifest, document_manifest_path)
+    logger.info("end download documents document_manifest_path=%r", document_manifest_path)
+
+    if EXTRACT_FINANCIAL_FIGURES:
+        logger.info("start extract financial figures")
+        with metrics.stage("figure_extraction"):
+            financial_figures = extract_financial_figures(document_manifest)
+        if financial_figures:
+            financial_figures_path = get_output_path(BASE_PATH, "financial_figures")
+            save_csv(financial_figures, financial_figures_path)
+            logger.info(
+                "end extract financial figures financial_figures_path=%r",
+                financial_figures_path,
+            )
+
+
+def select_rows(
+    approved_npo_data: list[ApprovedNpoRow], shard: Shard | None
+) -> list[ApprovedNpoRow]:
+    """処理対象の名簿の行（シャードを指定した場合はそのシャードに属する行のみ）"""
+    rows = approved_npo_data[:MAX_ITEMS_TO_PROCESS]
+    if shard is None:
+        return rows
+    selected = [row for row in rows if shard.contains(row.corporate_number)]
+    logger.info("shard=%r, len(selected)=%r, len(rows)=%r", shard.name, len(selected), len(rows))
+    return selected
+
+
+def get_and_save_approved_npo_data() -> list[ApprovedNpoRow]:
+    """認定NPO法人の名簿を取得し、CSVに保存する"""
     logger.info("start get approved_npo_data")
     approved_npo_data = get_approved_npo_data()
-    logger.info(f"end get approved_npo_data. {len(approved_npo_data)=}")
+    logger.info("end get approved_npo_data. len(approved_npo_data)=%r", len(approved_npo_data))
 
     logger.info("start save approved_npo_data")
     csv_file_path = get_output_path(BASE_PATH, "approved_npo_data")
-    save_csv(approved_npo_data, csv_file_path)
-    logger.info(f"end save approved_npo_data {csv_file_path=}")
+    with metrics.stage("csv_write"):
+        save_csv(approved_npo_data, csv_file_path)
+    logger.info("end save approved_npo_data csv_file_path=%r", csv_file_path)
+    return approved_npo_data
+
 
+def get_all_npo_data() -> dict[str, AllNpoDataRow]:
+    """全NPO法人情報を取得する"""
     logger.info("start all npo data")
     all_npo_data = get_all_npo_data_from_url()
-    logger.info(f"end all npo data {len(all_npo_data)=}")
+    logger.info("end all npo data len(all_npo_data)=%r", len(all_npo_data))
+    return all_npo_data
 
-    logger.info("start merge data")
 
-    output_data = []
+def fetch_inputs() -> tuple[list[ApprovedNpoRow], dict[str, AllNpoDataRow]]:
+    """
+    認定NPO法人の名簿（PDF）と全NPO法人情報（ZIP）を並行して取得する
+
+    ※互いに依存しないため、名簿のダウンロード・テーブルの抽出・CSVの保存の間に
+    全NPO法人情報のダウンロード・解凍・読み込みを別スレッドで行う（長い方の処理時間で済む）
+    """
+    with create_executor(1, "all-npo-data") as executor:
+        all_npo_data_future = executor.submit(get_all_npo_data)
+        approved_npo_data = get_and_save_approved_npo_data()
+        all_npo_data = all_npo_data_future.result()
+    return approved_npo_data, all_npo_data
+
+
+def resolve_records(
+    approved_npo_rows: list[ApprovedNpoRow], all_npo_data: dict[str, AllNpoDataRow]
+) -> tuple[list[tuple[ApprovedNpoRow, AllNpoDataRow]], list[str]]:
+    """
+    名簿の行毎に全NPO法人情報の行を取得する
+
+    Returns:
+        tuple[list[tuple[ApprovedNpoRow, AllNpoDataRow]], list[str]]: 名簿の行と全NPO法人情報の行
+            （存在しない場合は空の行）と、全NPO法人情報に存在しなかった法人番号
+    """
     not_in_approve_npo = []
 
-    for _, approved_npo_row in controlled_enumerate(
-        approved_npo_data, log_interval=10, max_items=MAX_ITEMS_TO_PROCESS
-    ):
-        associate_name = approved_npo_row.corporation_name
-        corporate_number = approved_npo_row.corporate_number
+    resolver = AllNpoDataResolver(all_npo_data, MATCH_MISSING_BY_NAME, NAME_MATCH_MIN_SIMILARITY)
 
-        def getNpoDataRow(associate_name: str, corporate_number: str) -> AllNpoDataRow:
-            if corporate_number not in all_npo_data:
-                logger.info(f"全NPO法人情報に存在しません。 {associate_name=}, {corporate_number=}")
-                not_in_approve_npo.append(corporate_number)
-                return AllNpoDataRow.emptyInstance()
-            return all_npo_data[corporate_number]
+    def getNpoDataRow(approved_npo_row: ApprovedNpoRow) -> AllNpoDataRow:
+        npo_data = resolver.resolve(approved_npo_row)
+        if npo_data is None:
+            logger.info(
+                "全NPO法人情報に存在しません。 associate_name=%r, corporate_number=%r",
+                approved_npo_row.corporation_name,
+                approved_npo_row.corporate_number,
+            )
+            not_in_approve_npo.append(approved_npo_row.corporate_number)
+            return AllNpoDataRow.emptyInstance()
+        return npo_data
 
-        npoData = getNpoDataRow(associate_name, corporate_number)
-        url = npoData.corporate_information_url
+    records = [(row, getNpoDataRow(row)) for row in approved_npo_rows]
+    return records, not_in_approve_npo
 
-        # 詳細ページからスクレイピング
-        information, detail_data = get_detail_data(url, associate_name)
 
-        # 所轄庁の情報公開サイトからスクレイピング
-        # 現在は東京のみ
-        tokyo_detail = scrape_tokyo_detail(information.jurisdiction_public_site, associate_name)
+def encode_record(approved_npo_row: ApprovedNpoRow, npo_data: AllNpoDataRow) -> str:
+    """名簿の行と全NPO法人情報の行をキューのタスクの内容（JSON）に変換する"""
+    return json.dumps(
+        {"approved_npo": approved_npo_row.to_csv_row(), "npo_data": npo_data.to_csv_row()},
+        ensure_ascii=False,
+    )
 
-        # スクレイピングの負荷を考慮してスリープを入れる
-        sleep(SCRAPING_DELAY_SECONDS)
-        outputApprovedNpoRow = createOutputApprovedNpoRow(
-            approved_npo_row, npoData, detail_data, tokyo_detail
+
+def decode_record(payload: str) -> tuple[ApprovedNpoRow, AllNpoDataRow]:
+    """キューのタスクの内容（JSON）から名簿の行と全NPO法人情報の行を復元する"""
+    data = json.loads(payload)
+    return ApprovedNpoRow(*data["approved_npo"]), AllNpoDataRow(*data["npo_data"])
+
+
+def enqueue_records(queue_path: Path, run_id: str) -> int:
+    """
+    名簿の法人毎に詳細ページのスクレイピングのタスクをキューに追加する
+
+    ※優先度の高い法人から順にリースされる。既にキューにある法人は追加しない
+    ※キューに別の実行（run_id）のタスクがある場合はValueErrorを送出する
+    （前回の実行の結果を今回の結果として出力しないようにする）
+
+    Returns:
+        int: 追加したタスクの件数
+    """
+    logger.info("start enqueue queue_path=%r, run_id=%r", queue_path, run_id)
+    approved_npo_data, all_npo_data = fetch_inputs()
+    records, _ = resolve_records(select_rows(approved_npo_data, None), all_npo_data)
+    order = get_processing_order([row for row, _ in records])
+    priorities = {i: priority for priority, i in enumerate(order)}
+    tasks = (
+        (row.corporate_number, encode_record(row, npo_data), priorities[i])
+        for i, (row, npo_data) in enumerate(records)
+    )
+    added = WorkQueue(queue_path).enqueue(tasks, run_id)
+    logger.info("end enqueue len(records)=%r, added=%r", len(records), added)
+    return added
+
+
+def run_queue_worker(queue_path: Path, max_workers: int, deadline: Deadline | None) -> int:
+    """
+    キューからタスクを借り受けて詳細ページをスクレイピングし、結果をキューに書き込む
+
+    すべてのタスクが完了する（他のワーカーが処理中のタスクもなくなる）まで繰り返す
+    ※失敗したタスクは待ち時間の後に再試行する（DETAIL_RETRY_MAX_ATTEMPTS回まで。リースの期限切れを
+    含む。再試行しても成功しない失敗は再試行しない）
+
+    Args:
+        queue_path (Path): キューのSQLiteファイルのパス
+        max_workers (int): 同時実行数（スレッド数）
+        deadline (Deadline | None): 期限（期限が近づいた場合は新しいタスクを借り受けない）
+
+    Returns:
+        int: 完了したタスクの件数
+    """
+    queue = WorkQueue(queue_path, DETAIL_RETRY_MAX_ATTEMPTS)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("start queue worker worker_id=%r, counts=%r", worker_id, queue.counts())
+
+    def work(n: int) -> int:
+        owner = f"{worker_id}:{n}"
+        completed = 0
+        while deadline is None or not deadline.is_expired(DEADLINE_DRAIN_SECONDS):
+            task = queue.lease(owner, QUEUE_LEASE_SECONDS)
+            if task is None:
+                if queue.is_finished():
+                    break
+                # 他のワーカーが処理中、または再試行を待っているタスクがある
+                sleep(QUEUE_POLL_SECONDS)
+                continue
+            completed += process_task(queue, task, owner)
+        return completed
+
+    with create_executor(max_workers) as executor:
+        completed = sum(executor.map(work, range(max_workers)))
+    logger.info("end queue worker completed=%r, counts=%r", completed, queue.counts())
+    return completed
+
+
+def process_task(queue: WorkQueue, task: Task, owner: str) -> bool:
+    """
+    キューから借り受けたタスクの法人の詳細ページをスクレイピングし、結果をキューに書き込む
+
+    ※東京都の法人・団体情報のみ取得に失敗した場合は、NPOポータルの詳細ページの情報を含む結果を
+    保存して再試行する（再試行できない場合はその結果で完了にする）
+
+    Returns:
+        bool: 完了にしたか
+    """
+    retry_delay = min(
+        DETAIL_RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1), DETAIL_RETRY_BACKOFF_MAX_SECONDS
+    )
+    try:
+        record = process_record(*decode_record(task.payload))
+    except Exception as e:
+        logger.warning(
+            "タスクが失敗しました。 key=%r, attempts=%r, e=%r", task.key, task.attempts, e
         )
-        output_data.append(outputApprovedNpoRow)
-    logger.info(f"end merge data {len(output_data)=}, {len(not_in_approve_npo)=}")
+        queue.fail(task.key, owner, str(e), retry_delay, is_retryable_error(e))
+        return False
+    result = json.dumps(record.output_row.to_csv_row(), ensure_ascii=False)
+    error = record.tokyo_error
+    if error is None:
+        return queue.complete(task.key, owner, result)
+    logger.warning(
+        "東京都の法人・団体情報の取得に失敗しました。 key=%r, attempts=%r, e=%r",
+        task.key,
+        task.attempts,
+        error,
+    )
+    if is_retryable_error(error) and task.attempts < queue.max_attempts:
+        queue.fail(task.key, owner, str(error), retry_delay, result=result)
+        return False
+    return queue.complete(task.key, owner, result, str(error))
+
+
+def collect_queue_results(queue_path: Path) -> Path:
+    """
+    キューの処理結果を名簿の順序で出力CSVに保存する
+
+    ※完了していない法人は詳細ページの情報を空にして出力する。失敗した法人（一部の取得に失敗して
+    完了した法人を含む）はエラーレポートに出力する（途中までの結果がある場合はその結果を出力する）
+
+    Returns:
+        Path: 出力CSVのパス
+    """
+    queue = WorkQueue(queue_path)
+    output_data: list[OutputApprovedNpoRow] = []
+    error_rows: list[FetchErrorRow] = []
+    completed = 0
+    failed = 0
+    for task in queue.tasks():
+        approved_npo_row, npo_data = decode_record(task.payload)
+        completed += task.status == DONE
+        failed += task.status == FAILED
+        if task.status in (DONE, FAILED) and task.result is not None:
+            output_data.append(OutputApprovedNpoRow(*json.loads(task.result)))
+        else:
+            output_data.append(create_deferred_row(approved_npo_row, npo_data))
+        if task.status in (DONE, FAILED) and task.error:
+            error_rows.append(
+                FetchErrorRow(
+                    corporate_number=approved_npo_row.corporate_number,
+                    corporation_name=approved_npo_row.corporation_name,
+                    # 結果がある場合は、東京都の法人・団体情報のみ取得に失敗している
+                    source="npoportal" if task.result is None else "tokyo",
+                    attempts=str(task.attempts),
+                    error=task.error or "",
+                )
+            )
+    if not output_data:
+        raise ValueError(f"キューにタスクがありません: {queue_path}")
+
+    output_csv_path = get_output_path(BASE_PATH)
+    total = len(output_data)
+    # 失敗した法人は再度処理しても結果が変わらないため、未完了として扱わない
+    # 出力CSVが作成された時点で完全性を判断できるように、完全性を先に出力する
+    write_status(output_csv_path, completed + failed == total, completed, total, None, failed)
+    save_csv(output_data, output_csv_path)
+    save_error_report(error_rows)
+    logger.info(
+        "end collect queue results run_id=%r, completed=%r, failed=%r, total=%r, "
+        "output_csv_path=%r",
+        queue.run_id,
+        completed,
+        failed,
+        total,
+        output_csv_path,
+    )
+    return output_csv_path
+
+
+def merge_shards(output_paths: list[Path]) -> Path:
+    """
+    シャードの出力CSVを1つの出力CSV（名簿の順序）に結合する
 
-    logger.info("start save output data")
+    Args:
+        output_paths (list[Path]): シャードの出力CSVのパス
+            （空の場合は最新の実行の各シャードの最新の出力CSV）
+
+    Returns:
+        Path: 結合した出力CSVのパス
+    """
+    output_paths = output_paths or find_shard_outputs(BASE_PATH)
+    if not output_paths:
+        raise ValueError("結合するシャードの出力CSVがありません")
+    roster_path = find_roster_path(output_paths)
+    if roster_path is None:
+        logger.warning("名簿のCSVが見つからないため、法人番号の順で結合します")
+    roster = read_roster(roster_path)[:MAX_ITEMS_TO_PROCESS] if roster_path else []
+    logger.info("start merge shards output_paths=%r, roster_path=%r", output_paths, roster_path)
+
+    output_data, missing = merge_shard_outputs(output_paths, roster)
     output_csv_path = get_output_path(BASE_PATH)
+
+    # すべてのシャードが完了していて、名簿のすべての法人が含まれている場合のみ完全とする
+    statuses = [read_status(path) for path in output_paths]
+    complete = not missing and all(status and status["complete"] for status in statuses)
+    processed = sum(status["processed"] if status else 0 for status in statuses)
+    # 出力CSVが作成された時点で完全性を判断できるように、完全性を先に出力する
+    write_status(output_csv_path, complete, processed, len(output_data) + len(missing), None)
     save_csv(output_data, output_csv_path)
-    logger.info(f"end save output data {output_csv_path=}")
+    if missing:
+        logger.warning(
+            "どのシャードにも含まれていない法人があります。 len(missing)=%r, missing[:10]=%r",
+            len(missing),
+            missing[:10],
+        )
+    logger.info(
+        "end merge shards len(output_data)=%r, output_csv_path=%r",
+        len(output_data),
+        output_csv_path,
+    )
+    return output_csv_path
+
+
+@contextmanager
+def open_output_database(
+    approved_npo_data: list[ApprovedNpoRow], all_npo_data: dict[str, AllNpoDataRow]
+) -> Iterator[OutputDatabase | None]:
+    """
+    SAVE_SQLITEがTrueの場合は、名簿と全NPO法人情報を保存したSQLiteファイルを作成する
+
+    ブロックを抜ける際にファイルを閉じる（例外が発生した場合は書き込み途中のファイルを削除する）
+    """
+    if not SAVE_SQLITE:
+        yield None
+        return
+    database_path = get_output_path(BASE_PATH, suffix=".sqlite3")
+    logger.info("start save sqlite database_path=%r", database_path)
+    database = OutputDatabase(database_path, SQLITE_BATCH_SIZE)
+    try:
+        with metrics.stage("sqlite_write"):
+            database.add_approved_npo_data(approved_npo_data)
+            database.add_all_npo_data(all_npo_data.values())
+        yield database
+    except BaseException:
+        database.abort()
+        raise
+    with metrics.stage("sqlite_write"):
+        database.close()
+    logger.info("end save sqlite database_path=%r", database_path)
+
+
+def main(
+    max_workers: int = DETAIL_SCRAPING_MAX_WORKERS,
+    deadline: Deadline | None = None,
+    resume: bool = False,
+    shard: Shard | None = None,
+):
+    """
+    main
+
+    Args:
+        max_workers (int): 詳細ページのスクレイピングの同時実行数
+        deadline (Deadline | None): 期限
+            ※期限が近づいた場合は、未着手の法人の詳細ページの情報を空にして出力する
+        resume (bool): 前回期限までに処理できなかった法人のみスクレイピングするか
+        shard (Shard | None): 処理するシャード（Noneの場合はすべての法人を処理する）
+            ※出力先はBASE_PATHのまま（シャード毎の出力先は呼び出し元で設定する）
+    """
+    logger.info("start main")
+    approved_npo_data, all_npo_data = fetch_inputs()
+
+    with open_output_database(approved_npo_data, all_npo_data) as database:
+        logger.info("start merge data max_workers=%r", max_workers)
+
+        records, not_in_approve_npo = resolve_records(
+            select_rows(approved_npo_data, shard), all_npo_data
+        )
+
+        # 全文検索インデックスの作成に使用する（法人番号をキーとしたNPOポータルの詳細ページの情報）
+        informations: dict[str, Information] = {}
+
+        def on_record(i: int, record: ProcessedRecord) -> None:
+            corporate_number = records[i][0].corporate_number
+            if BUILD_SEARCH_INDEX:
+                informations[corporate_number] = record.information
+            if database is not None:
+                database.add_detail(
+                    corporate_number, record.information, record.tokyo_detail, record.documents
+                )
+
+        # 前回の途中までの出力で処理済みの法人はスクレイピングしない
+        # NOTE: 再利用した法人の詳細情報はSQLiteファイルと全文検索インデックスには含まれない
+        roster_digest = get_roster_digest(row.corporate_number for row, _ in records)
+        resumed_rows = load_resumed_rows(resume, roster_digest)
+
+        # 優先度の高い順にスクレイピングし、出力の順序は名簿の順序のまま維持する
+        order = [
+            i
+            for i in get_processing_order([row for row, _ in records])
+            if records[i][0].corporate_number not in resumed_rows
+        ]
+        retry_queue = create_retry_queue()
+        results = scrape_records(records, order, max_workers, deadline, on_record, retry_queue)
+        error_rows, failed = retry_failed_records(
+            records, results, retry_queue, deadline, on_record
+        )
+        output_data, completed, deferred = merge_results(records, results, resumed_rows, failed)
+        linked_documents = [
+            document for record in results if record is not None for document in record.documents
+        ]
+        logger.info(
+            "end merge data len(output_data)=%r, len(completed)=%r, len(not_in_approve_npo)=%r",
+            len(output_data),
+            len(completed),
+            len(not_in_approve_npo),
+        )
+
+        logger.info("start save output data")
+        output_csv_path = get_output_path(BASE_PATH)
+        # 出力CSVが作成された時点で完全性を判断できるように、完全性を先に出力する
+        save_progress(
+            output_csv_path, completed, deferred, len(output_data), deadline, roster_digest
+        )
+        with metrics.stage("csv_write"):
+            save_csv(output_data, output_csv_path)
+        logger.info("end save output data output_csv_path=%r", output_csv_path)
+        save_error_report(error_rows)
+
+    if BUILD_SEARCH_INDEX:
+        search_index_path = get_output_path(BASE_PATH, "search", suffix=".sqlite3")
+        logger.info("start build search index search_index_path=%r", search_index_path)
+        with metrics.stage("search_index"):
+            build_search_index(search_index_path, all_npo_data.values(), informations)
+        logger.info("end build search index")
+
+    if DOWNLOAD_DOCUMENTS and linked_documents:
+        save_documents(linked_documents, deadline)
 
     logger.info("end main")
 
 
+def argument_type(parse: Callable[[str], object]) -> Callable[[str], object]:
+    """ValueErrorのメッセージをそのままエラーとして表示するargparseのtype"""
+
+    def parse_argument(text: str) -> object:
+        try:
+            return parse(text)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e)) from e
+
+    return parse_argument
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description="認定NPO法人のデータを取得する")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="処理段階ごとにcProfileの統計とtracemallocのスナップショットを取得する"
+        "（プロファイリング中はスレッドプールの処理を並行せずに呼び出し元のスレッドで順に実行するため、"
+        "処理時間は並行して実行する場合と異なる）",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        default=None,
+        help="プロファイリング結果の出力先（デフォルト: output/profile_{日時}）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DETAIL_SCRAPING_MAX_WORKERS,
+        help="詳細ページのスクレイピングの同時実行数",
+    )
+    deadline_group = parser.add_mutually_exclusive_group()
+    deadline_group.add_argument(
+        "--deadline",
+        type=argument_type(Deadline.parse),
+        default=None,
+        help="期限の日時（例: 2025-04-01T06:00）または時刻（例: 06:00）。"
+        f"期限の{DEADLINE_DRAIN_SECONDS}秒前に未着手のスクレイピングを取り消し、途中までの結果を出力する",
+    )
+    deadline_group.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="実行時間の上限（秒）。--deadlineに現在からの秒数を指定する場合と同じ",
+    )
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument(
+        "--shard",
+        type=argument_type(Shard.parse),
+        default=None,
+        help="法人番号のハッシュ値で分割したN個のうちi番目（1始まり）のみ処理する（例: 1/4）。"
+        "出力先はshards/{i}of{N}フォルダ",
+    )
+    mode_group.add_argument(
+        "--merge-shards",
+        type=Path,
+        nargs="*",
+        default=None,
+        metavar="OUTPUT_CSV",
+        help="シャードの出力CSVを1つの出力CSV（名簿の順序）に結合して終了する"
+        "（省略時はshardsフォルダ内の最新の実行の各シャードの最新の出力CSV）",
+    )
+    mode_group.add_argument(
+        "--enqueue",
+        type=Path,
+        default=None,
+        metavar="QUEUE_DB",
+        help="名簿の法人毎に詳細ページのスクレイピングのタスクをキュー（SQLiteファイル）に追加して終了する",
+    )
+    mode_group.add_argument(
+        "--work",
+        type=Path,
+        default=None,
+        metavar="QUEUE_DB",
+        help="キューからタスクを借り受けてスクレイピングするワーカーとして実行する"
+        "（複数のプロセス・ホストで同時に実行できる）",
+    )
+    mode_group.add_argument(
+        "--collect",
+        type=Path,
+        default=None,
+        metavar="QUEUE_DB",
+        help="キューの処理結果を名簿の順序で出力CSVに保存して終了する",
+    )
+    parser.add_argument(
+        "--run-id",
+        default=None,
+        help="--enqueueでタスクを追加する実行のID（省略時は現在日時。"
+        "キューに別の実行のタスクがある場合は追加しない）",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="前回期限までに処理できなかった法人のみスクレイピングする",
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record-http",
+        action="store_const",
+        const=Cassette.RECORD,
+        dest="cassette_mode",
+        help="HTTPのレスポンスをすべて記録する",
+    )
+    cassette_group.add_argument(
+        "--replay-http",
+        action="store_const",
+        const=Cassette.REPLAY,
+        dest="cassette_mode",
+        help="記録したHTTPのレスポンスを再生する（ネットワークに接続しない）",
+    )
+    parser.add_argument(
+        "--cassette-dir",
+        type=Path,
+        default=HTTP_CASSETTE_PATH,
+        help=f"HTTPのレスポンスの記録の保存先（デフォルト: {HTTP_CASSETTE_PATH}）",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.merge_shards is not None:
+        merge_shards(args.merge_shards)
+        sys.exit()
+    if args.enqueue is not None:
+        enqueue_records(args.enqueue, args.run_id or datetime.now().strftime("%Y%m%d%H%M%S"))
+        sys.exit()
+    if args.collect is not None:
+        collect_queue_results(args.collect)
+        sys.exit()
+    if args.shard is not None:
+        # シャード毎に出力先（進捗、エラーレポート、過去の出力を含む）を分ける
+        BASE_PATH = args.shard.get_base_path(BASE_PATH)
+
+    profiler = None
+    if args.profile:
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        profile_dir = args.profile_dir or BASE_PATH / "output" / f"profile_{timestamp}"
+        profiler = StageProfiler(profile_dir).install(metrics)
+
+    if args.cassette_mode is not None:
+        set_cassette(Cassette(args.cassette_dir, args.cassette_mode))
+        logger.info("cassette_mode=%r, cassette_dir=%r", args.cassette_mode, args.cassette_dir)
+
+    if CIRCUIT_BREAKER_ENABLED:
+        set_circuit_breakers(
+            HostCircuitBreakers(
+                CIRCUIT_BREAKER_FAILURE_RATE,
+                CIRCUIT_BREAKER_WINDOW_SIZE,
+                CIRCUIT_BREAKER_MIN_REQUESTS,
+                CIRCUIT_BREAKER_OPEN_SECONDS,
+            )
+        )
+
+    deadline = args.deadline
+    if args.time_budget is not None:
+        deadline = Deadline.after(args.time_budget)
+    if deadline is not None:
+        logger.info("deadline=%r", deadline.at)
+
     start = perf_counter()
-    main()
-    end = perf_counter()
-    logger.info(f"経過時間: {simple_format_time(end - start)}")
+    metrics_writer = None
+    if METRICS_TEXTFILE_PATH is not None:
+        metrics_writer = MetricsFileWriter(
+            metrics, METRICS_TEXTFILE_PATH, METRICS_TEXTFILE_INTERVAL_SECONDS
+        ).start()
+    try:
+        with metrics.stage("total"):
+            if args.work is not None:
+                run_queue_worker(args.work, args.workers, deadline)
+            else:
+                main(args.workers, deadline, args.resume, args.shard)
+    finally:
+        end = perf_counter()
+        logger.info("経過時間: %s", simple_format_time(end - start))
+        metrics_path = get_output_path(BASE_PATH, "metrics", suffix=".json")
+        metrics.write_json(metrics_path)
+        logger.info("metrics_path=%r", metrics_path)
+        if metrics_writer is not None:
+            metrics_writer.stop()
+        if profiler is not None:
+            profiler.uninstall(metrics)
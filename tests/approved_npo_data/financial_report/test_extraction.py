@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pytest
+
+from approved_npo_data.financial_report.extraction import (
+    ExtractionCache,
+    ExtractionResult,
+    extract_documents,
+)
+from approved_npo_data.financial_report.figures import FinancialFigures
+from benchmarks.pdf_writer import write_table_pdf
+
+
+@pytest.fixture
+def pdf_path(tmp_path: Path) -> Path:
+    return write_table_pdf(
+        tmp_path / "report.pdf",
+        [["科目", "金額"], ["経常収益計", "2,500,000"], ["資産合計", "3,000"]],
+        [200, 200],
+    )
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ExtractionCache:
+    return ExtractionCache(tmp_path / "cache")
+
+
+class TestExtractionCache:
+    def test_set_and_get(self, cache: ExtractionCache):
+        result = ExtractionResult(sha256="ab12", figures=FinancialFigures(revenue=1))
+        assert cache.get("ab12") is None
+        cache.set(result)
+        assert cache.path_for("ab12") == cache.root / "ab" / "ab12.json"
+        assert cache.get("ab12") == result
+
+    def test_broken_cache(self, cache: ExtractionCache):
+        """読み込めないキャッシュは、キャッシュがないものとして扱うことのテスト"""
+        path = cache.path_for("ab12")
+        path.parent.mkdir(parents=True)
+        path.write_text("{", encoding="utf-8")
+        assert cache.get("ab12") is None
+
+
+class TestExtractDocuments:
+    def test_extract_and_cache(self, pdf_path: Path, cache: ExtractionCache):
+        results = extract_documents({"ab12": pdf_path}, cache, max_workers=1)
+        expected = ExtractionResult(
+            sha256="ab12", figures=FinancialFigures(revenue=2500000, total_assets=3000)
+        )
+        assert results == {"ab12": expected}
+        assert cache.get("ab12") == expected
+
+    def test_cache_hit(self, tmp_path: Path, cache: ExtractionCache):
+        """キャッシュがある文書は、ファイルを読み込まずにキャッシュした結果を返すことのテスト"""
+        cached = ExtractionResult(sha256="ab12", figures=FinancialFigures(revenue=1))
+        cache.set(cached)
+        results = extract_documents({"ab12": tmp_path / "missing.pdf"}, cache, max_workers=1)
+        assert results == {"ab12": cached}
+
+    def test_cached_error(self, tmp_path: Path, cache: ExtractionCache):
+        """失敗した結果もキャッシュし、次回は処理しないことのテスト"""
+        missing = tmp_path / "missing.pdf"
+        results = extract_documents({"ab12": missing}, cache, max_workers=1)
+        assert "FileNotFoundError" in results["ab12"].error
+        assert results["ab12"].figures == FinancialFigures()
+        assert cache.get("ab12") == results["ab12"]
+
+        # 同じハッシュ値のファイルが読み込めるようになっても、キャッシュした失敗を返す
+        missing.write_bytes(b"")
+        assert extract_documents({"ab12": missing}, cache, max_workers=1) == results
+
+    def test_timeout(self, pdf_path: Path, cache: ExtractionCache):
+        """制限時間を超えた文書は、ワーカープロセスでTimeoutErrorとなりキャッシュされることのテスト"""
+        results = extract_documents({"ab12": pdf_path}, cache, max_workers=1, timeout=1e-6)
+        assert "TimeoutError" in results["ab12"].error
+        assert cache.get("ab12") == results["ab12"]
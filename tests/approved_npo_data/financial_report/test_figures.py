@@ -0,0 +1,81 @@
+from approved_npo_data.financial_report.figures import (
+    FinancialFigures,
+    extract_figures_from_text,
+)
+
+ACTIVITY_STATEMENT = """\
+活動計算書
+令和6年4月1日から令和7年3月31日まで
+Ⅰ 経常収益
+  受取会費 120,000
+  受取寄附金 1,000 2,380,000
+経常収益計 2,500,000
+Ⅱ 経常費用
+経 常 費 用 計 2,700,000
+当期経常増減額 △200,000
+次期繰越正味財産額 △50,000
+"""
+
+BALANCE_SHEET = """\
+貸借対照表
+Ⅰ 資産の部
+1. 流動資産
+流動資産合計 1,000,000
+2. 固定資産
+固 定 資 産 合 計 2,000,000
+資産合計 ３，０００，０００
+Ⅱ 負債の部
+流動負債合計 200,000
+固定負債合計 1,000,000
+負債合計 1,200,000
+Ⅲ 正味財産の部
+一般正味財産合計 1,500,000
+正味財産合計 1,800,000
+"""
+
+
+class TestExtractFiguresFromText:
+    def test_activity_statement(self):
+        """見出しの後ろの最後の金額を取得し、△は負数とすることのテスト"""
+        figures = extract_figures_from_text(ACTIVITY_STATEMENT)
+        assert figures == FinancialFigures(revenue=2500000, expenses=2700000, net_assets=-50000)
+
+    def test_balance_sheet(self):
+        """小計（流動・固定）の見出しに一致せず、優先する見出しが先に一致することのテスト"""
+        figures = extract_figures_from_text(BALANCE_SHEET + "次期繰越正味財産額 999\n")
+        assert figures == FinancialFigures(
+            net_assets=1800000, total_assets=3000000, total_liabilities=1200000
+        )
+
+    def test_side_by_side(self):
+        """資産と負債を横に並べた表では、次の見出しまでの金額を取得することのテスト"""
+        figures = extract_figures_from_text(
+            "流動資産合計 1,000 流動負債合計 200\n"
+            "資産合計 3,000 負債合計 1,200\n"
+            "（1）正味財産合計 1,800（単位：円）\n"
+        )
+        assert figures == FinancialFigures(
+            net_assets=1800, total_assets=3000, total_liabilities=1200
+        )
+
+    def test_label_without_amount(self):
+        """見出しの後ろに金額がない行は使用しないことのテスト"""
+        figures = extract_figures_from_text("経常収益計\n経常収益合計 10\n")
+        assert figures.revenue == 10
+
+    def test_empty(self):
+        assert extract_figures_from_text("") == FinancialFigures()
+
+
+class TestFinancialFigures:
+    def test_merge(self):
+        merged = FinancialFigures(revenue=1, expenses=None).merge(
+            FinancialFigures(revenue=2, expenses=3, net_assets=4)
+        )
+        assert merged.to_dict() == {
+            "revenue": 1,
+            "expenses": 3,
+            "net_assets": 4,
+            "total_assets": None,
+            "total_liabilities": None,
+        }
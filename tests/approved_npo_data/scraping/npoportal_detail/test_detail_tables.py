@@ -0,0 +1,101 @@
+import dataclasses
+import json
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from approved_npo_data.scraping.npoportal_detail.detail_tables import (
+    INFORMATION_TABLE_SUMMARY,
+    VIEWING_DOCUMENTS_TABLE_SUMMARY,
+    extract_tables,
+)
+from approved_npo_data.scraping.npoportal_detail.information import (
+    create_npo_information,
+    extract_table_data,
+    scrape_npo_information,
+)
+from approved_npo_data.scraping.npoportal_detail.viewing_documents import (
+    create_viewing_documents,
+    scrape_viewing_documents,
+)
+from benchmarks.make_fixtures import FIXTURES_PATH, NPOPORTAL_DETAIL_HTML
+
+# 1回の走査に置き換える前の実装（表毎にfind_allで検索）でフィクスチャを解析した結果
+EXPECTED_PATH = Path(__file__).with_name("expected_detail.json")
+
+
+def to_json(model) -> dict:
+    return json.loads(json.dumps(dataclasses.asdict(model), ensure_ascii=False, default=str))
+
+
+@pytest.fixture(scope="module")
+def soup() -> BeautifulSoup:
+    return BeautifulSoup((FIXTURES_PATH / NPOPORTAL_DETAIL_HTML).read_bytes(), "html.parser")
+
+
+@pytest.fixture(scope="module")
+def expected() -> dict:
+    return json.loads(EXPECTED_PATH.read_text(encoding="utf-8"))
+
+
+class TestFixtureParity:
+    def test_single_pass(self, soup: BeautifulSoup, expected: dict):
+        """1回の走査で抽出した表から作成した結果が以前の実装と一致することのテスト"""
+        tables = extract_tables(soup)
+        information = create_npo_information(tables.get(INFORMATION_TABLE_SUMMARY))
+        viewing_documents = create_viewing_documents(tables.get(VIEWING_DOCUMENTS_TABLE_SUMMARY))
+        assert to_json(information) == expected["information"]
+        assert to_json(viewing_documents) == expected["viewing_documents"]
+
+    def test_wrappers(self, soup: BeautifulSoup, expected: dict):
+        """表毎に抽出する関数の結果も以前の実装と一致することのテスト"""
+        assert to_json(scrape_npo_information(soup)) == expected["information"]
+        assert to_json(scrape_viewing_documents(soup)) == expected["viewing_documents"]
+
+
+class TestExtractTables:
+    def test_rows(self):
+        """見出しとセルの両方がある行のみ抽出し、最初のセル内のリンクを取得することのテスト"""
+        soup = BeautifulSoup(
+            '<table summary="その他"><tr><th>対象外</th><td>x</td></tr></table>'
+            '<table summary="基本情報">'
+            "<tr><th> 法人\n 名称 </th><td>A</td><td>2つ目のセル</td></tr>"
+            '<tr><th>ホームページ</th><td><a href="https://example.com">HP</a></td></tr>'
+            "<tr><th>見出しのみ</th></tr>"
+            "<tr><td>セルのみ</td></tr>"
+            "<tr><th>入れ子</th><td><table><tr><th>内側</th><td>y</td></tr></table></td></tr>"
+            "</table>"
+            '<table summary="基本情報"><tr><th>2つ目の表</th><td>z</td></tr></table>',
+            "html.parser",
+        )
+        tables = extract_tables(soup)
+        assert list(tables) == [INFORMATION_TABLE_SUMMARY]
+        rows = tables[INFORMATION_TABLE_SUMMARY]
+        assert [row.key for row in rows] == ["法人 名称", "ホームページ", "入れ子"]
+        assert rows[0].td.get_text() == "A"
+        assert [link["href"] for link in rows[1].links] == ["https://example.com"]
+        assert rows[2].links == []
+
+    def test_missing_table(self):
+        soup = BeautifulSoup("<p>見つかりません</p>", "html.parser")
+        assert extract_tables(soup) == {}
+        with pytest.raises(ValueError):
+            extract_table_data(soup)
+
+
+class TestCreateNpoInformation:
+    def test_standardize_keys(self):
+        """項目名の空白、全角・半角の違いを吸収してInformationの項目に対応させることのテスト"""
+        soup = BeautifulSoup(
+            '<table summary="基本情報">'
+            "<tr><th>法人 名称</th><td>A</td></tr>"
+            "<tr><th>法人名称(フリガナ)</th><td>エー</td></tr>"
+            "<tr><th>法人番号　</th><td>1234567890123</td></tr>"
+            "</table>",
+            "html.parser",
+        )
+        information = create_npo_information(extract_tables(soup).get(INFORMATION_TABLE_SUMMARY))
+        assert information.corporate_name == "A"
+        assert information.corporate_name_kana == "エー"
+        assert information.corporate_number == "1234567890123"
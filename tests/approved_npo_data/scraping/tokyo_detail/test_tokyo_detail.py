@@ -0,0 +1,67 @@
+import dataclasses
+import json
+from pathlib import Path
+
+from bs4 import BeautifulSoup, Tag
+
+from approved_npo_data.scraping.document import LinkDocument
+from approved_npo_data.scraping.tokyo_detail.tokyo_detail import (
+    create_basic_information,
+    parse_details_section,
+)
+from benchmarks.make_fixtures import FIXTURES_PATH, TOKYO_DETAIL_HTML, TOKYO_DETAIL_URL
+
+# 1回の走査に置き換える前の実装（find_allでdt、aを個別に検索）でフィクスチャを解析した結果
+EXPECTED_PATH = Path(__file__).with_name("expected_basic_information.json")
+
+
+def details_section(html: str | bytes) -> Tag:
+    section = BeautifulSoup(html, "html.parser").find("dl", class_="Corp_detail_dl")
+    assert isinstance(section, Tag)
+    return section
+
+
+class TestCreateBasicInformation:
+    def test_fixture_parity(self):
+        """フィクスチャの解析結果が以前の実装と一致することのテスト"""
+        section = details_section((FIXTURES_PATH / TOKYO_DETAIL_HTML).read_bytes())
+        basic_information = create_basic_information(section, TOKYO_DETAIL_URL)
+        expected = json.loads(EXPECTED_PATH.read_text(encoding="utf-8"))
+        assert dataclasses.asdict(basic_information) == expected
+
+
+class TestParseDetailsSection:
+    def test_dt_dd_pairs(self):
+        """連続するdtは次のddを共有し、末尾のdtは空の値になることのテスト"""
+        section = details_section(
+            '<dl class="Corp_detail_dl">'
+            "<dt>法人名称</dt><dd> 特定非営利活動法人A </dd>"
+            "<dt>主たる事務所</dt><dt>従たる事務所</dt><dd>東京都</dd>"
+            "<div><dt>代表者氏名</dt><dd>山田 太郎</dd></div>"
+            "<dt>解散年月日</dt>"
+            "</dl>"
+        )
+        assert parse_details_section(section, TOKYO_DETAIL_URL) == {
+            "法人名称": "特定非営利活動法人A",
+            "主たる事務所": "東京都",
+            "従たる事務所": "東京都",
+            "代表者氏名": "山田 太郎",
+            "解散年月日": "",
+            "閲覧書類": [],
+        }
+
+    def test_documents_and_nested_dl(self):
+        """リンクは絶対URLの閲覧書類とし、dd内の入れ子のdlの項目は読み込まないことのテスト"""
+        section = details_section(
+            '<dl class="Corp_detail_dl">'
+            '<dt>閲覧書類</dt><dd><a href=" files/1.pdf ">2024年度 事業報告書等</a>'
+            "<dl><dt>入れ子</dt><dd>無視</dd></dl></dd>"
+            "</dl>"
+        )
+        table_data = parse_details_section(section, "https://example.com/ledger/1.html")
+        assert "入れ子" not in table_data
+        assert table_data["閲覧書類"] == [
+            LinkDocument(
+                title="2024年度 事業報告書等", url="https://example.com/ledger/files/1.pdf"
+            )
+        ]
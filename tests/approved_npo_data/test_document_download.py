@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlparse
+
+import pytest
+
+from approved_npo_data import document_download
+from approved_npo_data.document_download import DocumentDownloader, download_documents
+from approved_npo_data.scraping.document import LinkDocument
+from approved_npo_data.util.content_store import ContentStore, sha256_hex
+
+
+class FakeDownload:
+    """ホスト毎の同時実行数と呼び出し回数を記録するdownload_contentの代わり"""
+
+    def __init__(self, contents: dict[str, bytes], wait: float = 0):
+        self.contents = contents
+        self.wait = wait
+        self.calls: Counter[str] = Counter()
+        self.running: Counter[str] = Counter()
+        self.max_running: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, url: str, **kwargs) -> bytes:
+        host = urlparse(url).netloc
+        with self._lock:
+            self.calls[url] += 1
+            self.running[host] += 1
+            self.max_running[host] = max(self.max_running[host], self.running[host])
+        try:
+            time.sleep(self.wait)
+            return self.contents[url]
+        finally:
+            with self._lock:
+                self.running[host] -= 1
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> ContentStore:
+    return ContentStore(tmp_path / "documents")
+
+
+def patch_download(monkeypatch: pytest.MonkeyPatch, fake: FakeDownload) -> FakeDownload:
+    monkeypatch.setattr(document_download, "download_content", fake)
+    return fake
+
+
+class TestDocumentDownloader:
+    def test_max_per_host(self, monkeypatch: pytest.MonkeyPatch, store: ContentStore):
+        """ホスト毎の同時実行数を超えてダウンロードしないことのテスト"""
+        urls = [f"https://{host}/{i}.pdf" for host in ("a.example", "b.example") for i in range(4)]
+        fake = patch_download(
+            monkeypatch, FakeDownload({url: url.encode() for url in urls}, wait=0.05)
+        )
+        downloader = DocumentDownloader(store, max_workers=8, max_per_host=2)
+        stored = downloader.download_all(LinkDocument(title=url, url=url) for url in urls)
+
+        assert list(stored) == urls
+        assert fake.max_running == {"a.example": 2, "b.example": 2}
+
+    def test_dedup_url_and_content(self, monkeypatch: pytest.MonkeyPatch, store: ContentStore):
+        """同じURLは1度だけダウンロードし、同じ内容のファイルは1つだけ保存することのテスト"""
+        fake = patch_download(
+            monkeypatch,
+            FakeDownload({"https://a.example/1.pdf": b"same", "https://a.example/2.pdf": b"same"}),
+        )
+        documents = [
+            LinkDocument(title="1", url="https://a.example/1.pdf"),
+            LinkDocument(title="1（再掲）", url="https://a.example/1.pdf"),
+            LinkDocument(title="2", url="https://a.example/2.pdf"),
+        ]
+        stored = DocumentDownloader(store, max_workers=2).download_all(documents)
+
+        assert fake.calls == {"https://a.example/1.pdf": 1, "https://a.example/2.pdf": 1}
+        assert stored["https://a.example/1.pdf"] == stored["https://a.example/2.pdf"]
+        assert stored["https://a.example/1.pdf"].sha256 == sha256_hex(b"same")
+        assert len(list((store.root / "objects").rglob("*.pdf"))) == 1
+
+    def test_skip_stored(self, monkeypatch: pytest.MonkeyPatch, store: ContentStore):
+        """保存済みのURLの文書はダウンロードしないことのテスト"""
+        url = "https://a.example/1.pdf"
+        patch_download(monkeypatch, FakeDownload({url: b"content"}))
+        DocumentDownloader(store).download_all([LinkDocument(title="1", url=url)])
+
+        # インデックスを読み込み直した別のストアでも、ダウンロードせずに保存済みの文書を返す
+        fake = patch_download(monkeypatch, FakeDownload({}))
+        reloaded = ContentStore(store.root)
+        stored = DocumentDownloader(reloaded).download_all([LinkDocument(title="1", url=url)])
+
+        assert fake.calls == {}
+        assert stored[url].path.read_bytes() == b"content"
+
+    def test_store_error(self, monkeypatch: pytest.MonkeyPatch, store: ContentStore):
+        """保存に失敗した文書はログを出力して除き、他の文書の処理を続けることのテスト"""
+        patch_download(
+            monkeypatch,
+            FakeDownload({"https://a.example/1.pdf": b"1", "https://a.example/2.pdf": b"2"}),
+        )
+        put = store.put
+
+        def failing_put(content: bytes, suffix: str = ""):
+            if content == b"1":
+                raise OSError("No space left on device")
+            return put(content, suffix)
+
+        monkeypatch.setattr(store, "put", failing_put)
+        stored = DocumentDownloader(store).download_all(
+            LinkDocument(title=str(i), url=f"https://a.example/{i}.pdf") for i in (1, 2)
+        )
+
+        assert list(stored) == ["https://a.example/2.pdf"]
+        assert store.lookup("https://a.example/1.pdf") is None
+
+
+class TestDownloadDocuments:
+    def test_manifest(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+        """ダウンロードできなかった文書は、ハッシュ値とパスを空にすることのテスト"""
+        patch_download(monkeypatch, FakeDownload({"https://a.example/1.pdf": b"content"}))
+        rows = download_documents(
+            [
+                ("1", "npoportal", LinkDocument(title="1", url="https://a.example/1.pdf")),
+                ("2", "tokyo", LinkDocument(title="2", url="https://a.example/2.pdf")),
+            ],
+            tmp_path / "documents",
+        )
+
+        assert [(row.corporate_number, row.source, row.sha256) for row in rows] == [
+            ("1", "npoportal", sha256_hex(b"content")),
+            ("2", "tokyo", ""),
+        ]
+        assert Path(rows[0].path).read_bytes() == b"content"
+        assert rows[1].path == ""
@@ -0,0 +1,73 @@
+import pytest
+
+from approved_npo_data.lookup_service import (
+    MAX_LIMIT,
+    LookupService,
+    find_latest_output,
+    parse_limit,
+)
+from approved_npo_data.run_progress import write_status
+
+
+def create_output(base_path, timestamp: str, complete: bool | None = None):
+    path = base_path / "output" / f"output_{timestamp}.csv"
+    path.parent.mkdir(exist_ok=True)
+    path.write_text("header\n", encoding="utf-8")
+    if complete is not None:
+        write_status(path, complete, 0, 0, None)
+    return path
+
+
+class TestFindLatestOutput:
+    def test_latest(self, tmp_path):
+        create_output(tmp_path, "20250401000000")
+        latest = create_output(tmp_path, "20250402000000", complete=True)
+        (tmp_path / "output" / "output_backup.csv").write_text("header\n", encoding="utf-8")
+        assert find_latest_output(tmp_path) == latest
+
+    def test_skip_incomplete(self, tmp_path):
+        """期限までにすべての法人を処理できなかった出力CSVは除くことのテスト"""
+        complete = create_output(tmp_path, "20250401000000")
+        create_output(tmp_path, "20250402000000", complete=False)
+        assert find_latest_output(tmp_path) == complete
+
+    def test_no_output(self, tmp_path):
+        create_output(tmp_path, "20250401000000", complete=False)
+        assert find_latest_output(tmp_path) is None
+
+
+class TestLookupService:
+    def test_reload_if_updated(self, tmp_path):
+        service = LookupService(tmp_path)
+        assert not service.reload_if_updated()
+
+        first = create_output(tmp_path, "20250401000000", complete=True)
+        assert service.reload_if_updated()
+        assert service.index is not None and service.index.source == first
+
+        create_output(tmp_path, "20250402000000", complete=False)
+        assert not service.reload_if_updated()
+        assert service.index.source == first
+
+    def test_recheck_loaded_status(self, tmp_path):
+        """読み込んだ出力CSVが未完了になった場合は、完了している出力CSVを読み込み直すことのテスト"""
+        first = create_output(tmp_path, "20250401000000", complete=True)
+        second = create_output(tmp_path, "20250402000000")
+        service = LookupService(tmp_path)
+        assert service.reload_if_updated()
+        assert service.index is not None and service.index.source == second
+
+        write_status(second, False, 0, 0, None)
+        assert service.reload_if_updated()
+        assert service.index.source == first
+
+
+class TestParseLimit:
+    def test_parse(self):
+        assert parse_limit("5") == 5
+        assert parse_limit(str(MAX_LIMIT + 1)) == MAX_LIMIT
+
+    @pytest.mark.parametrize("value", ["0", "-1", "x"])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_limit(value)
@@ -0,0 +1,84 @@
+import pytest
+
+from approved_npo_data.csv.csv_row import AllNpoDataRow, ApprovedNpoRow
+from approved_npo_data.name_matching import AllNpoDataResolver, NameIndex, to_name_key
+
+
+def npo(corporate_number: str, name: str, control_office: str = "東京都") -> AllNpoDataRow:
+    return AllNpoDataRow(
+        corporate_number=corporate_number, corporation_name=name, control_office=control_office
+    )
+
+
+@pytest.fixture
+def index() -> NameIndex:
+    return NameIndex(
+        [
+            npo("1", "特定非営利活動法人こどもの未来支援センター"),
+            npo("2", "特定非営利活動法人まちづくり応援団"),
+            npo("3", "特定非営利活動法人まちづくり応援団", "大阪府"),
+            npo("4", "特定非営利活動法人森の学校"),
+            npo("5", "特定非営利活動法人森の学校"),
+            npo("6", "特定非営利活動法人みどりの会東京"),
+            npo("7", "特定非営利活動法人みどりの会大阪"),
+        ]
+    )
+
+
+class TestToNameKey:
+    def test_strip_corporate_type(self):
+        """標準化した上で法人格を除くことのテスト"""
+        assert to_name_key("特定非営利活動法人　ＡＢＣ") == to_name_key("NPO法人ABC")
+        assert to_name_key("特定非営利活動法人") == ""
+
+
+class TestNameIndex:
+    def test_exact(self, index: NameIndex):
+        """法人格の表記が異なっても完全一致とすることのテスト"""
+        match = index.find("NPO法人まちづくり応援団", "東京都")
+        assert match is not None
+        assert (match.row.corporate_number, match.similarity, match.exact) == ("2", 1.0, True)
+
+    def test_exact_in_jurisdiction(self, index: NameIndex):
+        """同じ名称の法人は所轄庁で区別することのテスト"""
+        match = index.find("特定非営利活動法人まちづくり応援団", "大阪府")
+        assert match is not None and match.row.corporate_number == "3"
+
+    def test_fuzzy(self, index: NameIndex):
+        """表記揺れがある場合は類似度が最も高い法人を返すことのテスト"""
+        match = index.find("特定非営利活動法人子どもの未来支援センター", "東京都", 0.7)
+        assert match is not None
+        assert match.row.corporate_number == "1"
+        assert not match.exact
+        assert 0.7 <= match.similarity < 1.0
+
+    def test_fuzzy_below_min_similarity(self, index: NameIndex):
+        assert index.find("特定非営利活動法人子どもの未来支援センター", "東京都", 0.95) is None
+
+    def test_ambiguous_exact(self, index: NameIndex):
+        """同じ所轄庁に同じ名称の法人が複数ある場合はNoneを返すことのテスト"""
+        assert index.find("特定非営利活動法人森の学校", "東京都") is None
+
+    def test_ambiguous_fuzzy(self, index: NameIndex):
+        """類似度が最も高い法人が複数ある場合はNoneを返すことのテスト"""
+        assert index.find("特定非営利活動法人みどりの会京都", "東京都", 0.5) is None
+
+    def test_no_match(self, index: NameIndex):
+        assert index.find("特定非営利活動法人こどもの未来支援センター", "大阪府") is None
+        assert index.find("特定非営利活動法人全く別の名前", "東京都") is None
+        assert index.find("特定非営利活動法人", "東京都") is None
+
+
+class TestAllNpoDataResolver:
+    def test_resolve(self):
+        row = npo("1", "特定非営利活動法人まちづくり応援団")
+        resolver = AllNpoDataResolver({"1": row})
+        by_number = ApprovedNpoRow(corporate_number="1")
+        by_name = ApprovedNpoRow(
+            corporate_number="9",
+            corporation_name="NPO法人まちづくり応援団",
+            control_office="東京都",
+        )
+        assert resolver.resolve(by_number) is row
+        assert resolver.resolve(by_name) is row
+        assert AllNpoDataResolver({"1": row}, match_by_name=False).resolve(by_name) is None
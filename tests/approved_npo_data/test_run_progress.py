@@ -0,0 +1,26 @@
+import json
+
+from approved_npo_data.run_progress import RunProgress, get_roster_digest
+
+
+class TestRunProgress:
+    def test_roster_digest(self):
+        """処理対象の法人番号と順序が同じ場合のみ同じハッシュ値になることのテスト"""
+        assert get_roster_digest(["1", "2"]) == get_roster_digest(iter(["1", "2"]))
+        assert get_roster_digest(["1", "2"]) != get_roster_digest(["2", "1"])
+        assert get_roster_digest(["1", "2"]) != get_roster_digest(["1"])
+
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "output" / "progress.json"
+        progress = RunProgress("output.csv", ["1"], 2, "2025-04-01T06:00:00", "digest")
+        progress.save(path)
+        assert RunProgress.load(path) == progress
+
+    def test_load_without_digest(self, tmp_path):
+        """処理対象のハッシュ値がない進捗ファイルは、どの処理対象とも一致しないことのテスト"""
+        path = tmp_path / "progress.json"
+        data = {"output_path": "output.csv", "completed": [], "total": 1, "created_at": ""}
+        path.write_text(json.dumps(data), encoding="utf-8")
+        progress = RunProgress.load(path)
+        assert progress is not None
+        assert progress.roster_digest != get_roster_digest([])
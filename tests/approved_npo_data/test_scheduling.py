@@ -0,0 +1,118 @@
+from datetime import date, datetime
+
+import pytest
+
+from approved_npo_data.csv.csv_row import ApprovedNpoRow, OutputApprovedNpoRow
+from approved_npo_data.scheduling import (
+    combine_scorers,
+    days_until_expiry,
+    expiry_scorer,
+    load_last_fetched,
+    prioritize,
+    staleness_scorer,
+    update_application_scorer,
+)
+from approved_npo_data.util.file_operations import save_csv
+
+TODAY = date(2025, 4, 1)
+
+
+def approved(
+    corporate_number: str = "1",
+    expiry: str = "",
+    special_expiry: str = "",
+    update_application: str = "",
+) -> ApprovedNpoRow:
+    return ApprovedNpoRow(
+        corporate_number=corporate_number,
+        approved_validity_period_to=expiry,
+        special_approved_validity_period_to=special_expiry,
+        update_application=update_application,
+    )
+
+
+class TestExpiryScorer:
+    def test_days_until_expiry(self):
+        """認定有効期間と特例認定有効期間のうち近い方の満了日を使うことのテスト"""
+        assert days_until_expiry(approved(expiry="2025/04/11"), TODAY) == 10
+        assert (
+            days_until_expiry(approved(expiry="令和7年5月1日", special_expiry="2025/04/02"), TODAY)
+            == 1
+        )
+        assert days_until_expiry(approved(expiry="不明"), TODAY) is None
+
+    @pytest.mark.parametrize(
+        ("expiry", "expected"),
+        [
+            ("2025/04/01", 1.0),
+            ("2025/03/01", 1.0),  # 満了日を過ぎている
+            ("2025/05/01", 0.5),
+            ("2025/06/01", 0.0),
+            ("2026/04/01", 0.0),
+            ("", 0.0),
+        ],
+    )
+    def test_score(self, expiry: str, expected: float):
+        score = expiry_scorer(TODAY, 61)
+        assert score(approved(expiry=expiry)) == pytest.approx(expected, abs=0.01)
+
+
+class TestUpdateApplicationScorer:
+    @pytest.mark.parametrize(
+        ("value", "expected"), [("", 0.0), ("－", 0.0), (" × ", 0.0), ("○", 1.0), ("申請中", 1.0)]
+    )
+    def test_score(self, value: str, expected: float):
+        assert update_application_scorer(approved(update_application=value)) == expected
+
+
+class TestStalenessScorer:
+    def test_score(self):
+        now = datetime(2025, 4, 1)
+        score = staleness_scorer(
+            {"1": datetime(2025, 3, 31), "2": datetime(2025, 1, 1), "3": datetime(2025, 4, 2)},
+            now,
+            max_age_days=10,
+        )
+        assert score(approved("1")) == pytest.approx(0.1)
+        assert score(approved("2")) == 1.0
+        assert score(approved("3")) == 0.0
+        # 取得したことがない法人
+        assert score(approved("4")) == 1.0
+
+
+class TestLoadLastFetched:
+    def test_load(self, tmp_path):
+        """新しい出力から順に、詳細情報を取得できた日時を採用することのテスト"""
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+
+        def output(corporate_number: str, fetched: bool) -> OutputApprovedNpoRow:
+            return OutputApprovedNpoRow(
+                approved_npo_corporate_number=corporate_number,
+                information_corporate_name="法人名" if fetched else "",
+            )
+
+        save_csv([output("1", True), output("2", True)], output_dir / "output_20250301000000.csv")
+        save_csv([output("1", True), output("2", False)], output_dir / "output_20250310000000.csv")
+        assert load_last_fetched(tmp_path, 2) == {
+            "1": datetime(2025, 3, 10),
+            "2": datetime(2025, 3, 1),
+        }
+        assert load_last_fetched(tmp_path, 1) == {"1": datetime(2025, 3, 10)}
+
+
+class TestPrioritize:
+    def test_combine_and_prioritize(self):
+        """重み付きの和が大きい順に並べ、同じ場合は名簿の順序のままにすることのテスト"""
+        rows = [
+            approved("1"),
+            approved("2", update_application="○"),
+            approved("3", expiry="2025/04/01"),
+            approved("4", expiry="2025/04/01", update_application="○"),
+            approved("5"),
+        ]
+        scorer = combine_scorers(
+            [(expiry_scorer(TODAY, 30), 1.0), (update_application_scorer, 0.5)]
+        )
+        assert scorer(rows[3]) == pytest.approx(1.5)
+        assert prioritize(rows, scorer) == [3, 2, 1, 0, 4]
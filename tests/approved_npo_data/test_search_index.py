@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import pytest
+
+from approved_npo_data.csv.csv_row import AllNpoDataRow
+from approved_npo_data.scraping.npoportal_detail.Information_model import Information
+from approved_npo_data.search_index import (
+    SearchIndex,
+    build_search_index,
+    to_index_text,
+    to_match_query,
+)
+
+
+class TestToMatchQuery:
+    @pytest.mark.parametrize(
+        ("query", "column", "expected"),
+        [
+            ("子ども", None, '"子ど ども"'),
+            # 空白で区切った検索語はAND検索
+            ("子ども　支援", None, '"子ど ども" AND "支援"'),
+            # N文字未満の検索語は前方一致
+            ("子", None, '"子" *'),
+            ("子ども", "purpose", 'purpose : "子ど ども"'),
+            # FTS5の検索式の記号はエスケープする
+            ('a"b', None, '"a"" ""b"'),
+            ("  ", None, ""),
+        ],
+    )
+    def test_to_match_query(self, query: str, column: str | None, expected: str):
+        assert to_match_query(query, column) == expected
+
+    def test_to_index_text(self):
+        """別の文字列をまたいだN-gramを作らないことのテスト"""
+        assert to_index_text("子ども", "", "環境") == "子ど ども も 環境 境"
+
+
+class TestSearchIndex:
+    @pytest.fixture
+    def index(self, tmp_path: Path):
+        all_npo_data = [
+            AllNpoDataRow(
+                corporate_number="1",
+                purpose_described_in_the_articles="地域の子どもの居場所づくり",
+                specific_non_profit_activities="学習支援事業",
+                activity_area_1="子どもの健全育成",
+            ),
+            AllNpoDataRow(
+                corporate_number="2",
+                purpose_described_in_the_articles="森林の保全",
+                activity_area_1="環境の保全",
+            ),
+            AllNpoDataRow(corporate_number="3", purpose_described_in_the_articles="高齢者の支援"),
+        ]
+        informations = {
+            # 全NPO法人情報と異なる内容の場合は両方の内容で検索できる
+            "2": Information(articles_of_incorporation_purpose="里山の再生と子どもの自然体験"),
+        }
+        path = tmp_path / "search.sqlite3"
+        build_search_index(path, all_npo_data, informations)
+        index = SearchIndex(path)
+        yield index
+        index.close()
+
+    def test_build_replaces_tmp(self, index: SearchIndex):
+        assert index.path.exists()
+        assert not index.path.with_name(f"{index.path.name}.tmp").exists()
+
+    def test_search(self, index: SearchIndex):
+        assert sorted(index.search("子ども")) == ["1", "2"]
+        assert index.search("子ども 学習") == ["1"]
+        assert index.search("里山") == ["2"]
+        assert sorted(index.search("支援")) == ["1", "3"]
+        assert index.search("宇宙") == []
+        assert index.search("") == []
+
+    def test_search_column(self, index: SearchIndex):
+        assert index.search("支援", column="business") == ["1"]
+        assert index.search("保全", column="activity_fields") == ["2"]
+        with pytest.raises(ValueError):
+            index.search("支援", column="unknown")
+
+    def test_limit(self, index: SearchIndex):
+        assert len(index.search("子ども", limit=1)) == 1
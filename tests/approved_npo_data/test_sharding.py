@@ -0,0 +1,153 @@
+from pathlib import Path
+
+import pytest
+
+from approved_npo_data.csv.csv_row import ApprovedNpoRow, OutputApprovedNpoRow
+from approved_npo_data.sharding import (
+    Shard,
+    find_roster_path,
+    find_shard_outputs,
+    merge_shard_outputs,
+    read_output_csv,
+    shard_index,
+)
+from approved_npo_data.util.file_operations import save_csv
+
+
+def output(corporate_number: str, detail: str = "") -> OutputApprovedNpoRow:
+    return OutputApprovedNpoRow(
+        approved_npo_corporate_number=corporate_number, information_corporate_name=detail
+    )
+
+
+def save_shard(path: Path, rows: list[OutputApprovedNpoRow]) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    save_csv(rows, path)
+    return path
+
+
+def save_shard_run(
+    base_path: Path, name: str, timestamp: str, roster: list[str] | None = None
+) -> Path:
+    """シャードの出力先のフォルダに、実行1回分の名簿と出力CSVを保存する"""
+    output_path = base_path / "shards" / name / "output"
+    if roster is not None:
+        save_shard(
+            output_path / f"approved_npo_data_{timestamp}.csv",
+            [ApprovedNpoRow(corporate_number=number) for number in roster],
+        )
+    return save_shard(output_path / f"output_{timestamp}.csv", [output("1")])
+
+
+class TestShard:
+    def test_parse(self):
+        shard = Shard.parse("2/4")
+        assert (shard.index, shard.count, shard.name) == (2, 4, "2of4")
+        assert shard.get_base_path(Path("base")) == Path("base/shards/2of4")
+
+    @pytest.mark.parametrize("text", ["2", "0/4", "5/4", "a/4", "1/"])
+    def test_parse_invalid(self, text: str):
+        with pytest.raises(ValueError):
+            Shard.parse(text)
+
+
+class TestShardIndex:
+    def test_deterministic(self):
+        """同じ法人番号は常に同じシャードに属することのテスト"""
+        # プロセス（PYTHONHASHSEED）によらない値であることを確認するため、期待値を固定する
+        assert shard_index("1234567890123", 4) == 4
+        assert [shard_index(str(i), 4) for i in range(8)] == [1, 2, 3, 4, 3, 4, 4, 3]
+
+    def test_every_number_in_exactly_one_shard(self):
+        numbers = [f"{i:013d}" for i in range(200)]
+        shards = [Shard(i, 3) for i in range(1, 4)]
+        for number in numbers:
+            assert sum(shard.contains(number) for shard in shards) == 1
+        # ハッシュ値で分割するため、すべてのシャードに法人が含まれる
+        assert all(any(shard.contains(number) for number in numbers) for shard in shards)
+
+
+class TestMergeShardOutputs:
+    def test_merge_in_roster_order(self, tmp_path: Path):
+        first = save_shard(tmp_path / "1of2.csv", [output("3", "c"), output("1", "a")])
+        second = save_shard(tmp_path / "2of2.csv", [output("2", "b"), output("9", "z")])
+        merged, missing = merge_shard_outputs([first, second], ["1", "2", "3"])
+        # 名簿にない法人は最後に追加する
+        assert [row.approved_npo_corporate_number for row in merged] == ["1", "2", "3", "9"]
+        assert missing == []
+
+    def test_missing_shard(self, tmp_path: Path):
+        """出力がないシャードの法人は、結合できなかった法人番号として返すことのテスト"""
+        first = save_shard(tmp_path / "1of2.csv", [output("1", "a")])
+        merged, missing = merge_shard_outputs([first], ["1", "2", "3"])
+        assert [row.approved_npo_corporate_number for row in merged] == ["1"]
+        assert missing == ["2", "3"]
+
+    def test_duplicate_shard(self, tmp_path: Path):
+        """同じ法人が複数のシャードにある場合は、詳細ページの情報を取得できた行を優先することのテスト"""
+        first = save_shard(tmp_path / "a.csv", [output("1"), output("2", "b")])
+        second = save_shard(tmp_path / "b.csv", [output("1", "a"), output("2")])
+        merged, missing = merge_shard_outputs([first, second], ["1", "2"])
+        assert [row.information_corporate_name for row in merged] == ["a", "b"]
+        assert missing == []
+
+    def test_header_mismatch(self, tmp_path: Path):
+        path = tmp_path / "other.csv"
+        path.write_text("a,b\n1,2\n", encoding="utf-8")
+        with pytest.raises(ValueError):
+            read_output_csv(path)
+
+
+class TestFindShardOutputs:
+    def test_latest_outputs(self, tmp_path: Path):
+        """各シャードの最新の出力CSVをシャードの番号順に返すことのテスト"""
+        save_shard_run(tmp_path, "2of2", "20250101000000")
+        second = save_shard_run(tmp_path, "2of2", "20250102000000")
+        first = save_shard_run(tmp_path, "1of2", "20250102010000")
+        (tmp_path / "shards" / "other").mkdir()
+        assert find_shard_outputs(tmp_path) == [first, second]
+
+    def test_no_shards(self, tmp_path: Path):
+        assert find_shard_outputs(tmp_path) == []
+
+    def test_ignore_other_count(self, tmp_path: Path):
+        """最新の出力CSVのシャードと異なる数で分割したシャードの出力は結合しないことのテスト"""
+        for index in range(1, 5):
+            save_shard_run(tmp_path, f"{index}of4", "20250101000000")
+        first = save_shard_run(tmp_path, "1of2", "20250102000000")
+        second = save_shard_run(tmp_path, "2of2", "20250102000000")
+        assert find_shard_outputs(tmp_path) == [first, second]
+
+    def test_missing_shard(self, tmp_path: Path):
+        """最新の実行のシャードの出力CSVが揃っていない場合はエラーとすることのテスト"""
+        for index in range(1, 5):
+            save_shard_run(tmp_path, f"{index}of4", "20250101000000")
+        save_shard_run(tmp_path, "1of2", "20250102000000")
+        with pytest.raises(ValueError, match="2of2"):
+            find_shard_outputs(tmp_path)
+
+    def test_different_roster(self, tmp_path: Path):
+        """シャードの名簿が一致しない（別の実行の出力である）場合はエラーとすることのテスト"""
+        save_shard_run(tmp_path, "1of2", "20250101000000", ["1", "2"])
+        save_shard_run(tmp_path, "2of2", "20250102000000", ["1", "2", "3"])
+        with pytest.raises(ValueError):
+            find_shard_outputs(tmp_path)
+
+    def test_same_roster(self, tmp_path: Path):
+        first = save_shard_run(tmp_path, "1of2", "20250101000000", ["1", "2"])
+        second = save_shard_run(tmp_path, "2of2", "20250102000000", ["1", "2"])
+        assert find_shard_outputs(tmp_path) == [first, second]
+
+
+class TestFindRosterPath:
+    def test_latest_roster(self, tmp_path: Path):
+        """シャードの出力CSVと同じフォルダの最新の名簿を返すことのテスト"""
+        first = save_shard_run(tmp_path, "1of2", "20250101000000", ["1"])
+        save_shard_run(tmp_path, "1of2", "20250102000000", ["1", "2"])
+        second = save_shard_run(tmp_path, "2of2", "20250101000000", ["1"])
+        roster_path = find_roster_path([first, second])
+        assert roster_path == first.with_name("approved_npo_data_20250102000000.csv")
+
+    def test_no_roster(self, tmp_path: Path):
+        assert find_roster_path([save_shard_run(tmp_path, "1of2", "20250101000000")]) is None
+        assert find_roster_path([]) is None
@@ -0,0 +1,90 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+import requests
+
+from approved_npo_data.util.cassette import Cassette, CassetteMissError
+from approved_npo_data.util.http_client import http_get, is_replaying, set_cassette
+
+
+def create_response(url: str, status_code: int, content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = "OK" if status_code == 200 else "Not Found"
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response.encoding = "utf-8"
+    response._content = content
+    return response
+
+
+class TestCassette:
+    def test_invalid_mode(self, tmp_path: Path):
+        with pytest.raises(ValueError):
+            Cassette(tmp_path, "unknown")
+
+    def test_save_and_load(self, tmp_path: Path):
+        url = "https://example.com/a"
+        Cassette(tmp_path, Cassette.RECORD).save(url, create_response(url, 200, b"<html></html>"))
+
+        actual = Cassette(tmp_path, Cassette.REPLAY).load(url)
+
+        assert actual.status_code == 200
+        assert actual.content == b"<html></html>"
+        assert actual.headers["content-type"] == "text/html; charset=utf-8"
+        assert actual.text == "<html></html>"
+
+    def test_load_error_response(self, tmp_path: Path):
+        url = "https://example.com/missing"
+        Cassette(tmp_path, Cassette.RECORD).save(url, create_response(url, 404, b""))
+
+        actual = Cassette(tmp_path, Cassette.REPLAY).load(url)
+
+        with pytest.raises(requests.HTTPError) as e:
+            actual.raise_for_status()
+        assert e.value.response.status_code == 404
+
+    def test_save_overwrite(self, tmp_path: Path):
+        url = "https://example.com/a"
+        cassette = Cassette(tmp_path, Cassette.RECORD)
+        cassette.save(url, create_response(url, 200, b"old"))
+        cassette.save(url, create_response(url, 200, b"new"))
+
+        assert cassette.load(url).content == b"new"
+
+    def test_load_miss(self, tmp_path: Path):
+        with pytest.raises(CassetteMissError):
+            Cassette(tmp_path, Cassette.REPLAY).load("https://example.com/a")
+
+
+class TestHttpGetWithCassette:
+    @pytest.fixture(autouse=True)
+    def reset_cassette(self):
+        set_cassette(None)
+        yield
+        set_cassette(None)
+
+    def test_record_and_replay(self, tmp_path: Path):
+        url = "https://example.com/a"
+        set_cassette(Cassette(tmp_path, Cassette.RECORD))
+        with mock.patch(
+            "approved_npo_data.util.http_client.requests.get",
+            return_value=create_response(url, 200, b"content"),
+        ):
+            assert http_get(url, timeout=10).content == b"content"
+        assert not is_replaying()
+
+        set_cassette(Cassette(tmp_path, Cassette.REPLAY))
+        with mock.patch("approved_npo_data.util.http_client.requests.get") as mock_get:
+            actual = http_get(url, timeout=10)
+
+        assert is_replaying()
+        assert actual.content == b"content"
+        mock_get.assert_not_called()
+
+    def test_replay_miss(self, tmp_path: Path):
+        set_cassette(Cassette(tmp_path, Cassette.REPLAY))
+
+        with pytest.raises(requests.RequestException):
+            http_get("https://example.com/a")
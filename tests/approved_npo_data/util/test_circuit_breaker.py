@@ -0,0 +1,97 @@
+import pytest
+
+from approved_npo_data.util.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    HostCircuitBreakers,
+)
+from approved_npo_data.util.metrics import metrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "example.com",
+        failure_rate=0.5,
+        window_size=4,
+        min_requests=4,
+        open_seconds=10,
+        clock=clock,
+    )
+
+
+class TestCircuitBreaker:
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    def test_opens_at_failure_rate(self):
+        """直近のリクエストの失敗率が閾値以上になった場合に開くことのテスト"""
+        breaker = create_breaker(FakeClock())
+        for success in (True, False, True):
+            breaker.record(success)
+        # 最小のリクエスト数に満たない間は開かない
+        assert breaker.state == CLOSED
+        breaker.record(False)
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert metrics.gauges()["circuit_breaker_open"] == {(("host", "example.com"),): 1}
+
+    def test_stays_closed_below_failure_rate(self):
+        """失敗率が閾値未満の場合は開かないことのテスト"""
+        breaker = create_breaker(FakeClock())
+        for success in (False, True, True, True, False, True):
+            breaker.record(success)
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_half_open_probe_success_closes(self):
+        """一定時間後に試行のリクエストのみ許可し、成功した場合は閉じることのテスト"""
+        clock = FakeClock()
+        breaker = create_breaker(clock)
+        for _ in range(4):
+            breaker.record(False)
+        assert breaker.retry_after() == 10
+
+        clock.now = 10
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        # 試行のリクエストは1件のみ
+        assert not breaker.allow()
+        breaker.record(True)
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_half_open_probe_failure_reopens(self):
+        """試行のリクエストが失敗した場合は再び開くことのテスト"""
+        clock = FakeClock()
+        breaker = create_breaker(clock)
+        for _ in range(4):
+            breaker.record(False)
+        clock.now = 10
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == OPEN
+        assert breaker.retry_after() == 10
+
+
+class TestHostCircuitBreakers:
+    def test_get_per_host(self):
+        """ホスト毎に別のサーキットブレーカーを使用することのテスト"""
+        breakers = HostCircuitBreakers(0.5, 2, 2, 10, clock=FakeClock())
+        assert breakers.get("a") is breakers.get("a")
+        breakers.get("a").record(False)
+        breakers.get("a").record(False)
+        assert breakers.states() == {"a": OPEN}
+        assert breakers.get("b").state == CLOSED
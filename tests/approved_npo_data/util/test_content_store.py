@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pytest
+
+from approved_npo_data.util.content_store import ContentStore, StoredContent, sha256_hex
+
+
+def test_sha256_hex():
+    expected = "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
+    assert sha256_hex(b"") == expected
+
+
+class TestContentStore:
+    @pytest.fixture
+    def store(self, tmp_path: Path) -> ContentStore:
+        return ContentStore(tmp_path / "documents")
+
+    def test_path_for(self, store: ContentStore):
+        expected = store.root / "objects" / "ab" / "abcdef.pdf"
+        assert store.path_for("abcdef", ".pdf") == expected
+
+    def test_put(self, store: ContentStore):
+        stored = store.put(b"content", ".pdf")
+
+        assert stored.sha256 == sha256_hex(b"content")
+        assert stored.path == store.path_for(stored.sha256, ".pdf")
+        assert stored.path.read_bytes() == b"content"
+
+    def test_put_same_content(self, store: ContentStore):
+        first = store.put(b"content", ".pdf")
+        second = store.put(b"content", ".pdf")
+
+        assert first == second
+        assert len(list((store.root / "objects").rglob("*.pdf"))) == 1
+
+    def test_put_same_content_other_suffix(self, store: ContentStore):
+        """同じ内容のファイルは拡張子が異なっても1つだけ保存することのテスト"""
+        first = store.put(b"content", ".pdf")
+        second = store.put(b"content", ".PDF")
+        third = store.put(b"content")
+
+        assert first == second == third
+        assert len(list((store.root / "objects").rglob("*"))) == 2  # フォルダとファイル
+
+    def test_find(self, store: ContentStore):
+        stored = store.put(b"content", ".pdf")
+        stored.path.with_name(f"{stored.path.name}.1.tmp").write_bytes(b"")
+
+        assert store.find(stored.sha256) == stored.path
+        assert store.find(sha256_hex(b"other")) is None
+
+    def test_lookup_missing_url(self, store: ContentStore):
+        assert store.lookup("https://example.com/a.pdf") is None
+
+    def test_record_and_lookup(self, store: ContentStore):
+        stored = store.put(b"content", ".pdf")
+        store.record("https://example.com/a.pdf", stored)
+
+        assert store.lookup("https://example.com/a.pdf") == stored
+
+    def test_lookup_deleted_file(self, store: ContentStore):
+        stored = store.put(b"content", ".pdf")
+        store.record("https://example.com/a.pdf", stored)
+        stored.path.unlink()
+
+        assert store.lookup("https://example.com/a.pdf") is None
+
+    def test_save_index(self, store: ContentStore):
+        stored = store.put(b"content", ".pdf")
+        store.record("https://example.com/a.pdf", stored)
+        store.save_index()
+
+        reloaded = ContentStore(store.root)
+        assert reloaded.lookup("https://example.com/a.pdf") == StoredContent(
+            sha256=stored.sha256, path=stored.path
+        )
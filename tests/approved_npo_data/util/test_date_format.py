@@ -1,4 +1,6 @@
-from approved_npo_data.util.date_format import simple_format_time
+import pytest
+
+from approved_npo_data.util.date_format import simple_format_time, to_iso_date
 
 
 class TestSimpleFormatTime:
@@ -33,3 +35,27 @@ class TestSimpleFormatTime:
 
         def test_float_seconds_rounding(self):
             assert simple_format_time(3660.9) == "1時間1分0秒"
+
+
+class TestToIsoDate:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("2021/4/1", "2021-04-01"),
+            ("2021/04/01", "2021-04-01"),
+            ("2021-04-01", "2021-04-01"),
+            ("2021年4月1日", "2021-04-01"),
+            ("２０２１年４月１日", "2021-04-01"),
+            ("令和3年4月1日", "2021-04-01"),
+            ("R3.4.1", "2021-04-01"),
+            ("平成31年4月30日", "2019-04-30"),
+            ("令和元年5月1日", "2019-05-01"),
+            ("2021年4月1日～2026年3月31日", "2021-04-01"),
+        ],
+    )
+    def test_valid(self, text, expected):
+        assert to_iso_date(text) == expected
+
+    @pytest.mark.parametrize("text", ["", "○", "2021/13/1", "2021年2月30日"])
+    def test_invalid(self, text):
+        assert to_iso_date(text) == ""
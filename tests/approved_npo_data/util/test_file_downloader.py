@@ -4,12 +4,16 @@ from unittest.mock import MagicMock, mock_open, patch
 import pytest
 from requests.exceptions import HTTPError, RequestException
 
-from approved_npo_data.util.file_downloader import download_file
+from approved_npo_data.util.file_downloader import (
+    download_content,
+    download_file,
+    is_not_found_error,
+)
 
 
 @pytest.fixture
 def mock_requests_get():
-    with patch("approved_npo_data.util.file_downloader.requests.get") as mock_get:
+    with patch("approved_npo_data.util.http_client.requests.get") as mock_get:
         yield mock_get
 
 
@@ -93,3 +97,36 @@ def test_download_file_invalid_status_code(mock_requests_get):
         download_file(url)
 
     mock_requests_get.assert_called_once_with(url)
+
+
+def test_download_content_with_kwargs(mock_requests_get):
+    mock_response = MagicMock()
+    mock_response.content = b"file content"
+    mock_requests_get.return_value = mock_response
+
+    url = "https://example.com/file.pdf"
+
+    actual = download_content(url, timeout=30)
+
+    mock_requests_get.assert_called_once_with(url, timeout=30)
+    assert actual == b"file content"
+
+
+class TestIsNotFoundError:
+    @staticmethod
+    def _download_error(status_code: int) -> Exception:
+        response = MagicMock()
+        response.status_code = status_code
+        try:
+            raise Exception("Failed to download the file") from HTTPError(response=response)
+        except Exception as e:
+            return e
+
+    def test_not_found(self):
+        assert is_not_found_error(self._download_error(404))
+
+    def test_other_status(self):
+        assert not is_not_found_error(self._download_error(500))
+
+    def test_without_cause(self):
+        assert not is_not_found_error(Exception("error"))
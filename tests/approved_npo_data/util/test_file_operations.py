@@ -1,15 +1,24 @@
 import csv
+import sqlite3
 import tempfile
 import zipfile
 from collections.abc import Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from unittest import mock
 
 import pytest
 
-from approved_npo_data.util.file_operations import extract_zip_file, get_output_path, save_csv
+from approved_npo_data.util.file_operations import (
+    SqliteWriter,
+    extract_zip_file,
+    get_model_columns,
+    get_output_path,
+    get_output_timestamp,
+    list_output_paths,
+    save_csv,
+)
 from approved_npo_data.util.model_base import ModelBase
 
 
@@ -111,6 +120,52 @@ class TestSaveCsv:
             save_csv(data=[], output_path=output_path)
 
 
+@dataclass(frozen=True)
+class SampleListRow(ModelBase):
+    Name: str
+    Tags: list[str] = field(default_factory=list)
+
+
+def test_get_model_columns():
+    assert get_model_columns(SampleCsvRow) == ["Name", "Age", "City"]
+    assert get_model_columns(SampleListRow) == ["Name"]
+
+
+class TestSqliteWriter:
+    @pytest.fixture
+    def writer(self, tmp_path: Path):
+        writer = SqliteWriter(tmp_path / "test.sqlite3")
+        writer.create_table("people", ["Name", "Age", "City"])
+        return writer
+
+    def test_insert(self, writer: SqliteWriter):
+        writer.insert("people", [("Alice", "30", "New York"), ("Bob", "25", "San Francisco")])
+        writer.create_index("people", ["City", "Age"])
+        writer.close()
+
+        with sqlite3.connect(writer.output_path) as connection:
+            rows = connection.execute("SELECT * FROM people ORDER BY Name").fetchall()
+            indexes = connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            ).fetchall()
+        assert rows == [("Alice", "30", "New York"), ("Bob", "25", "San Francisco")]
+        assert indexes == [("idx_people_City_Age",)]
+        assert not writer.tmp_path.exists()
+
+    def test_output_not_visible_until_close(self, writer: SqliteWriter):
+        writer.insert("people", [("Alice", "30", "New York")])
+
+        assert not writer.output_path.exists()
+        assert writer.tmp_path.exists()
+
+    def test_abort(self, writer: SqliteWriter):
+        writer.insert("people", [("Alice", "30", "New York")])
+        writer.abort()
+
+        assert not writer.output_path.exists()
+        assert not writer.tmp_path.exists()
+
+
 class TestGetOutputPath:
     @pytest.fixture
     @staticmethod
@@ -149,3 +204,51 @@ class TestGetOutputPath:
         assert (
             result == expected_path
         ), "カスタムプレフィックスを使用したファイルパスが期待されるものと異なる"
+
+    def test_output_file_with_custom_suffix(self, mock_datetime, tmp_path):
+        """
+        拡張子を指定した場合、正しいファイルパスが生成されること
+        """
+        base_path = tmp_path / "test_dir"
+
+        result = get_output_path(base_path, prefix="metrics", suffix=".json")
+
+        expected_path = base_path / "output" / "metrics_20240929120000.json"
+        assert result == expected_path
+
+
+class TestListOutputPaths:
+    def test_list_output_paths(self, tmp_path):
+        """
+        出力ファイルのパスが新しい順に返されること（他の出力ファイルは含まれないこと）
+        """
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+        for name in (
+            "output_20240101000000.csv",
+            "output_20240301000000.csv",
+            "output_20240201000000.csv",
+            "output_20240401000000.sqlite3",
+            "approved_npo_data_20240501000000.csv",
+            "output_20240601000000.csv.tmp",
+        ):
+            (output_dir / name).touch()
+
+        assert [path.name for path in list_output_paths(tmp_path)] == [
+            "output_20240301000000.csv",
+            "output_20240201000000.csv",
+            "output_20240101000000.csv",
+        ]
+
+    def test_list_output_paths_no_directory(self, tmp_path):
+        """
+        出力ディレクトリが存在しない場合は空のリストが返されること
+        """
+        assert list_output_paths(tmp_path) == []
+
+    def test_get_output_timestamp(self):
+        """
+        ファイル名から作成日時が取得できること
+        """
+        path = Path("output/approved_npo_data_20240929120000.csv")
+        assert get_output_timestamp(path) == datetime(2024, 9, 29, 12, 0, 0)
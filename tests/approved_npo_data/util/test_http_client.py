@@ -0,0 +1,86 @@
+from unittest import mock
+
+import pytest
+from requests import RequestException
+
+from approved_npo_data.util.circuit_breaker import CircuitOpenError, HostCircuitBreakers
+from approved_npo_data.util.http_client import http_get, set_circuit_breakers
+from approved_npo_data.util.metrics import metrics
+
+
+class TestHttpGet:
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    def test_success(self):
+        response = mock.Mock(status_code=200, content=b"12345")
+        with mock.patch(
+            "approved_npo_data.util.http_client.requests.get", return_value=response
+        ) as mock_get:
+            actual = http_get("https://example.com/a", timeout=10)
+
+        assert actual is response
+        mock_get.assert_called_once_with("https://example.com/a", timeout=10)
+        counters = metrics.counters()
+        assert counters["http_requests_total"] == {(("host", "example.com"), ("status", "200")): 1}
+        assert counters["http_response_bytes_total"] == {(("host", "example.com"),): 5}
+        assert len(metrics.observations()["http_request_seconds"][(("host", "example.com"),)]) == 1
+        assert metrics.gauges()["http_requests_in_flight"] == {(("host", "example.com"),): 0}
+
+    def test_request_exception(self):
+        with mock.patch(
+            "approved_npo_data.util.http_client.requests.get",
+            side_effect=RequestException("error"),
+        ):
+            with pytest.raises(RequestException):
+                http_get("https://example.com/a")
+
+        assert metrics.counters()["http_requests_total"] == {
+            (("host", "example.com"), ("status", "error")): 1
+        }
+
+
+class TestHttpGetCircuitBreaker:
+    @pytest.fixture(autouse=True)
+    def circuit_breakers(self):
+        metrics.reset()
+        breakers = HostCircuitBreakers(0.5, 2, 2, 60)
+        set_circuit_breakers(breakers)
+        yield breakers
+        set_circuit_breakers(None)
+        metrics.reset()
+
+    def test_short_circuit_after_failures(self, circuit_breakers):
+        """失敗が続いたホストにはリクエストを送信しないことのテスト"""
+        response = mock.Mock(status_code=503, content=b"")
+        with mock.patch(
+            "approved_npo_data.util.http_client.requests.get", return_value=response
+        ) as mock_get:
+            http_get("https://example.com/a")
+            http_get("https://example.com/b")
+            with pytest.raises(CircuitOpenError):
+                http_get("https://example.com/c")
+
+        assert mock_get.call_count == 2
+        assert metrics.counters()["http_short_circuits_total"] == {(("host", "example.com"),): 1}
+
+    def test_other_host_not_affected(self, circuit_breakers):
+        """別のホストのリクエストは送信することのテスト"""
+        with mock.patch(
+            "approved_npo_data.util.http_client.requests.get",
+            side_effect=RequestException("error"),
+        ):
+            for _ in range(2):
+                with pytest.raises(RequestException):
+                    http_get("https://example.com/a")
+
+        response = mock.Mock(status_code=200, content=b"")
+        with mock.patch(
+            "approved_npo_data.util.http_client.requests.get", return_value=response
+        ) as mock_get:
+            assert http_get("https://example.org/a") is response
+        mock_get.assert_called_once()
+        assert circuit_breakers.states() == {"example.com": "open", "example.org": "closed"}
@@ -0,0 +1,118 @@
+import logging
+from logging import ERROR, INFO, WARNING, LogRecord
+from logging.handlers import QueueHandler
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from approved_npo_data.util.logging_setup import RepeatedMessageFilter, setup_logging
+
+
+def create_record(msg: str, *args, level: int = WARNING, name: str = "test") -> LogRecord:
+    return LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class TestRepeatedMessageFilter:
+    def test_allow_within_burst(self):
+        log_filter = RepeatedMessageFilter(interval_seconds=60, burst=2)
+
+        actual = [log_filter.filter(create_record("message %s", i)) for i in range(2)]
+
+        assert actual == [True, True]
+
+    def test_suppress_over_burst(self):
+        log_filter = RepeatedMessageFilter(interval_seconds=60, burst=2)
+
+        actual = [log_filter.filter(create_record("message %s", i)) for i in range(4)]
+
+        assert actual == [True, True, False, False]
+
+    def test_count_by_template(self):
+        log_filter = RepeatedMessageFilter(interval_seconds=60, burst=1)
+
+        assert log_filter.filter(create_record("message A %s", 1))
+        assert log_filter.filter(create_record("message B %s", 1))
+        assert not log_filter.filter(create_record("message A %s", 2))
+
+    def test_not_suppress_error(self):
+        log_filter = RepeatedMessageFilter(interval_seconds=60, burst=1)
+
+        actual = [log_filter.filter(create_record("message", level=ERROR)) for _ in range(3)]
+
+        assert actual == [True, True, True]
+
+    def test_reset_after_interval(self):
+        log_filter = RepeatedMessageFilter(interval_seconds=60, burst=1)
+
+        with mock.patch("approved_npo_data.util.logging_setup.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = 0
+            assert log_filter.filter(create_record("message %s", "a"))
+            assert not log_filter.filter(create_record("message %s", "b"))
+            assert not log_filter.filter(create_record("message %s", "c"))
+
+            mock_monotonic.return_value = 60
+            record = create_record("message %s", "x")
+            assert log_filter.filter(record)
+
+        assert record.getMessage() == "message x (同じログを2件間引きました)"
+
+
+class TestSetupLogging:
+    @pytest.fixture
+    def config_path(self, tmp_path: Path) -> Path:
+        config_path = tmp_path / "logging.conf"
+        log_path = (tmp_path / "test.log").as_posix()
+        config_path.write_text(
+            f"""
+[loggers]
+keys=root
+
+[handlers]
+keys=fileHandler
+
+[formatters]
+keys=simpleFormatter
+
+[logger_root]
+level=INFO
+handlers=fileHandler
+
+[handler_fileHandler]
+class=FileHandler
+level=INFO
+formatter=simpleFormatter
+args=('{log_path}',)
+
+[formatter_simpleFormatter]
+format=%(levelname)s %(message)s
+""",
+            encoding="utf-8",
+        )
+        return config_path
+
+    @pytest.fixture(autouse=True)
+    def restore_root_logger(self):
+        root = logging.getLogger()
+        handlers, level = list(root.handlers), root.level
+        yield
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+
+    def test_setup_logging(self, config_path: Path):
+        listener = setup_logging(config_path)
+        try:
+            root = logging.getLogger()
+            assert [type(handler) for handler in root.handlers] == [QueueHandler]
+
+            logging.getLogger("test_setup_logging").log(INFO, "hello %s", "world")
+        finally:
+            listener.stop()
+
+        for handler in listener.handlers:
+            handler.close()
+        log_text = (config_path.parent / "test.log").read_text(encoding="utf-8")
+        assert "INFO hello world" in log_text
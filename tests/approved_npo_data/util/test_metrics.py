@@ -0,0 +1,117 @@
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from approved_npo_data.util.metrics import (
+    STAGE_SECONDS,
+    MetricsRegistry,
+    percentile,
+    to_labels,
+)
+
+
+def test_to_labels():
+    assert to_labels({"status": 200, "host": "example.com"}) == (
+        ("host", "example.com"),
+        ("status", "200"),
+    )
+
+
+class TestPercentile:
+    @pytest.mark.parametrize(
+        "q, expected",
+        [(0, 1.0), (50, 3.0), (100, 5.0), (95, 4.8)],
+    )
+    def test_percentile(self, q, expected):
+        assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], q) == pytest.approx(expected)
+
+    def test_single_value(self):
+        assert percentile([2.0], 99) == 2.0
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            percentile([], 50)
+
+
+class TestMetricsRegistry:
+    @pytest.fixture
+    def registry(self) -> MetricsRegistry:
+        return MetricsRegistry()
+
+    def test_inc(self, registry: MetricsRegistry):
+        registry.inc("requests", host="a")
+        registry.inc("requests", 2, host="a")
+        registry.inc("requests", host="b")
+
+        assert registry.counters() == {"requests": {(("host", "a"),): 3, (("host", "b"),): 1}}
+
+    def test_gauge(self, registry: MetricsRegistry):
+        registry.set_gauge("queue_depth", 10)
+        registry.add_gauge("queue_depth", -3)
+
+        assert registry.gauges() == {"queue_depth": {(): 7}}
+
+    def test_timer(self, registry: MetricsRegistry):
+        with mock.patch("approved_npo_data.util.metrics.perf_counter", side_effect=[1.0, 3.5]):
+            with registry.timer("seconds", host="a"):
+                pass
+
+        assert registry.observations() == {"seconds": {(("host", "a"),): [2.5]}}
+
+    def test_stage(self, registry: MetricsRegistry):
+        with registry.stage("csv_write"):
+            pass
+
+        assert list(registry.observations()[STAGE_SECONDS]) == [(("stage", "csv_write"),)]
+
+    def test_summary(self, registry: MetricsRegistry):
+        registry.inc("requests", host="a")
+        registry.set_gauge("in_flight", 1)
+        for value in [1.0, 2.0, 3.0]:
+            registry.observe("seconds", value, host="a")
+
+        summary = registry.summary()
+
+        assert summary["counters"] == {"requests": [{"labels": {"host": "a"}, "value": 1}]}
+        assert summary["gauges"] == {"in_flight": [{"labels": {}, "value": 1}]}
+        observation = summary["observations"]["seconds"][0]
+        assert observation["labels"] == {"host": "a"}
+        assert observation["count"] == 3
+        assert observation["sum"] == 6.0
+        assert observation["p50"] == 2.0
+
+    def test_write_json(self, registry: MetricsRegistry, tmp_path: Path):
+        registry.inc("requests")
+        output_path = tmp_path / "metrics.json"
+
+        registry.write_json(output_path)
+
+        with open(output_path, encoding="utf-8") as file:
+            assert json.load(file) == registry.summary()
+
+    def test_reset(self, registry: MetricsRegistry):
+        registry.inc("requests")
+        registry.reset()
+
+        assert registry.summary() == {"counters": {}, "gauges": {}, "observations": {}}
+
+    def test_stage_hook(self, registry: MetricsRegistry):
+        events = []
+
+        @contextmanager
+        def hook(stage: str):
+            events.append(("enter", stage))
+            yield
+            events.append(("exit", stage))
+
+        registry.add_stage_hook(hook)
+        with registry.stage("parse"):
+            events.append(("body", "parse"))
+        registry.remove_stage_hook(hook)
+        with registry.stage("parse"):
+            pass
+
+        assert events == [("enter", "parse"), ("body", "parse"), ("exit", "parse")]
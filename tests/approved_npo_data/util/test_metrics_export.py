@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+
+from approved_npo_data.util.metrics import MetricsRegistry
+from approved_npo_data.util.metrics_export import (
+    MetricsFileWriter,
+    escape_label_value,
+    render_metrics,
+    write_metrics_file,
+)
+
+
+def test_escape_label_value():
+    assert escape_label_value('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+class TestRenderMetrics:
+    @pytest.fixture
+    def registry(self) -> MetricsRegistry:
+        registry = MetricsRegistry()
+        registry.inc("http_requests_total", host="example.com", status=200)
+        registry.set_gauge("queue_depth", 3, queue="records")
+        registry.observe("http_request_seconds", 0.3, host="example.com")
+        registry.observe("http_request_seconds", 3.0, host="example.com")
+        return registry
+
+    def test_counter(self, registry: MetricsRegistry):
+        lines = render_metrics(registry).splitlines()
+
+        assert "# TYPE approved_npo_data_http_requests_total counter" in lines
+        assert 'approved_npo_data_http_requests_total{host="example.com",status="200"} 1' in lines
+
+    def test_counter_openmetrics(self, registry: MetricsRegistry):
+        lines = render_metrics(registry, openmetrics=True).splitlines()
+
+        assert "# TYPE approved_npo_data_http_requests counter" in lines
+        assert lines[-1] == "# EOF"
+
+    def test_gauge(self, registry: MetricsRegistry):
+        lines = render_metrics(registry).splitlines()
+
+        assert "# TYPE approved_npo_data_queue_depth gauge" in lines
+        assert 'approved_npo_data_queue_depth{queue="records"} 3' in lines
+
+    def test_histogram(self, registry: MetricsRegistry):
+        lines = render_metrics(registry, buckets=(1.0,)).splitlines()
+
+        assert "# TYPE approved_npo_data_http_request_seconds histogram" in lines
+        assert (
+            'approved_npo_data_http_request_seconds_bucket{host="example.com",le="1.0"} 1' in lines
+        )
+        assert (
+            'approved_npo_data_http_request_seconds_bucket{host="example.com",le="+Inf"} 2' in lines
+        )
+        assert 'approved_npo_data_http_request_seconds_count{host="example.com"} 2' in lines
+        assert 'approved_npo_data_http_request_seconds_sum{host="example.com"} 3.3' in lines
+
+    def test_empty(self):
+        assert render_metrics(MetricsRegistry()) == "\n"
+
+
+def test_write_metrics_file(tmp_path: Path):
+    registry = MetricsRegistry()
+    registry.inc("records_processed_total")
+    output_path = tmp_path / "textfile" / "approved_npo_data.prom"
+
+    write_metrics_file(registry, output_path)
+
+    assert output_path.read_text(encoding="utf-8") == render_metrics(registry)
+    assert list(output_path.parent.iterdir()) == [output_path]
+
+
+class TestMetricsFileWriter:
+    def test_start_and_stop(self, tmp_path: Path):
+        registry = MetricsRegistry()
+        output_path = tmp_path / "approved_npo_data.prom"
+
+        writer = MetricsFileWriter(registry, output_path, interval_seconds=60).start()
+        assert output_path.exists()
+
+        registry.inc("records_processed_total")
+        writer.stop()
+
+        assert "approved_npo_data_records_processed_total 1" in output_path.read_text(
+            encoding="utf-8"
+        )
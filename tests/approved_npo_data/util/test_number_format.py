@@ -0,0 +1,28 @@
+import pytest
+
+from approved_npo_data.util.number_format import parse_amount
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("1,234,567", 1234567),
+        ("1234", 1234),
+        ("経常収益計 12,345 円", 12345),
+        ("１２，３４５", 12345),
+        ("△1,000", -1000),
+        ("▲ 2,000", -2000),
+        ("-300", -300),
+        ("経常費用計 100 200 1,300", 1300),
+    ],
+)
+def test_parse_amount(text, expected):
+    assert parse_amount(text) == expected
+
+
+def test_parse_amount_without_number():
+    assert parse_amount("経常収益計") is None
+
+
+def test_parse_amount_empty_string():
+    assert parse_amount("") is None
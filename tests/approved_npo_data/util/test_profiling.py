@@ -0,0 +1,126 @@
+import pstats
+import tracemalloc
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from approved_npo_data.util.metrics import MetricsRegistry
+from approved_npo_data.util.profiling import (
+    InlineExecutor,
+    StageProfiler,
+    create_executor,
+    is_profiling,
+)
+
+
+def allocate() -> list[str]:
+    return [str(i) for i in range(10000)]
+
+
+class TestStageProfiler:
+    @pytest.fixture
+    def registry(self) -> MetricsRegistry:
+        return MetricsRegistry()
+
+    @pytest.fixture(autouse=True)
+    def stop_tracemalloc(self):
+        yield
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def test_dump_pstats_per_stage(self, registry: MetricsRegistry, tmp_path: Path):
+        profiler = StageProfiler(tmp_path).install(registry)
+        with registry.stage("parse"):
+            allocate()
+        with registry.stage("serialize"):
+            pass
+        profiler.uninstall(registry)
+
+        assert (tmp_path / "parse.pstats").exists()
+        assert (tmp_path / "serialize.pstats").exists()
+        function_names = {key[2] for key in pstats.Stats(str(tmp_path / "parse.pstats")).stats}
+        assert "allocate" in function_names
+
+    def test_nested_stage(self, registry: MetricsRegistry, tmp_path: Path):
+        profiler = StageProfiler(tmp_path).install(registry)
+        with registry.stage("outer"):
+            with registry.stage("inner"):
+                allocate()
+        profiler.uninstall(registry)
+
+        outer = {key[2] for key in pstats.Stats(str(tmp_path / "outer.pstats")).stats}
+        inner = {key[2] for key in pstats.Stats(str(tmp_path / "inner.pstats")).stats}
+        assert "allocate" in inner
+        assert "allocate" not in outer
+
+    def test_tracemalloc_report(self, registry: MetricsRegistry, tmp_path: Path):
+        profiler = StageProfiler(tmp_path).install(registry)
+        with registry.stage("parse"):
+            data = allocate()
+        profiler.uninstall(registry)
+
+        report = (tmp_path / "tracemalloc.txt").read_text(encoding="utf-8")
+        assert "[parse]" in report
+        assert "test_profiling.py" in report
+        assert len(data) == 10000
+
+    def test_uninstall_removes_hook(self, registry: MetricsRegistry, tmp_path: Path):
+        profiler = StageProfiler(tmp_path).install(registry)
+        profiler.uninstall(registry)
+
+        with registry.stage("after"):
+            pass
+
+        assert not (tmp_path / "after.pstats").exists()
+
+    def test_stage_in_executor(self, registry: MetricsRegistry, tmp_path: Path):
+        """並行して実行する処理段階も、外側の処理段階の実行中に計測できることのテスト"""
+
+        def work() -> list[str]:
+            with registry.stage("worker"):
+                return allocate()
+
+        profiler = StageProfiler(tmp_path).install(registry)
+        assert is_profiling()
+        with registry.stage("total"):
+            with create_executor(4) as executor:
+                futures = [executor.submit(work) for _ in range(3)]
+                results = [future.result() for future in futures]
+        profiler.uninstall(registry)
+
+        assert not is_profiling()
+        assert all(len(result) == 10000 for result in results)
+        worker = pstats.Stats(str(tmp_path / "worker.pstats")).stats
+        [allocate_stats] = [value for key, value in worker.items() if key[2] == "allocate"]
+        assert allocate_stats[1] == 3  # 呼び出し回数
+        total = {key[2] for key in pstats.Stats(str(tmp_path / "total.pstats")).stats}
+        assert "allocate" not in total
+
+
+class TestCreateExecutor:
+    def test_thread_pool_when_not_profiling(self):
+        with create_executor(2) as executor:
+            assert isinstance(executor, ThreadPoolExecutor)
+
+    def test_inline_executor_runs_on_result(self):
+        """結果を取得する際に実行し、未着手のタスクは取り消せることのテスト"""
+        calls: list[int] = []
+        with InlineExecutor() as executor:
+            futures = [executor.submit(calls.append, i) for i in range(3)]
+            assert calls == []
+            assert futures[1].cancel()
+            futures[2].result()
+            assert calls == [2]
+            with pytest.raises(CancelledError):
+                futures[1].result()
+        # 結果を取得しなかったタスクは終了時に実行する
+        assert calls == [2, 0]
+
+    def test_inline_executor_exception(self):
+        with InlineExecutor() as executor:
+            future = executor.submit(int, "x")
+            assert isinstance(future.exception(), ValueError)
+            with pytest.raises(ValueError):
+                future.result()
+            assert list(executor.map(str, [1, 2])) == ["1", "2"]
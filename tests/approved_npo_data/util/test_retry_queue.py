@@ -0,0 +1,141 @@
+import pytest
+
+from approved_npo_data.util.metrics import metrics
+from approved_npo_data.util.retry_queue import HostBackoff, RetryQueue
+
+
+class FakeError(Exception):
+    def __init__(self, url: str, retryable: bool = True):
+        super().__init__(url)
+        self.url = url
+        self.retryable = retryable
+
+
+class FakeClock:
+    """sleepで進む時計"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def create_queue(clock: FakeClock, max_attempts: int = 3) -> RetryQueue:
+    return RetryQueue(
+        HostBackoff(1, 10),
+        max_attempts,
+        get_url=lambda e: e.url,  # type: ignore
+        is_retryable=lambda e: e.retryable,  # type: ignore
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+
+class TestHostBackoff:
+    def test_failure_doubles_per_host(self):
+        """同じホストで失敗が続く毎に待ち時間が2倍になり、上限で止まることのテスト"""
+        backoff = HostBackoff(1, 5)
+        assert [backoff.failure("a") for _ in range(4)] == [1, 2, 4, 5]
+        # 別のホストは影響を受けない
+        assert backoff.failure("b") == 1
+
+    def test_success_resets(self):
+        """成功すると待ち時間が元に戻ることのテスト"""
+        backoff = HostBackoff(1, 5)
+        backoff.failure("a")
+        backoff.failure("a")
+        backoff.success("a")
+        assert backoff.failure("a") == 1
+
+
+class TestRetryQueue:
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    def test_sweep_retries_after_backoff(self):
+        """再試行できる時刻まで待ってから再試行することのテスト"""
+        clock = FakeClock()
+        queue = create_queue(clock)
+        queue.defer(1, FakeError("http://a.example/1"))
+        queue.defer(2, FakeError("http://a.example/2"))
+        assert len(queue) == 2
+
+        done = []
+        assert queue.sweep(done.append) == []
+        assert done == [1, 2]
+        assert len(queue) == 0
+        # 同じホストの2件目は2倍の待ち時間
+        assert clock.sleeps == [1, 1]
+        assert metrics.counters()["deferred_retries_total"] == {(("host", "a.example"),): 2}
+
+    def test_sweep_gives_up_after_max_attempts(self):
+        """最大の試行回数まで失敗した処理はfailedに追加することのテスト"""
+        clock = FakeClock()
+        queue = create_queue(clock, max_attempts=3)
+        queue.defer(1, FakeError("http://a.example/1"))
+        calls = []
+
+        def task(key: int) -> None:
+            calls.append(key)
+            raise FakeError("http://a.example/1")
+
+        failed = queue.sweep(task)
+        assert calls == [1, 1]
+        assert [(item.key, item.attempts) for item in failed] == [(1, 3)]
+        assert metrics.counters()["retry_failures_total"] == {(("host", "a.example"),): 1}
+
+    def test_not_retryable(self):
+        """再試行できない失敗はキューに追加せずにfailedに追加することのテスト"""
+        queue = create_queue(FakeClock())
+        queue.defer(1, FakeError("http://a.example/1", retryable=False))
+        assert len(queue) == 0
+        assert [item.key for item in queue.failed] == [1]
+
+    def test_should_stop(self):
+        """中止する場合は残りの処理を再試行せずにfailedに追加することのテスト"""
+        queue = create_queue(FakeClock())
+        queue.defer(1, FakeError("http://a.example/1"))
+        queue.defer(2, FakeError("http://b.example/2"))
+        done = []
+        failed = queue.sweep(done.append, should_stop=lambda: True)
+        assert done == []
+        assert sorted(item.key for item in failed) == [1, 2]
+
+    def test_record_success_resets_backoff(self):
+        """成功を記録するとホストの待ち時間が元に戻ることのテスト"""
+        clock = FakeClock()
+        queue = create_queue(clock)
+        queue.defer(1, FakeError("http://a.example/1"))
+        queue.record_success("http://a.example/2")
+        queue.defer(2, FakeError("http://a.example/3"))
+        assert [item.not_before for item in sorted(queue._items)] == [1, 1]
+
+    def test_max_wait(self):
+        """再試行できる時刻まで上限より長く待つ必要がある処理は、待たずに中止することのテスト"""
+        clock = FakeClock()
+        queue = create_queue(clock)
+        queue.defer(1, FakeError("http://a.example/1"))
+        queue.defer(2, FakeError("http://a.example/2"))
+        done = []
+        # 1件目は1秒、2件目は2秒待つ必要がある
+        failed = queue.sweep(done.append, max_wait=lambda: 1.5 - clock.now)
+        assert done == [1]
+        assert [item.key for item in failed] == [2]
+        assert clock.sleeps == [1]
+
+    def test_is_exhausted(self):
+        """中止したためにfailedに追加した処理と、再試行できない処理を区別できることのテスト"""
+        queue = create_queue(FakeClock(), max_attempts=2)
+        queue.defer(1, FakeError("http://a.example/1"))
+        queue.defer(2, FakeError("http://a.example/2", retryable=False))
+        failed = queue.sweep(lambda key: None, should_stop=lambda: True)
+        assert {item.key: queue.is_exhausted(item) for item in failed} == {1: False, 2: True}
@@ -2,10 +2,12 @@ from unittest import mock
 
 import pytest
 from bs4 import BeautifulSoup
-from requests import RequestException
+from requests import HTTPError, RequestException
 from tenacity import RetryError
 
-from approved_npo_data.util.scraping import scrape
+from approved_npo_data.util.cassette import CassetteMissError
+from approved_npo_data.util.metrics import metrics
+from approved_npo_data.util.scraping import FetchError, fetch_html_once, scrape
 
 
 class TestScraping:
@@ -62,3 +64,38 @@ class TestScraping:
             scrape(url)
         # リトライ回数を確認
         assert mock_get_failure.call_count == 3
+
+    def test_scrape_retry_metrics(self, mock_get_failure):
+        """リトライ回数が計測されることのテスト"""
+        metrics.reset()
+        with pytest.raises(RetryError):
+            scrape("http://example.com/path")
+        assert metrics.counters()["http_retries_total"] == {(("host", "example.com"),): 2}
+        metrics.reset()
+
+    def test_fetch_html_once_does_not_retry(self, mock_get_failure):
+        """fetch_html_onceはリトライせずにFetchErrorを送出することのテスト"""
+        with pytest.raises(FetchError) as exc_info:
+            fetch_html_once("http://example.com")
+        assert mock_get_failure.call_count == 1
+        assert exc_info.value.url == "http://example.com"
+        assert exc_info.value.status_code is None
+        assert exc_info.value.is_retryable
+
+
+class TestFetchError:
+    @pytest.mark.parametrize(
+        ("status_code", "expected"), [(404, False), (429, True), (500, True), (503, True)]
+    )
+    def test_is_retryable(self, status_code, expected):
+        """ステータスコードに応じて再試行するか判定することのテスト"""
+        response = mock.Mock(status_code=status_code)
+        error = FetchError("http://example.com", HTTPError(response=response))
+        assert error.status_code == status_code
+        assert error.is_retryable is expected
+
+    def test_cassette_miss_is_not_retryable(self):
+        """再生時に記録が存在しない場合は再試行しないことのテスト"""
+        error = FetchError("http://example.com", CassetteMissError("http://example.com"))
+        assert error.status_code is None
+        assert not error.is_retryable
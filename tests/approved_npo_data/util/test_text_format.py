@@ -1,4 +1,10 @@
-from approved_npo_data.util.text_format import standardize_text_for_key
+from approved_npo_data.util.text_format import (
+    STANDARDIZE_CACHE_MAX_LENGTH,
+    standardize_keys,
+    standardize_text_for_key,
+    standardize_texts,
+    to_ngrams,
+)
 
 
 def test_standardize_text_for_key_basic():
@@ -35,3 +41,38 @@ def test_standardize_text_for_key_special_characters():
     text = "ＡＢＣ 123!@#"
     expected = "ABC123!@#"
     assert standardize_text_for_key(text) == expected
+
+
+def test_standardize_text_for_key_ascii():
+    assert standardize_text_for_key(" 5011005001526\t") == "5011005001526"
+
+
+def test_standardize_text_for_key_long_text():
+    text = "Ａ " * STANDARDIZE_CACHE_MAX_LENGTH
+    assert standardize_text_for_key(text) == "A" * STANDARDIZE_CACHE_MAX_LENGTH
+
+
+def test_standardize_texts():
+    texts = ["東京都", "ＮＰＯ　法人", "東京都", ""]
+    assert standardize_texts(texts) == ["東京都", "NPO法人", "東京都", ""]
+
+
+def test_standardize_keys():
+    table = {"法人番号 ": "123", "所轄庁\u3000": "東京都"}
+    assert standardize_keys(table) == {"法人番号": "123", "所轄庁": "東京都"}
+
+
+def test_to_ngrams():
+    assert to_ngrams("子ども支援") == ["子ど", "ども", "も支", "支援", "援"]
+
+
+def test_to_ngrams_trigram():
+    assert to_ngrams("ABCD", n=3) == ["ABC", "BCD", "CD", "D"]
+
+
+def test_to_ngrams_standardize():
+    assert to_ngrams("ＮＰＯ　法人") == ["NP", "PO", "O法", "法人", "人"]
+
+
+def test_to_ngrams_empty_string():
+    assert to_ngrams("") == []
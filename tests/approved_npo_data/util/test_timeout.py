@@ -0,0 +1,84 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from approved_npo_data.util.timeout import Deadline, time_limit
+
+
+class TestTimeLimit:
+    def test_within_limit(self):
+        with time_limit(1):
+            result = "done"
+        assert result == "done"
+
+    def test_exceed_limit(self):
+        with pytest.raises(TimeoutError):
+            with time_limit(0.05):
+                time.sleep(1)
+
+    def test_no_limit(self):
+        with time_limit(None):
+            time.sleep(0.01)
+
+    def test_timer_cleared(self):
+        with time_limit(0.05):
+            pass
+        # 制限時間を過ぎてもTimeoutErrorが送出されないこと
+        time.sleep(0.1)
+
+
+class TestDeadline:
+    def test_after(self):
+        deadline = Deadline.after(60)
+        assert 59 < deadline.remaining() <= 60
+        assert not deadline.is_expired()
+        assert deadline.is_expired(margin=61)
+
+    def test_expired(self):
+        deadline = Deadline.after(-1)
+        assert deadline.remaining() < 0
+        assert deadline.is_expired()
+
+    def test_parse_datetime(self):
+        assert Deadline.parse("2025-04-01T06:30").at == datetime(2025, 4, 1, 6, 30)
+
+    def test_parse_time_today(self):
+        now = datetime(2025, 4, 1, 5, 0)
+        assert Deadline.parse("06:30", now).at == datetime(2025, 4, 1, 6, 30)
+
+    def test_parse_time_tomorrow(self):
+        now = datetime(2025, 4, 1, 7, 0)
+        assert Deadline.parse("06:30", now).at == datetime(2025, 4, 2, 6, 30)
+
+    def test_parse_aware_datetime(self):
+        """タイムゾーン付きの日時はローカル時刻に変換することのテスト"""
+        deadline = Deadline.parse("2030-04-01T06:00+09:00")
+        expected = datetime(2030, 4, 1, 6, 0, tzinfo=timezone(timedelta(hours=9))).astimezone()
+        assert deadline.at == expected.replace(tzinfo=None)
+        assert deadline.remaining() > 0
+
+    def test_parse_aware_time(self):
+        """タイムゾーン付きの時刻はローカル時刻に変換し、次に来るその時刻とすることのテスト"""
+        now = datetime.now()
+        deadline = Deadline.parse("06:00+09:00", now)
+        assert deadline.at.tzinfo is None
+        assert now < deadline.at <= now + timedelta(days=1)
+        jst = deadline.at.astimezone(timezone(timedelta(hours=9)))
+        assert (jst.hour, jst.minute) == (6, 0)
+
+    def test_parse_invalid(self):
+        with pytest.raises(ValueError):
+            Deadline.parse("tomorrow")
+
+    def test_call_before(self):
+        called = threading.Event()
+        Deadline.after(0.05).call_before(0.04, called.set)
+        assert called.wait(1)
+
+    def test_call_before_cancel(self):
+        called = threading.Event()
+        timer = Deadline.after(0.05).call_before(0, called.set)
+        timer.cancel()
+        assert not called.wait(0.1)
@@ -0,0 +1,100 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from approved_npo_data.util.ttl_cache import CacheEntry, TtlCache
+
+
+class TestCacheEntry:
+    def test_fresh(self):
+        entry = CacheEntry(value="v", stored_at=100.0)
+        assert entry.is_fresh(ttl_seconds=10, now=105.0)
+
+    def test_expired(self):
+        entry = CacheEntry(value="v", stored_at=100.0)
+        assert not entry.is_fresh(ttl_seconds=10, now=110.0)
+
+
+class TestTtlCache:
+    @pytest.fixture
+    def cache(self, tmp_path: Path) -> TtlCache:
+        return TtlCache(tmp_path / "cache" / "url_cache.json", ttl_seconds=60)
+
+    def test_get_missing_key(self, cache: TtlCache):
+        assert cache.get("key") is None
+
+    def test_set_and_get(self, cache: TtlCache):
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+    def test_persisted_across_instances(self, cache: TtlCache):
+        cache.set("key", "value")
+        other = TtlCache(cache.path, ttl_seconds=60)
+        assert other.get("key") == "value"
+
+    def test_get_expired(self, cache: TtlCache):
+        cache.set("key", "value")
+        with mock.patch("approved_npo_data.util.ttl_cache.time.time", return_value=10**10):
+            assert cache.get("key") is None
+
+    def test_delete(self, cache: TtlCache):
+        cache.set("key", "value")
+        cache.delete("key")
+        assert cache.get_entry("key") is None
+
+    def test_broken_file(self, cache: TtlCache, caplog):
+        cache.path.parent.mkdir(parents=True)
+        cache.path.write_text("{broken", encoding="utf-8")
+        assert cache.get("key") is None
+        assert "キャッシュファイルを読み込めませんでした" in caplog.text
+
+    class TestGetOrLoad:
+        @pytest.fixture
+        def cache(self, tmp_path: Path) -> TtlCache:
+            return TtlCache(tmp_path / "url_cache.json", ttl_seconds=60)
+
+        def test_load_when_missing(self, cache: TtlCache):
+            loader = mock.Mock(return_value="loaded")
+
+            assert cache.get_or_load("key", loader) == "loaded"
+            assert cache.get("key") == "loaded"
+            loader.assert_called_once()
+
+        def test_use_fresh_cache(self, cache: TtlCache):
+            cache.set("key", "cached")
+            loader = mock.Mock(return_value="loaded")
+
+            assert cache.get_or_load("key", loader) == "cached"
+            loader.assert_not_called()
+
+        def test_use_stale_cache_and_revalidate(self, cache: TtlCache):
+            cache.set("key", "cached")
+            loader = mock.Mock(return_value="loaded")
+
+            with (
+                mock.patch("approved_npo_data.util.ttl_cache.time.time", return_value=10**10),
+                mock.patch.object(cache, "refresh_in_background") as mock_refresh,
+            ):
+                actual = cache.get_or_load("key", loader)
+
+            assert actual == "cached"
+            mock_refresh.assert_called_once_with("key", loader)
+
+        def test_refresh_in_background(self, cache: TtlCache):
+            cache.set("key", "cached")
+
+            cache.refresh_in_background("key", lambda: "loaded").join()
+
+            assert cache.get("key") == "loaded"
+
+        def test_refresh_in_background_failure(self, cache: TtlCache, caplog):
+            cache.set("key", "cached")
+
+            def loader():
+                raise ValueError("error")
+
+            cache.refresh_in_background("key", loader).join()
+
+            assert cache.get("key") == "cached"
+            assert "キャッシュの再検証に失敗しました" in caplog.text
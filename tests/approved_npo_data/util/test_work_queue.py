@@ -0,0 +1,151 @@
+import threading
+
+import pytest
+
+from approved_npo_data.util.work_queue import (
+    DONE,
+    FAILED,
+    LEASE_EXPIRED_ERROR,
+    LEASED,
+    PENDING,
+    WorkQueue,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return WorkQueue(tmp_path / "queue.sqlite3", max_attempts=2, clock=clock)
+
+
+class TestWorkQueue:
+    def test_enqueue_is_idempotent(self, queue):
+        """同じキーのタスクは追加しないことのテスト"""
+        assert queue.enqueue([("a", "1", 0), ("b", "2", 0)], "run1") == 2
+        assert queue.enqueue([("a", "changed", 0), ("c", "3", 0)], "run1") == 1
+        assert [(task.key, task.payload) for task in queue.tasks()] == [
+            ("a", "1"),
+            ("b", "2"),
+            ("c", "3"),
+        ]
+
+    def test_lease_in_priority_order(self, queue):
+        """優先度の順にリースし、リース中のタスクは別のワーカーに渡さないことのテスト"""
+        queue.enqueue([("a", "1", 2), ("b", "2", 1), ("c", "3", 2)], "run1")
+        assert [queue.lease("w", 60).key for _ in range(3)] == ["b", "a", "c"]  # type: ignore
+        assert queue.lease("w", 60) is None
+        assert queue.counts() == {PENDING: 0, LEASED: 3, DONE: 0, FAILED: 0}
+
+    def test_complete(self, queue):
+        """完了したタスクの結果が保存されることのテスト"""
+        queue.enqueue([("a", "1", 0)], "run1")
+        task = queue.lease("w1", 60)
+        assert task is not None and task.attempts == 1
+        assert queue.complete("a", "w1", "result")
+        assert queue.is_finished()
+        [task] = queue.tasks()
+        assert (task.status, task.result) == (DONE, "result")
+
+    def test_expired_lease_is_requeued(self, queue, clock):
+        """リースの期限が切れたタスクは別のワーカーが借り受け、元のワーカーの結果は破棄することのテスト"""
+        queue.enqueue([("a", "1", 0)], "run1")
+        queue.lease("w1", 60)
+        assert not queue.is_finished()
+        assert queue.lease("w2", 60) is None
+
+        clock.now += 61
+        task = queue.lease("w2", 60)
+        assert task is not None and task.attempts == 2
+        assert not queue.complete("a", "w1", "stale")
+        assert queue.complete("a", "w2", "fresh")
+        assert queue.tasks()[0].result == "fresh"
+
+    def test_expired_lease_fails_after_max_attempts(self, queue, clock):
+        """最大の試行回数まで試行したタスクはリースの期限が切れても再度リースしないことのテスト"""
+        queue.enqueue([("a", "1", 0)], "run1")
+        for _ in range(2):
+            assert queue.lease("w", 60) is not None
+            clock.now += 61
+        assert queue.lease("w", 60) is None
+        [task] = queue.tasks()
+        assert (task.status, task.attempts, task.error) == (FAILED, 2, LEASE_EXPIRED_ERROR)
+        assert queue.is_finished()
+
+    def test_fail_retries_after_delay(self, queue, clock):
+        """失敗したタスクは待ち時間の後に再試行し、最大の試行回数で失敗にすることのテスト"""
+        queue.enqueue([("a", "1", 0)], "run1")
+        queue.lease("w", 60)
+        assert queue.fail("a", "w", "error1", retry_delay=10)
+        assert queue.lease("w", 60) is None
+
+        clock.now += 10
+        assert queue.lease("w", 60) is not None
+        queue.fail("a", "w", "error2", retry_delay=10)
+        [task] = queue.tasks()
+        assert (task.status, task.attempts, task.error) == (FAILED, 2, "error2")
+        assert queue.is_finished()
+
+    def test_fail_not_retryable(self, queue):
+        """再試行できない失敗は試行回数に関わらず失敗にすることのテスト"""
+        queue.enqueue([("a", "1", 0)], "run1")
+        queue.lease("w", 60)
+        assert queue.fail("a", "w", "not found", retry_delay=0, retryable=False)
+        [task] = queue.tasks()
+        assert (task.status, task.attempts) == (FAILED, 1)
+
+    def test_fail_keeps_partial_result(self, queue):
+        """失敗時に保存した途中までの結果は、結果がない失敗の後も維持することのテスト"""
+        queue.enqueue([("a", "1", 0)], "run1")
+        queue.lease("w", 60)
+        queue.fail("a", "w", "error1", retry_delay=0, result="partial")
+        queue.lease("w", 60)
+        queue.fail("a", "w", "error2", retry_delay=0)
+        [task] = queue.tasks()
+        assert (task.status, task.result, task.error) == (FAILED, "partial", "error2")
+
+    def test_complete_with_error(self, queue):
+        """一部の処理に失敗して完了した場合はエラーも保存することのテスト"""
+        queue.enqueue([("a", "1", 0)], "run1")
+        queue.lease("w", 60)
+        assert queue.complete("a", "w", "partial", "error")
+        [task] = queue.tasks()
+        assert (task.status, task.result, task.error) == (DONE, "partial", "error")
+
+    def test_enqueue_other_run(self, queue):
+        """別の実行のタスクがあるキューにはタスクを追加しないことのテスト"""
+        assert queue.run_id is None
+        queue.enqueue([("a", "1", 0)], "run1")
+        assert queue.run_id == "run1"
+        with pytest.raises(ValueError, match="run1"):
+            queue.enqueue([("b", "2", 0)], "run2")
+        assert [task.key for task in queue.tasks()] == ["a"]
+
+    def test_concurrent_lease(self, queue):
+        """複数のスレッドから同時にリースしても同じタスクを重複して渡さないことのテスト"""
+        queue.enqueue([(str(i), "", 0) for i in range(50)], "run1")
+        leased: list[str] = []
+        lock = threading.Lock()
+
+        def work(owner: str) -> None:
+            while (task := queue.lease(owner, 60)) is not None:
+                with lock:
+                    leased.append(task.key)
+
+        threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(leased, key=int) == [str(i) for i in range(50)]